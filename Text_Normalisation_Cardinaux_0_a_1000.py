@@ -1,17 +1,83 @@
-import pynini
-from pynini.lib import pynutil
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
 import re
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from fst_loader import DEFAULT_LOCALE, nbest_strings, shortest_string
+from fst_table import build_verbalization_table
+from instrumentation import metrics
+from lazy_modules import lazy_import
+from number_tokenizer import SMALL, classify, substitute_numbers
+
+# pynini n'est importé qu'à la première construction ou application d'un FST
+pynini = lazy_import("pynini")
+byte = lazy_import("pynini.lib.byte")
+pynutil = lazy_import("pynini.lib.pynutil")
 
 # ==========================================
 # 1. Fonctions Helper
 # ==========================================
 
 def apply_fst(text, fst):
-    """Applique un FST à une chaîne d'entrée."""
+    """
+    Applique un FST à une chaîne d'entrée.
+    Lève l'exception de pynini si le FST n'accepte pas l'entrée (aucun chemin) :
+    à l'appelant de garder le texte d'origine.
+    """
+    try:
+        if metrics.enabled:
+            with metrics.timer("acceptor"):
+                input_fst = pynini.accep(text, token_type='utf8')
+            return(shortest_string(input_fst, fst, "utf8"))
+        return(shortest_string(pynini.accep(text, token_type='utf8'), fst, "utf8"))
+    except Exception:
+        if metrics.enabled:
+            metrics.incr("fst_errors")
+        raise
+
+# Sorties retournées par défaut par apply_fst_nbest, et élagage : coût maximal
+# au-dessus du meilleur chemin (les alternatives plus coûteuses ne sont pas énumérées)
+DEFAULT_NBEST = 4
+NBEST_THRESHOLD = 3.0
+
+# Résultat de apply_fst_nbest : candidates = [(texte, poids)] par poids croissant ;
+# en cas d'échec, candidates est vide et error décrit la cause (None sinon)
+NbestResult = namedtuple("NbestResult", ["text", "candidates", "error"])
+
+def apply_fst_nbest(text, n=DEFAULT_NBEST, fst=None, threshold=NBEST_THRESHOLD):
+    """
+    Applique un FST pondéré et retourne ses n meilleures sorties, en une seule composition
+    fst: None = grammaire pondérée (get_weighted_fst), celle des grands nombres au-delà de 1000
+    threshold: élague les sorties de coût supérieur à meilleur + threshold (None = aucun élagage)
+    Ne lève pas d'exception : un échec est retourné dans NbestResult.error.
+    """
     try:
-        return(pynini.shortestpath(pynini.accep(text, token_type='utf8') @ fst).string("utf8"))
+        if fst is None:
+            kind = classify(text) if text.isdigit() else None
+            if kind is None:
+                return _nbest_failure(text, "entrée hors du domaine de la grammaire")
+            fst = get_weighted_fst(large=kind != SMALL)
+        if metrics.enabled:
+            with metrics.timer("nbest"):
+                candidates = nbest_strings(pynini.accep(text, token_type="utf8"), fst, n, "utf8", threshold)
+        else:
+            candidates = nbest_strings(pynini.accep(text, token_type="utf8"), fst, n, "utf8", threshold)
     except Exception as e:
-        return(f"Error: {e}, for input:'{text}'")
+        return _nbest_failure(text, str(e))
+    if not candidates:
+        return _nbest_failure(text, "aucune sortie (entrée rejetée par le FST)")
+    return NbestResult(text, candidates, None)
+
+def _nbest_failure(text, error):
+    if metrics.enabled:
+        metrics.incr("fst_errors")
+    return NbestResult(text, [], error)
 
 def I_O_FST(input_str: str, output_str: str) -> pynini.Fst:
     """Creates an FST mapping input_str to output_str."""
@@ -23,7 +89,7 @@ def I_O_FST(input_str: str, output_str: str) -> pynini.Fst:
     return fst.optimize()
 
 # ==========================================
-# 2. Définition des FSTs de base (0-69)
+# 2. Tables de correspondance
 # ==========================================
 
 # Unités (0-9)
@@ -31,174 +97,780 @@ digit_map = {
     "0": "zéro", "1": "un", "2": "deux", "3": "trois", "4": "quatre",
     "5": "cinq", "6": "six", "7": "sept", "8": "huit", "9": "neuf",
 }
-fst_units_list = [I_O_FST(k, v) for k, v in digit_map.items()]
-fst_units_base = pynini.union(*fst_units_list).optimize()
-
-# Gestion des zéros non significatifs (ex: 09 -> neuf)
-delete_zero = pynutil.delete("0")
-fst_zero_prefix = delete_zero.star
-fst_units_with_leading_zeros = (fst_zero_prefix + fst_units_base).optimize()
 
 # Teens (10-19)
 teens_map = {
     "10": "dix", "11": "onze", "12": "douze", "13": "treize", "14": "quatorze",
     "15": "quinze", "16": "seize", "17": "dix-sept", "18": "dix-huit", "19": "dix-neuf",
 }
-fst_teens = pynini.union(*[I_O_FST(k, v) for k, v in teens_map.items()]).optimize()
 
 # Dizaines (20, 30, 40, 50, 60)
 tens_digit_map = {
     "2": "vingt", "3": "trente", "4": "quarante", "5": "cinquante", "6": "soixante",
 }
-fst_tens_digit_list = [I_O_FST(digit, text) for digit, text in tens_digit_map.items()]
-fst_tens_digits = pynini.union(*fst_tens_digit_list).optimize()
-fst_eat_zero = I_O_FST("0", "") # "0" -> <eps>
-fst_exact_tens = (fst_tens_digits + fst_eat_zero).optimize()
 
-# Dizaines composées (21-29, 31-39... 61-69)
+# Unités des dizaines composées (21-29, 31-39... 61-69)
 compound_units_map = {k: v for k, v in digit_map.items() if (k != "0" and k != "1")}
-fst_compound_units_digits = pynini.union(*[I_O_FST(num, text) for num, text in compound_units_map.items()]).optimize()
 
-fst_insert_space = I_O_FST("", "-") # Insertion de tiret
-fst_compound_tens_standard = (fst_tens_digits + fst_insert_space + fst_compound_units_digits).optimize()
+# Unités centaines (2-9)
+units_hundreds_map = {k: v for k, v in digit_map.items() if k not in ["0", "1"]}
 
-# Gestion du "et un" (21, 31, 41, 51, 61)
-fst_one_unit = I_O_FST("1", "un").optimize()
-fst_insert_et_space = I_O_FST("", "-et-")
-fst_compound_et_un = (fst_tens_digits + fst_insert_et_space + fst_one_unit).optimize()
+# Dizaines régulières de Belgique et de Suisse (70, 80, 90)
+variant_tens_map = {
+    "7": "septante", "8": "huitante", "9": "nonante",
+}
 
-fst_compound_tens = pynini.union(fst_compound_tens_standard, fst_compound_et_un).optimize()
+GRAMMAR_MAPS = {
+    "digit_map": digit_map,
+    "teens_map": teens_map,
+    "tens_digit_map": tens_digit_map,
+    "compound_units_map": compound_units_map,
+    "units_hundreds_map": units_hundreds_map,
+    "variant_tens_map": variant_tens_map,
+}
+
+# Coût (poids tropical) des sorties alternatives de la grammaire pondérée ;
+# la sortie de CARDINAL a un coût nul et reste donc le 1-best
+alternative_weights = {
+    "traditional": 1.0,   # orthographe d'avant 1990 : "deux cent un" pour "deux-cent-un"
+    "feminine": 1.0,      # accord au féminin : "vingt-et-une" pour "vingt-et-un"
+    "millier": 3.0,       # "un millier" pour "mille"
+}
+
+# Tables lues par les nœuds : elles entrent dans l'empreinte des nœuds qui les citent
+GRAMMAR_TABLES = {**GRAMMAR_MAPS, "alternative_weights": alternative_weights}
 
 # ==========================================
-# 3. Définition des FSTs complexes (70-99)
+# 3. Graphe de la grammaire (0-1000 et grands nombres)
 # ==========================================
 
+# Chaque sous-FST est un nœud nommé : une fonction _<nom> dont les paramètres sont
+# les noms des nœuds dont elle dépend. Les nœuds fst_* forment la grammaire ;
+# les autres (digit, drop_plural_s...) sont des FSTs auxiliaires partagés.
+# Nom du nœud -> (fonction, dépendances, fonctions auxiliaires)
+GRAMMAR_NODES = {}
+
+def grammar_node(*uses):
+    """
+    Enregistre une fonction _<nom> comme nœud <nom> du graphe de la grammaire
+    uses: fonctions auxiliaires appelées par le nœud (leur code entre dans son empreinte)
+    """
+    def register(func):
+        dependencies = tuple(inspect.signature(func).parameters)
+        GRAMMAR_NODES[func.__name__.lstrip("_")] = (func, dependencies, uses)
+        return func
+    return register
+
+# --- Définition des FSTs de base (0-69) ---
+
+# Unités (0-9)
+@grammar_node()
+def _fst_units_base():
+    return pynini.union(*[I_O_FST(k, v) for k, v in digit_map.items()]).optimize()
+
+# Gestion des zéros non significatifs (ex: 09 -> neuf)
+@grammar_node()
+def _fst_zero_prefix():
+    return pynutil.delete("0").star
+
+@grammar_node()
+def _fst_units_with_leading_zeros(fst_zero_prefix, fst_units_base):
+    return (fst_zero_prefix + fst_units_base).optimize()
+
+# Teens (10-19)
+@grammar_node()
+def _fst_teens():
+    return pynini.union(*[I_O_FST(k, v) for k, v in teens_map.items()]).optimize()
+
+# Dizaines (20, 30, 40, 50, 60)
+@grammar_node()
+def _fst_tens_digits():
+    return pynini.union(*[I_O_FST(digit, text) for digit, text in tens_digit_map.items()]).optimize()
+
+@grammar_node()
+def _fst_eat_zero():
+    return I_O_FST("0", "") # "0" -> <eps>
+
+@grammar_node()
+def _fst_exact_tens(fst_tens_digits, fst_eat_zero):
+    return (fst_tens_digits + fst_eat_zero).optimize()
+
+# Dizaines composées (21-29, 31-39... 61-69)
+@grammar_node()
+def _fst_compound_units_digits():
+    return pynini.union(*[I_O_FST(num, text) for num, text in compound_units_map.items()]).optimize()
+
+@grammar_node()
+def _fst_insert_space():
+    return I_O_FST("", "-") # Insertion de tiret
+
+@grammar_node()
+def _fst_compound_tens_standard(fst_tens_digits, fst_insert_space, fst_compound_units_digits):
+    return (fst_tens_digits + fst_insert_space + fst_compound_units_digits).optimize()
+
+# Gestion du "et un" (21, 31, 41, 51, 61)
+@grammar_node()
+def _fst_one_unit():
+    return I_O_FST("1", "un").optimize()
+
+@grammar_node()
+def _fst_insert_et_space():
+    return I_O_FST("", "-et-")
+
+@grammar_node()
+def _fst_compound_et_un(fst_tens_digits, fst_insert_et_space, fst_one_unit):
+    return (fst_tens_digits + fst_insert_et_space + fst_one_unit).optimize()
+
+@grammar_node()
+def _fst_compound_tens(fst_compound_tens_standard, fst_compound_et_un):
+    return pynini.union(fst_compound_tens_standard, fst_compound_et_un).optimize()
+
+# --- Définition des FSTs complexes (70-99) ---
+
 # Réutilisation de 10-19
-fst_tens_10_to_19 = fst_teens # Alias
+@grammar_node()
+def _fst_tens_10_to_19(fst_teens):
+    return fst_teens # Alias
 
 # 70-79
 # A. Soixante-dix (70)
-fst_70 = I_O_FST("7", "soixante-").optimize() + I_O_FST("0", "dix").optimize()
+@grammar_node()
+def _fst_70():
+    return I_O_FST("7", "soixante-").optimize() + I_O_FST("0", "dix").optimize()
+
 # B. Soixante-et-onze (71)
-fst_71 = I_O_FST("7", "soixante").optimize() + fst_insert_et_space + I_O_FST("1", "onze").optimize()
+@grammar_node()
+def _fst_71(fst_insert_et_space):
+    return I_O_FST("7", "soixante").optimize() + fst_insert_et_space + I_O_FST("1", "onze").optimize()
+
 # C. Soixante-douze à 79
-fst_tens_12_to_19 = pynini.union(*[I_O_FST(k[1], v) for k, v in teens_map.items() if k not in ["10", "11"]]).optimize()
-fst_72_to_79 = I_O_FST("7", "soixante-").optimize() + fst_tens_12_to_19.optimize()
-fst_70_to_79 = pynini.union(fst_70, fst_71, fst_72_to_79).optimize()
+@grammar_node()
+def _fst_tens_12_to_19():
+    return pynini.union(*[I_O_FST(k[1], v) for k, v in teens_map.items() if k not in ["10", "11"]]).optimize()
+
+@grammar_node()
+def _fst_72_to_79(fst_tens_12_to_19):
+    return I_O_FST("7", "soixante-").optimize() + fst_tens_12_to_19
+
+@grammar_node()
+def _fst_70_to_79(fst_70, fst_71, fst_72_to_79):
+    return pynini.union(fst_70, fst_71, fst_72_to_79).optimize()
 
 # 80-89
 # Unités 2 à 9 avec tiret
-fst_units_2_to_9 = pynini.union(*[I_O_FST(k, "-" + v) for k, v in digit_map.items() if k not in ["0", "1"]]).optimize()
+@grammar_node()
+def _fst_units_2_to_9():
+    return pynini.union(*[I_O_FST(k, "-" + v) for k, v in digit_map.items() if k not in ["0", "1"]]).optimize()
 
 # A. Quatre-vingts (80) - cas particulier du 's'
-fst_80 = I_O_FST("8", "quatre-vingt").optimize() + I_O_FST("0", "s").optimize()
+@grammar_node()
+def _fst_80():
+    return I_O_FST("8", "quatre-vingt").optimize() + I_O_FST("0", "s").optimize()
+
 # B. Quatre-vingt-un (81)
-fst_81 = I_O_FST("8", "quatre-vingt").optimize() + fst_insert_space + I_O_FST("1", "un").optimize()
+@grammar_node()
+def _fst_81(fst_insert_space):
+    return I_O_FST("8", "quatre-vingt").optimize() + fst_insert_space + I_O_FST("1", "un").optimize()
+
 # C. 82-89
-fst_82_to_89 = I_O_FST("8", "quatre-vingt").optimize() + fst_units_2_to_9.optimize()
-fst_80_to_89 = pynini.union(fst_80, fst_81, fst_82_to_89).optimize()
+@grammar_node()
+def _fst_82_to_89(fst_units_2_to_9):
+    return I_O_FST("8", "quatre-vingt").optimize() + fst_units_2_to_9
+
+@grammar_node()
+def _fst_80_to_89(fst_80, fst_81, fst_82_to_89):
+    return pynini.union(fst_80, fst_81, fst_82_to_89).optimize()
 
 # 90-99
-fst_quatre_vingt_prefix = I_O_FST("9", "quatre-vingt").optimize()
+@grammar_node()
+def _fst_quatre_vingt_prefix():
+    return I_O_FST("9", "quatre-vingt").optimize()
+
 # A. 90
-fst_90 = fst_quatre_vingt_prefix + I_O_FST("0", "-dix").optimize()
+@grammar_node()
+def _fst_90(fst_quatre_vingt_prefix):
+    return fst_quatre_vingt_prefix + I_O_FST("0", "-dix").optimize()
+
 # B. 91-99 (réutilisation teens)
-fst_91_to_99_suffix = pynini.union(*[I_O_FST(k[1], "-" + v) for k, v in teens_map.items() if k != "10"]).optimize()
-fst_91_to_99 = fst_quatre_vingt_prefix + fst_91_to_99_suffix
-fst_90_to_99 = pynini.union(fst_90, fst_91_to_99).optimize()
+@grammar_node()
+def _fst_91_to_99_suffix():
+    return pynini.union(*[I_O_FST(k[1], "-" + v) for k, v in teens_map.items() if k != "10"]).optimize()
+
+@grammar_node()
+def _fst_91_to_99(fst_quatre_vingt_prefix, fst_91_to_99_suffix):
+    return fst_quatre_vingt_prefix + fst_91_to_99_suffix
+
+@grammar_node()
+def _fst_90_to_99(fst_90, fst_91_to_99):
+    return pynini.union(fst_90, fst_91_to_99).optimize()
+
+# Variantes régionales : 70-99 se forment comme 20-69 (septante, septante-et-un, septante-deux)
+def _regular_tens(digit, fst_eat_zero, fst_insert_space, fst_insert_et_space, fst_one_unit,
+                  fst_compound_units_digits):
+    tens = I_O_FST(digit, variant_tens_map[digit])
+    return pynini.union(
+        tens + fst_eat_zero,                                  # 70
+        tens + fst_insert_et_space + fst_one_unit,            # 71
+        tens + fst_insert_space + fst_compound_units_digits,  # 72-79
+    ).optimize()
+
+@grammar_node(_regular_tens)
+def _fst_70_to_79_septante(fst_eat_zero, fst_insert_space, fst_insert_et_space, fst_one_unit,
+                           fst_compound_units_digits):
+    return _regular_tens("7", fst_eat_zero, fst_insert_space, fst_insert_et_space, fst_one_unit,
+                         fst_compound_units_digits)
+
+@grammar_node(_regular_tens)
+def _fst_80_to_89_huitante(fst_eat_zero, fst_insert_space, fst_insert_et_space, fst_one_unit,
+                           fst_compound_units_digits):
+    return _regular_tens("8", fst_eat_zero, fst_insert_space, fst_insert_et_space, fst_one_unit,
+                         fst_compound_units_digits)
+
+@grammar_node(_regular_tens)
+def _fst_90_to_99_nonante(fst_eat_zero, fst_insert_space, fst_insert_et_space, fst_one_unit,
+                          fst_compound_units_digits):
+    return _regular_tens("9", fst_eat_zero, fst_insert_space, fst_insert_et_space, fst_one_unit,
+                         fst_compound_units_digits)
 
 # Union 70-99
-fst_70_to_99 = pynini.union(fst_70_to_79, fst_80_to_89, fst_90_to_99).optimize()
+@grammar_node()
+def _fst_70_to_99(fst_70_to_79, fst_80_to_89, fst_90_to_99):
+    return pynini.union(fst_70_to_79, fst_80_to_89, fst_90_to_99).optimize()
 
-# ==========================================
-# 4. Construction Intermédiaire (0-99)
-# ==========================================
+# --- Construction Intermédiaire (0-99) ---
 
 # Nécessaire pour les centaines composées (ex: cent-vingt-cinq)
 # On a besoin d'un FST qui gère "01", "05", "10", "99" sur 2 chiffres
-fst_01_to_09 = (pynutil.delete("0").optimize() + fst_units_base).optimize()
-
-fst_double_digit_00_to_99 = pynini.union(
-    I_O_FST("00", ""),           # 00 -> <epsilon>
-    fst_01_to_09,                # 01-09
-    fst_teens,                   # 10-19
-    fst_exact_tens,              # 20, 30...
-    fst_compound_tens,           # 21-69
-    fst_70_to_99                 # 70-99
-).optimize()
-
-# ==========================================
-# 5. Les Centaines (100-999) et 1000
-# ==========================================
+@grammar_node()
+def _fst_01_to_09(fst_units_base):
+    return (pynutil.delete("0").optimize() + fst_units_base).optimize()
+
+@grammar_node()
+def _fst_double_digit_00_to_99(fst_01_to_09, fst_teens, fst_exact_tens, fst_compound_tens, fst_70_to_99):
+    return pynini.union(
+        I_O_FST("00", ""),           # 00 -> <epsilon>
+        fst_01_to_09,                # 01-09
+        fst_teens,                   # 10-19
+        fst_exact_tens,              # 20, 30...
+        fst_compound_tens,           # 21-69
+        fst_70_to_99                 # 70-99
+    ).optimize()
+
+# --- Les Centaines (100-999) et 1000 ---
 
 # Unités centaines (2-9)
-units_hundreds_map = {k: v for k, v in digit_map.items() if k not in ["0", "1"]}
-fst_units_2_to_9_digit = pynini.union(*[I_O_FST(k, v) for k, v in units_hundreds_map.items()]).optimize()
+@grammar_node()
+def _fst_units_2_to_9_digit():
+    return pynini.union(*[I_O_FST(k, v) for k, v in units_hundreds_map.items()]).optimize()
 
 # 100-199
-fst_100_exact = I_O_FST("1", "cent").optimize() + I_O_FST("00", "").optimize()
-fst_101_to_199 = I_O_FST("1", "cent").optimize() + fst_insert_space + fst_double_digit_00_to_99.optimize()
-fst_100_to_199 = pynini.union(fst_100_exact, fst_101_to_199).optimize()
+@grammar_node()
+def _fst_100_exact():
+    return I_O_FST("1", "cent").optimize() + I_O_FST("00", "").optimize()
+
+@grammar_node()
+def _fst_101_to_199(fst_insert_space, fst_double_digit_00_to_99):
+    return I_O_FST("1", "cent").optimize() + fst_insert_space + fst_double_digit_00_to_99
+
+@grammar_node()
+def _fst_100_to_199(fst_100_exact, fst_101_to_199):
+    return pynini.union(fst_100_exact, fst_101_to_199).optimize()
 
 # 200-999
 # Exact (200, 300... -> cents avec s)
-fst_exact_hundreds = (fst_units_2_to_9_digit + fst_insert_space + I_O_FST("", "cents")).optimize() + I_O_FST("00", "").optimize()
+@grammar_node()
+def _fst_exact_hundreds(fst_units_2_to_9_digit, fst_insert_space):
+    return (fst_units_2_to_9_digit + fst_insert_space + I_O_FST("", "cents")).optimize() + I_O_FST("00", "").optimize()
+
 # Composé (201, 999... -> cent sans s)
-fst_composed_hundreds = (fst_units_2_to_9_digit + fst_insert_space + I_O_FST("", "cent")).optimize() + fst_insert_space + fst_double_digit_00_to_99.optimize()
-fst_200_to_999 = pynini.union(fst_exact_hundreds, fst_composed_hundreds).optimize()
+@grammar_node()
+def _fst_composed_hundreds(fst_units_2_to_9_digit, fst_insert_space, fst_double_digit_00_to_99):
+    return ((fst_units_2_to_9_digit + fst_insert_space + I_O_FST("", "cent")).optimize() + fst_insert_space
+            + fst_double_digit_00_to_99)
+
+@grammar_node()
+def _fst_200_to_999(fst_exact_hundreds, fst_composed_hundreds):
+    return pynini.union(fst_exact_hundreds, fst_composed_hundreds).optimize()
 
 # 1000
-fst_1000 = I_O_FST("1000", "mille").optimize()
+@grammar_node()
+def _fst_1000():
+    return I_O_FST("1000", "mille").optimize()
+
+# --- UNION FINALE (0-1000) ---
+
+@grammar_node()
+def _fst_00_to_1000(fst_units_with_leading_zeros, fst_teens, fst_exact_tens, fst_compound_tens,
+                    fst_70_to_99, fst_100_to_199, fst_200_to_999, fst_1000):
+    return pynini.union(
+        fst_units_with_leading_zeros, # 0-9
+        fst_teens,                    # 10-19
+        fst_exact_tens,               # 20,30...
+        fst_compound_tens,            # 21-69
+        fst_70_to_99,                 # 70-99
+        fst_100_to_199,               # 100-199
+        fst_200_to_999,               # 200-999
+        fst_1000                      # 1000
+    ).optimize()
+
+# --- Grands nombres (jusqu'à 999 999 999 999) par groupes de 3 chiffres ---
+
+# 0-999 : sous-FST réutilisé pour chaque groupe
+@grammar_node()
+def _fst_00_to_999(fst_units_with_leading_zeros, fst_teens, fst_exact_tens, fst_compound_tens,
+                   fst_70_to_99, fst_100_to_199, fst_200_to_999):
+    return pynini.union(
+        fst_units_with_leading_zeros, fst_teens, fst_exact_tens, fst_compound_tens,
+        fst_70_to_99, fst_100_to_199, fst_200_to_999
+    ).optimize()
+
+@grammar_node()
+def _digit():
+    return pynini.union(*digit_map.keys())
+
+@grammar_node()
+def _nonzero_digit():
+    return pynini.union(*[d for d in digit_map if d != "0"])
+
+@grammar_node()
+def _leading_group(nonzero_digit, digit):
+    return (nonzero_digit + pynini.closure(digit, 0, 2)).optimize()   # 1-999 sans zéro initial
+
+@grammar_node()
+def _three_digits(digit):
+    return (digit + digit + digit).optimize()                          # 000-999
+
+# Centaines : x00 vient seulement de la forme exacte (fst_200_to_999 produit aussi "deux-cent-")
+@grammar_node()
+def _fst_hundreds_exact(fst_100_exact, fst_exact_hundreds):
+    return pynini.union(fst_100_exact, fst_exact_hundreds).optimize()
+
+@grammar_node()
+def _fst_100_to_999(nonzero_digit, digit, fst_hundreds_exact, fst_00_to_999):
+    hundreds_composed = pynini.difference(nonzero_digit + digit + digit, nonzero_digit + "00").optimize()
+    return pynini.union(fst_hundreds_exact, hundreds_composed @ fst_00_to_999).optimize()
+
+@grammar_node()
+def _fst_01_to_99(digit, fst_double_digit_00_to_99):
+    return (pynini.difference(digit + digit, "00") @ fst_double_digit_00_to_99).optimize()
+
+# Groupe de tête (1-999) et groupe complet de 3 chiffres (001-999)
+@grammar_node()
+def _fst_1_to_999(nonzero_digit, digit, fst_00_to_999, fst_100_to_999):
+    return pynini.union((nonzero_digit + pynini.closure(digit, 0, 1)) @ fst_00_to_999,
+                        fst_100_to_999).optimize()
+
+@grammar_node()
+def _fst_001_to_999(fst_01_to_99, fst_100_to_999):
+    return pynini.union(pynutil.delete("0") + fst_01_to_99, fst_100_to_999).optimize()
+
+# Caractères des sorties de la grammaire (contexte des réécritures sur la sortie)
+@grammar_node()
+def _output_sigma():
+    output_chars = set("".join(value for table in GRAMMAR_MAPS.values() for value in table.values()))
+    return pynini.union(*[pynini.accep(c, token_type="utf8") for c in output_chars | set("centsvingmlard- ")])
+
+# Devant "mille" (invariable), cents et quatre-vingts perdent leur s
+@grammar_node()
+def _drop_plural_s(output_sigma):
+    return pynini.cdrewrite(pynutil.delete("s"), pynini.union("cent", "vingt"), "[EOS]",
+                            output_sigma.closure()).optimize()
+
+# Milliers : "mille", "deux-mille", "deux-cent-mille" (trait d'union comme dans les centaines)
+@grammar_node()
+def _fst_thousands_leading(leading_group, fst_1_to_999, drop_plural_s):
+    return pynini.union(
+        I_O_FST("1", "mille"),
+        (pynini.difference(leading_group, "1") @ fst_1_to_999 @ drop_plural_s) + I_O_FST("", "-mille"),
+    ).optimize()
+
+@grammar_node()
+def _fst_thousands_group(three_digits, fst_001_to_999, drop_plural_s):
+    return pynini.union(
+        I_O_FST("001", " mille"),
+        I_O_FST("", " ") + (pynini.difference(three_digits, pynini.union("000", "001")) @ fst_001_to_999
+                            @ drop_plural_s) + I_O_FST("", "-mille"),
+    ).optimize()
+
+# Millions, milliards : noms, séparés par des espaces et accordés ("deux cents millions")
+def _scale_leading(singular, plural, leading_group, fst_1_to_999):
+    return pynini.union(
+        I_O_FST("1", f"un {singular}"),
+        (pynini.difference(leading_group, "1") @ fst_1_to_999) + I_O_FST("", f" {plural}"),
+    ).optimize()
+
+def _scale_group(singular, plural, three_digits, fst_001_to_999):
+    return pynini.union(
+        I_O_FST("000", ""),
+        I_O_FST("001", f" un {singular}"),
+        I_O_FST("", " ") + (pynini.difference(three_digits, pynini.union("000", "001")) @ fst_001_to_999)
+        + I_O_FST("", f" {plural}"),
+    ).optimize()
+
+@grammar_node(_scale_leading)
+def _fst_millions_leading(leading_group, fst_1_to_999):
+    return _scale_leading("million", "millions", leading_group, fst_1_to_999)
+
+@grammar_node(_scale_group)
+def _fst_millions_group(three_digits, fst_001_to_999):
+    return _scale_group("million", "millions", three_digits, fst_001_to_999)
+
+@grammar_node(_scale_leading)
+def _fst_milliards_leading(leading_group, fst_1_to_999):
+    return _scale_leading("milliard", "milliards", leading_group, fst_1_to_999)
+
+# Unités après les milliers : "-" après "mille", " " après millions / milliards
+@grammar_node()
+def _fst_units_after_mille(fst_001_to_999):
+    return pynini.union(I_O_FST("000", ""), I_O_FST("", "-") + fst_001_to_999).optimize()
+
+@grammar_node()
+def _fst_units_after_scale(fst_001_to_999):
+    return pynini.union(I_O_FST("000", ""), I_O_FST("", " ") + fst_001_to_999).optimize()
+
+@grammar_node()
+def _fst_last_six_digits(fst_units_after_scale, fst_thousands_group, fst_units_after_mille):
+    return pynini.union(
+        I_O_FST("000", "") + fst_units_after_scale,
+        fst_thousands_group + fst_units_after_mille,
+    ).optimize()
+
+@grammar_node()
+def _fst_00_to_999999999999(fst_1_to_999, fst_thousands_leading, fst_units_after_mille, fst_millions_leading,
+                            fst_last_six_digits, fst_milliards_leading, fst_millions_group):
+    return pynini.union(
+        I_O_FST("0", "zéro"),                                                 # 0
+        fst_1_to_999,                                                         # 1-999
+        fst_thousands_leading + fst_units_after_mille,                        # 1 000-999 999
+        fst_millions_leading + fst_last_six_digits,                           # millions
+        fst_milliards_leading + fst_millions_group + fst_last_six_digits,     # milliards
+    ).optimize()
+
+# --- Grammaire pondérée : sorties alternatives (n-best) ---
+
+# Orthographe d'avant 1990 : trait d'union seulement entre dizaines et unités, pas autour
+# de "et", "cent(s)" et "mille" ("deux cent vingt et un", "trois mille quatre-vingts").
+# Restreinte aux sorties qu'elle modifie : une alternative n'est jamais la sortie elle-même.
+TRADITIONAL_REWRITES = [("-et-", " et "), ("-cent", " cent"), ("cent-", "cent "), ("-mille", " mille"),
+                        ("mille-", "mille ")]
+
+@grammar_node()
+def _traditional_spelling(output_sigma):
+    sigma_star = output_sigma.closure()
+    fst = sigma_star + pynini.union(*[old for old, _ in TRADITIONAL_REWRITES]) + sigma_star
+    for old, new in TRADITIONAL_REWRITES:
+        fst = fst @ pynini.cdrewrite(pynini.cross(old, new), "", "", sigma_star)
+    return fst.optimize()
+
+# Accord au féminin de "un" final ("une", "vingt-et-une", "cent une")
+@grammar_node()
+def _feminine_un(output_sigma):
+    ends_with_un = pynini.union("un", output_sigma.closure() + pynini.union("-", " ") + "un")
+    return (ends_with_un + pynutil.insert("e")).optimize()
+
+# Réécriture pondérée des sorties : chaque alternative ajoute son coût, la sortie inchangée coûte 0.
+# Un seul chemin par sortie : n-best sans déterminisation (voir fst_loader.nbest_strings)
+@grammar_node()
+def _alternatives(output_sigma, traditional_spelling, feminine_un):
+    sigma_star = output_sigma.closure()
+    spelling = pynini.union(sigma_star, pynutil.add_weight(traditional_spelling, alternative_weights["traditional"]))
+    gender = pynini.union(sigma_star, pynutil.add_weight(feminine_un, alternative_weights["feminine"]))
+    return (spelling @ gender).optimize()
+
+# CARDINAL a des sorties concurrentes de même poids pour x00 ("sept-cent-zéro" pour 700) :
+# x00 ne vient ici que de la forme exacte (comme fst_100_to_999), le 1-best reste celui de CARDINAL
+@grammar_node()
+def _weighted_cardinal(fst_00_to_1000, nonzero_digit, fst_hundreds_exact, alternatives):
+    other_inputs = pynini.difference(pynini.project(fst_00_to_1000, "input"), nonzero_digit + "00")
+    one_best = pynini.union(fst_hundreds_exact, other_inputs @ fst_00_to_1000)
+    return pynini.union(
+        one_best @ alternatives,
+        pynutil.add_weight(I_O_FST("1000", "un millier"), alternative_weights["millier"]),
+    ).optimize()
+
+@grammar_node()
+def _weighted_large_cardinal(fst_00_to_999999999999, alternatives):
+    return (fst_00_to_999999999999 @ alternatives).optimize()
+
+# --- Variantes régionales ---
+
+# Locale -> nœuds remplacés (nom du nœud -> nœud qui le remplace dans cette variante)
+# Les nœuds qui ne dépendent d'aucun nœud remplacé gardent la même empreinte :
+# ils sont construits (et mis en cache) une seule fois pour toutes les variantes.
+GRAMMAR_VARIANTS = {
+    "fr-FR": {},
+    "fr-BE": {                                   # septante, quatre-vingts, nonante
+        "fst_70_to_79": "fst_70_to_79_septante",
+        "fst_90_to_99": "fst_90_to_99_nonante",
+    },
+    "fr-CH": {                                   # septante, huitante, nonante
+        "fst_70_to_79": "fst_70_to_79_septante",
+        "fst_80_to_89": "fst_80_to_89_huitante",
+        "fst_90_to_99": "fst_90_to_99_nonante",
+    },
+}
+DEFAULT_VARIANT = DEFAULT_LOCALE
+
+# Nœuds qui n'existent que comme remplacement dans une variante
+VARIANT_NODES = {node for overrides in GRAMMAR_VARIANTS.values() for node in overrides.values()}
 
 # ==========================================
-# 6. UNION FINALE (0-1000)
+# 4. Construction incrémentale et cache disque
 # ==========================================
 
-fst_00_to_1000 = pynini.union(
-    fst_units_with_leading_zeros, # 0-9
-    fst_teens,                    # 10-19
-    fst_exact_tens,               # 20,30...
-    fst_compound_tens,            # 21-69
-    fst_70_to_99,                 # 70-99
-    fst_100_to_199,               # 100-199
-    fst_200_to_999,               # 200-999
-    fst_1000                      # 1000
-).optimize()
+GRAMMAR_CACHE_DIR = Path(__file__).resolve().parent / ".grammar_cache"
+
+# Nœuds déjà construits dans ce processus, indexés par (nom, empreinte)
+_NODE_CACHE = {}
+
+# Grammaire de chaque variante dans ce processus (construite ou lue au premier accès)
+_GRAMMARS = {}
+
+def node_hashes(variant: str = DEFAULT_VARIANT) -> dict:
+    """
+    Empreinte de chaque nœud : son code (et celui de I_O_FST et de ses fonctions
+    auxiliaires), les tables de correspondance qu'il lit, la version de pynini
+    et les empreintes de ses dépendances. Modifier teens_map ne change donc que
+    les nœuds qui en dépendent, directement ou non.
+    Dans une variante, un nœud remplacé prend le code et l'empreinte de son remplaçant.
+    """
+    overrides = GRAMMAR_VARIANTS[variant]
+    hashes = {}
+
+    def node_hash(name):
+        if name not in hashes:
+            func, dependencies, uses = GRAMMAR_NODES[overrides.get(name, name)]
+            code = "".join(inspect.getsource(source) for source in (func, I_O_FST) + uses)
+            digest = hashlib.sha256(code.encode("utf-8"))
+            for map_name, table in sorted(GRAMMAR_TABLES.items()):
+                if (map_name in GRAMMAR_MAPS and "GRAMMAR_MAPS" in code) or re.search(rf"\b{map_name}\b", code):
+                    digest.update(json.dumps(table, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+            digest.update(pynini.__version__.encode("utf-8"))
+            for dependency in dependencies:
+                digest.update(node_hash(dependency).encode("utf-8"))
+            hashes[name] = digest.hexdigest()[:16]
+        return hashes[name]
+
+    for name in GRAMMAR_NODES:
+        node_hash(name)
+    return hashes
+
+def grammar_hash(variant: str = DEFAULT_VARIANT) -> str:
+    """
+    Empreinte de la grammaire (de tous ses nœuds) : elle change dès que la grammaire change.
+    """
+    digest = hashlib.sha256()
+    for name, value in sorted(node_hashes(variant).items()):
+        digest.update(f"{name}:{value}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def _node_cache_path(cache_dir: Path, name: str, node_hash: str) -> Path:
+    return Path(cache_dir) / f"{name}.{node_hash}.fst"
+
+def _read_node(cache_path: Path):
+    """Lit un nœud du cache disque, ou None si le fichier est absent ou illisible."""
+    try:
+        return pynini.Fst.read(str(cache_path))
+    except Exception:
+        return None
+
+def _write_node(fst: pynini.Fst, cache_path: Path) -> None:
+    """Écrit un nœud dans le cache (fichier temporaire puis renommage atomique)."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        fst.write(str(tmp_path))
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # Le cache est une optimisation : un échec d'écriture n'est pas bloquant
+        pass
+
+def build_grammar(names=None, cache_dir=GRAMMAR_CACHE_DIR, report=None, memo=None,
+                  variant=DEFAULT_VARIANT) -> dict:
+    """
+    Construit les nœuds demandés (par défaut tous les fst_*) et les retourne par nom
+
+    Un nœud dont l'empreinte est dans le cache disque est relu sans construire ses
+    dépendances ; sinon ses dépendances sont résolues (relues ou construites) puis
+    il est compilé et mis en cache. cache_dir=None désactive le cache disque.
+    Un nœud relu donne les mêmes sorties qu'une compilation fraîche, sans être
+    identique octet par octet (l'ordre des arcs peut différer).
+    report: dictionnaire rempli avec {nom: ("built" | "cached", secondes)}
+            (nom suffixé par " [variante]" hors variante par défaut)
+    memo: nœuds déjà construits, {(nom, empreinte): FST} (partagé entre appels et
+          entre variantes : les nœuds communs ne sont construits qu'une fois)
+    variant: locale de GRAMMAR_VARIANTS
+    """
+    if variant not in GRAMMAR_VARIANTS:
+        raise ValueError(f"Variante inconnue: {variant} (choix: {', '.join(GRAMMAR_VARIANTS)})")
+    if names is None:
+        names = [name for name in GRAMMAR_NODES if name.startswith("fst_") and name not in VARIANT_NODES]
+    overrides = GRAMMAR_VARIANTS[variant]
+    hashes = node_hashes(variant)
+    memo = {} if memo is None else memo
+
+    def resolve(name):
+        key = (name, hashes[name])
+        fst = memo.get(key)
+        if fst is not None:
+            return fst
+        func, dependencies, _ = GRAMMAR_NODES[overrides.get(name, name)]
+        cache_path = _node_cache_path(cache_dir, name, hashes[name]) if cache_dir else None
+        start = time.perf_counter()
+        fst = _read_node(cache_path) if cache_path is not None and cache_path.exists() else None
+        status = "cached"
+        if fst is None:
+            args = [resolve(dependency) for dependency in dependencies]
+            start = time.perf_counter()  # Temps propre du nœud, sans ses dépendances
+            fst = func(*args)
+            status = "built"
+            if cache_path is not None:
+                _write_node(fst, cache_path)
+        if report is not None:
+            report[name if variant == DEFAULT_VARIANT else f"{name} [{variant}]"] = (
+                status, time.perf_counter() - start)
+        memo[key] = fst
+        return fst
+
+    return {name: resolve(name) for name in names}
+
+def _build_grammar() -> dict:
+    """
+    Compile tous les FSTs de la grammaire sans aucun cache (mesure de référence)
+    """
+    return build_grammar(cache_dir=None)
+
+def get_grammar(variant: str = DEFAULT_VARIANT) -> dict:
+    """
+    Retourne tous les FSTs de la grammaire d'une variante par nom
+    Chaque nœud est lu depuis le cache disque si son empreinte y est, sinon compilé puis mis en cache.
+    """
+    if variant not in _GRAMMARS:
+        _GRAMMARS[variant] = build_grammar(memo=_NODE_CACHE, variant=variant)
+    return _GRAMMARS[variant]
+
+def get_cardinal_fst(variant: str = DEFAULT_VARIANT) -> pynini.Fst:
+    """FST final 0-1000 (anciennement la variable de module fst_00_to_1000)."""
+    return get_grammar(variant)["fst_00_to_1000"]
+
+def get_large_cardinal_fst(variant: str = DEFAULT_VARIANT) -> pynini.Fst:
+    """FST des grands nombres, 0 à 999 999 999 999 (sans zéro initial)."""
+    return get_grammar(variant)["fst_00_to_999999999999"]
+
+def get_weighted_fst(variant: str = DEFAULT_VARIANT, large: bool = False) -> pynini.Fst:
+    """
+    Grammaire pondérée : mêmes entrées que CARDINAL (ou CARDINAL_LARGE), sorties alternatives
+    avec leur coût (alternative_weights). Construite ou lue depuis le cache au premier accès.
+    """
+    name = "weighted_large_cardinal" if large else "weighted_cardinal"
+    return build_grammar([name], memo=_NODE_CACHE, variant=variant)[name]
+
+def __getattr__(name):
+    # Compatibilité : `from Text_Normalisation_Cardinaux_0_a_1000 import fst_00_to_1000`
+    # déclenche la construction (ou la lecture du cache) au premier accès seulement.
+    if name.startswith("fst_"):
+        grammar = get_grammar()
+        if name in grammar:
+            return grammar[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ==========================================
-# 7. Fonction de Normalisation de phrase
+# 5. Fonction de Normalisation de phrase
 # ==========================================
 
-def normalize_cardinals_in_sentence(sentence: str, cardinal_fst: pynini.Fst) -> str:
+def normalize_cardinals_in_sentence(sentence: str, cardinal_fst: pynini.Fst, large_fst: pynini.Fst = None) -> str:
     """
     Parcourt une phrase, identifie les séquences de chiffres consécutifs
     et les remplace par leur équivalent textuel en utilisant un FST.
+    Avec large_fst (get_large_cardinal_fst), les nombres au-delà de 1000 et
+    jusqu'à 12 chiffres sont aussi normalisés.
+    Les jetons sont ceux de number_tokenizer (mêmes plages que le FST SENTENCE).
     """
-    number_pattern = r'\b\d{1,4}\b' # Max 4 chiffres (pour 1000)
-
-    def replace_match(match: re.Match) -> str:
-        number_str = match.group(0)
-        # Sécurité : le FST s'arrête à 1000
-        if len(number_str) > 4:
-            return number_str
+    def verbalize(number_str: str, kind: str) -> str:
+        # Au-delà de 1000 : FST des grands nombres ; nombre gardé tel quel si rejeté
         try:
-            return apply_fst(number_str, cardinal_fst)
-        except:
+            return apply_fst(number_str, cardinal_fst if kind == SMALL else large_fst)
+        except Exception:
             return number_str
 
-    result_sentence = re.sub(number_pattern, replace_match, sentence)
-    return result_sentence
+    if metrics.enabled:
+        start = time.perf_counter()
+        result_sentence = substitute_numbers(sentence, verbalize, large=large_fst is not None)
+        metrics.add_time("normalize_sentence", time.perf_counter() - start)
+        return result_sentence
+
+    return substitute_numbers(sentence, verbalize, large=large_fst is not None)
 
 # ==========================================
-# 8. Sauvegarde du FST sur disque
+# 6. FST de réécriture au niveau de la phrase
 # ==========================================
 
+# Blocs Unicode dont les caractères non \\w servent de frontière de mot au FST SENTENCE :
+# latin (ASCII, Latin-1, Latin étendu), ponctuation générale et symboles monétaires,
+# ponctuation CJK. Avec tout le plan multilingue de base (~4000 séquences UTF-8), le
+# contexte de cdrewrite multipliait le FST par 8 (92 849 arcs, 5 Mo de FAR, 15 s de
+# compilation) ; ici ~13 000 arcs et moins d'une seconde. Un nombre collé à un autre
+# symbole (flèche, opérateur mathématique, emoji...) reste en chiffres avec ce moteur.
+SENTENCE_BOUNDARY_BLOCKS = [(0x0001, 0x0250), (0x2000, 0x20D0), (0x3000, 0x3040)]
+GRAMMAR_TABLES["SENTENCE_BOUNDARY_BLOCKS"] = SENTENCE_BOUNDARY_BLOCKS
+
+def _non_word_chars():
+    """Caractères de SENTENCE_BOUNDARY_BLOCKS qui ne sont pas \\w pour le module re."""
+    word_char = re.compile(r'\w')
+    return [
+        chr(code) for start, end in SENTENCE_BOUNDARY_BLOCKS for code in range(start, end)
+        if not word_char.match(chr(code))
+    ]
+
+def build_sentence_fst(cardinal_fst: pynini.Fst, large_fst: pynini.Fst = None) -> pynini.Fst:
+    """
+    Construit un FST qui normalise tous les nombres d'une phrase en une seule
+    composition, avec les mêmes frontières de mot que r'\\b\\d{1,4}\\b'
+    (r'\\b\\d{1,12}\\b' si large_fst est fourni) pour les caractères de
+    SENTENCE_BOUNDARY_BLOCKS.
+    La phrase est traitée octet par octet (token_type="byte").
+    """
+    # Les paires (chiffres, texte) viennent de la table développée du FST
+    table = build_verbalization_table(cardinal_fst)
+    fst_numbers = pynini.string_map(table.items()).optimize()
+
+    if large_fst is not None:
+        # Nombres de 4 à 12 chiffres hors table ; leurs sorties sont en ASCII,
+        # les étiquettes utf8 et octet coïncident donc
+        digit = pynini.union(*digit_map.keys())
+        small_numbers = pynini.union(pynini.closure(digit, 1, 3), "1000")
+        large_inputs = pynini.difference(pynini.closure(digit, 4, 12), small_numbers)
+        fst_numbers = pynini.union(fst_numbers, large_inputs @ large_fst).optimize()
+
+    # Frontière de mot : début/fin de phrase ou caractère non alphanumérique
+    fst_non_word = pynini.string_map([pynini.escape(c) for c in _non_word_chars()]).optimize()
+    left_context = pynini.union("[BOS]", fst_non_word)
+    right_context = pynini.union("[EOS]", fst_non_word)
+
+    sigma_star = byte.BYTE.closure()
+    return pynini.cdrewrite(fst_numbers, left_context, right_context, sigma_star).optimize()
+
+# Nœud auxiliaire (hors fst_*) : le plus coûteux du graphe, construit seulement à la demande
+@grammar_node(build_sentence_fst, _non_word_chars, build_verbalization_table)
+def _sentence(fst_00_to_1000, fst_00_to_999999999999):
+    return build_sentence_fst(fst_00_to_1000, fst_00_to_999999999999)
+
+def get_sentence_fst(variant: str = DEFAULT_VARIANT) -> pynini.Fst:
+    """FST SENTENCE du FAR (0-1000 et grands nombres), lu depuis le cache disque si possible."""
+    return build_grammar(["sentence"], memo=_NODE_CACHE, variant=variant)["sentence"]
 
 # ==========================================
-# 9. Main execution block
+# 7. Sauvegarde du FST sur disque
+# ==========================================
+
+
+# ==========================================
+# 8. Main execution block
 # ==========================================
 
 if __name__ == "__main__":
+    fst_00_to_1000 = get_cardinal_fst()
+    
     print("=== Test unitaire (0-20) ===")
     for i in range(21):
         res = apply_fst(str(i), fst_00_to_1000)
@@ -209,6 +881,16 @@ if __name__ == "__main__":
     for val in complex_cases:
         print(f"{val} -> {apply_fst(val, fst_00_to_1000)}")
 
+    print("\n=== Test grands nombres ===")
+    fst_large = get_large_cardinal_fst()
+    for val in ["1001", "21000", "200000", "2300000", "80000000", "1000000000", "123456789012"]:
+        print(f"{val} -> {apply_fst(val, fst_large)}")
+
+    print("\n=== Test n-best (grammaire pondérée) ===")
+    for val in ["21", "201", "1000", "1981", "abc"]:
+        result = apply_fst_nbest(val)
+        print(f"{val} -> {result.candidates if result.error is None else 'échec: ' + result.error}")
+
     print("\n=== Test de phrase ===")
     phrase_test = "J'ai 3 chiens. Le prix est de 200 euros. Il en restait 71."
     phrase_normalisee = normalize_cardinals_in_sentence(phrase_test, fst_00_to_1000)
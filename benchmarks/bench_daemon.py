@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark : latence par appel, CLI à froid vs démon chaud
+Usage: python benchmarks/bench_daemon.py [-n APPELS]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import statistics
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from script_client import normalize_via_daemon
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CALLS = 20
+TEXT = "J'ai 25 ans et 3 chats"
+
+# ============================================
+# MESURES
+# ============================================
+
+def time_calls(label, func, calls):
+    """Exécute func calls fois et affiche la latence médiane / moyenne / max"""
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"  {label:<36} médiane {statistics.median(latencies):8.2f} ms   "
+          f"moyenne {statistics.mean(latencies):8.2f} ms   max {max(latencies):8.2f} ms")
+
+def run(command):
+    subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+
+def wait_for_socket(socket_path, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            normalize_via_daemon(["0"], socket_path)
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Le démon n'a pas démarré sur {socket_path}")
+
+# ============================================
+# EXÉCUTION
+# ============================================
+
+def main():
+    calls = CALLS
+    if len(sys.argv) == 3 and sys.argv[1] in ["-n", "--calls"]:
+        calls = int(sys.argv[2])
+
+    python = sys.executable
+    socket_path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    missing_socket = socket_path + ".absent"
+
+    print(f"Latence par appel sur {calls} appels, texte: {TEXT!r}")
+    time_calls("CLI à froid (script.py)", lambda: run([python, "script.py", TEXT]), calls)
+    time_calls("client sans démon (repli)",
+               lambda: run([python, "script_client.py", "-s", missing_socket, TEXT]), calls)
+
+    daemon = subprocess.Popen([python, "script.py", "--serve", "-s", socket_path],
+                              cwd=ROOT, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_socket(socket_path)
+        time_calls("client -> démon (processus)",
+                   lambda: run([python, "script_client.py", "-s", socket_path, TEXT]), calls)
+        time_calls("requête -> démon (sans démarrage)",
+                   lambda: normalize_via_daemon([TEXT], socket_path), calls * 10)
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark : lecture du dataset et écriture des résultats en CSV, Parquet et Arrow IPC
+Usage: python benchmarks/bench_io.py [dataset.csv] [-r REPETITIONS]
+
+Le dataset est agrandi (copies), avec une colonne inutile pour mesurer l'effet
+de la lecture des seules colonnes 'input' et 'reference'.
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from dataset_io import DEFAULT_ROW_GROUP_ROWS, ResultWriter, iter_dataset, read_dataset
+from script_wer import REQUIRED_COLUMNS
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DATASET = ROOT / "data" / "dataset_normalisation_0_1000.csv"
+REPETITIONS = 1000  # Copies du dataset
+CHUNK_ROWS = 100_000
+EXTENSIONS = [".csv", ".parquet", ".arrow"]
+
+# ============================================
+# MESURES
+# ============================================
+
+def best_of(func, runs=3):
+    """Meilleure durée (s) de func sur runs exécutions"""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+def write_results(frame, path):
+    with ResultWriter(path) as writer:
+        for start in range(0, len(frame), DEFAULT_ROW_GROUP_ROWS):
+            writer.write(frame.iloc[start:start + DEFAULT_ROW_GROUP_ROWS])
+
+def read_chunks(path):
+    for chunk in iter_dataset(path, REQUIRED_COLUMNS, CHUNK_ROWS):
+        pass
+
+# ============================================
+# EXÉCUTION
+# ============================================
+
+def main():
+    csv_path = DATASET
+    repetitions = REPETITIONS
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] in ["-r", "--repeat"] and i + 1 < len(args):
+            repetitions = int(args[i + 1])
+            i += 2
+        else:
+            csv_path = Path(args[i])
+            i += 1
+
+    dataset = pd.concat([pd.read_csv(csv_path)] * repetitions, ignore_index=True)
+    dataset["comment"] = "colonne non lue par script_wer.py " * 4
+    results = pd.DataFrame({
+        "reference": dataset["reference"].astype(str),
+        "hypothesis": dataset["input"].astype(str),
+        "wer": 0.125,
+    })
+    print(f"Dataset: {csv_path} ({len(dataset)} lignes, x{repetitions})")
+    print(f"  {'format':<9} {'taille':>9} {'lecture':>9} {'morceaux':>9} {'écriture':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        timings = {}
+        for extension in EXTENSIONS:
+            input_path = Path(tmp) / f"dataset{extension}"
+            write_results(dataset, input_path)
+            loaded = read_dataset(input_path, REQUIRED_COLUMNS)
+            if loaded["input"].astype(str).to_list() != dataset["input"].astype(str).to_list():
+                print(f"❌ ERREUR: {extension}: colonne 'input' relue différente", file=sys.stderr)
+                sys.exit(1)
+
+            read_time = best_of(lambda: read_dataset(input_path, REQUIRED_COLUMNS))
+            chunks_time = best_of(lambda: read_chunks(input_path))
+            write_time = best_of(lambda: write_results(results, Path(tmp) / f"results{extension}"))
+            size_mb = input_path.stat().st_size / 1e6
+            timings[extension] = read_time + write_time
+            print(f"  {extension[1:]:<9} {size_mb:7.2f} Mo {read_time * 1000:7.0f} ms "
+                  f"{chunks_time * 1000:7.0f} ms {write_time * 1000:7.0f} ms")
+
+    for extension in EXTENSIONS[1:]:
+        print(f"Lecture + écriture {extension[1:]} vs csv: x{timings['.csv'] / timings[extension]:.1f}")
+
+if __name__ == "__main__":
+    main()
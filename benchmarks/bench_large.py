@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark : taille et latence du FST des grands nombres (CARDINAL_LARGE)
+Usage: python benchmarks/bench_large.py [-n NOMBRES_PAR_LONGUEUR]
+
+Affiche le nombre d'états / d'arcs de CARDINAL et CARDINAL_LARGE, puis la latence
+moyenne par nombre selon le nombre de chiffres (1 à 12) : elle doit croître à peu
+près linéairement avec la longueur.
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fst_loader import as_mutable
+from script import FST_NAME, LARGE_FST_NAME, apply_fst, load_fst_from_far
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+FAR_FILE = ROOT / "cardinal_numbers.far"
+NUMBERS_PER_LENGTH = 500
+MAX_DIGITS = 12
+
+# ============================================
+# MESURES
+# ============================================
+
+def fst_size(fst):
+    """(états, arcs) d'un FST"""
+    fst = as_mutable(fst)
+    return fst.num_states(), sum(fst.num_arcs(state) for state in fst.states())
+
+def random_numbers(digits, count, seed=0):
+    """count nombres de exactement digits chiffres"""
+    rng = random.Random(seed + digits)
+    low = 10 ** (digits - 1) if digits > 1 else 0
+    return [str(rng.randrange(low, 10 ** digits)) for _ in range(count)]
+
+def main():
+    count = NUMBERS_PER_LENGTH
+    if len(sys.argv) == 3 and sys.argv[1] in ["-n", "--numbers"]:
+        count = int(sys.argv[2])
+
+    print("Taille des FSTs")
+    for name in [FST_NAME, LARGE_FST_NAME]:
+        states, arcs = fst_size(load_fst_from_far(str(FAR_FILE), name))
+        print(f"  {name:<16} {states:6d} états   {arcs:6d} arcs")
+
+    large_fst = load_fst_from_far(str(FAR_FILE), LARGE_FST_NAME)
+    print(f"\nLatence par nombre ({LARGE_FST_NAME}, {count} nombres par longueur)")
+    for digits in range(1, MAX_DIGITS + 1):
+        numbers = random_numbers(digits, count)
+        start = time.perf_counter()
+        for number in numbers:
+            apply_fst(number, large_fst)
+        latency = (time.perf_counter() - start) / count * 1e6
+        print(f"  {digits:2d} chiffres   {latency:8.1f} µs   exemple: {numbers[0]} -> {apply_fst(numbers[0], large_fst)}")
+
+if __name__ == "__main__":
+    main()
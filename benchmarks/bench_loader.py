@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark : temps de chargement et mémoire résidente par processus forké
+Compare l'ancien chargement (copie mutable du FAR) aux modes de fst_loader.
+Usage: python benchmarks/bench_loader.py [-w WORKERS] [-n NOM_FST]
+"""
+
+import sys
+import time
+import multiprocessing
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pynini
+from fst_loader import clear_cache, load_fst, shortest_string
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+FAR_FILE = ROOT / "cardinal_numbers.far"
+WORKERS = 4
+FST_NAME = "SENTENCE"
+SAMPLE = "J'ai 25 ans, 3 chats et 200 poissons. Il reste 71 places sur 1000."
+
+# ============================================
+# MESURES
+# ============================================
+
+def memory_kb():
+    """RSS et PSS (mémoire partagée répartie entre processus) en Ko, via /proc."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values["Rss"], values["Pss"]
+
+def legacy_load(far_path, fst_name):
+    """Chargement d'origine : copie mutable de l'entrée du FAR."""
+    far_reader = pynini.Far(str(far_path), mode="r")
+    fst = far_reader[fst_name]
+    far_reader.close()
+    return fst
+
+LOADERS = {
+    "legacy": lambda name: legacy_load(FAR_FILE, name),
+    "vector": lambda name: load_fst(FAR_FILE, name, fst_type="vector", mmap=False),
+    "const": lambda name: load_fst(FAR_FILE, name, fst_type="const", mmap=False),
+    "mmap": lambda name: load_fst(FAR_FILE, name, mmap=True),
+}
+
+def worker(mode, fst_name, queue):
+    clear_cache()  # Le cache du parent est hérité par fork : on mesure un vrai chargement
+    rss_before, pss_before = memory_kb()
+    start = time.perf_counter()
+    fst = LOADERS[mode](fst_name)
+    load_time = time.perf_counter() - start
+    # Une composition touche les pages réellement utilisées
+    token_type = "byte" if fst_name == "SENTENCE" else "utf8"
+    text = SAMPLE if fst_name == "SENTENCE" else "256"
+    shortest_string(pynini.accep(pynini.escape(text), token_type=token_type), fst, token_type)
+    rss_after, pss_after = memory_kb()
+    queue.put((load_time, rss_after - rss_before, pss_after - pss_before))
+
+def run_mode(mode, fst_name, workers):
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    processes = [context.Process(target=worker, args=(mode, fst_name, queue)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    load_ms = sum(r[0] for r in results) / workers * 1000
+    rss_kb = sum(r[1] for r in results) / workers
+    pss_kb = sum(r[2] for r in results) / workers
+    print(f"  {mode:<8} {load_ms:10.2f} ms {rss_kb/1024:10.2f} Mo {pss_kb/1024:10.2f} Mo")
+
+# ============================================
+# EXÉCUTION
+# ============================================
+
+def main():
+    workers = WORKERS
+    fst_name = FST_NAME
+    args = sys.argv[1:]
+    i = 0
+    while i + 1 < len(args):
+        if args[i] in ["-w", "--workers"]:
+            workers = int(args[i + 1])
+        elif args[i] in ["-n", "--name"]:
+            fst_name = args[i + 1]
+        i += 2
+
+    # Exporter le fichier mmap une fois avant de forker (pas dans le chrono)
+    load_fst(FAR_FILE, fst_name, mmap=True)
+
+    print(f"FST '{fst_name}' de {FAR_FILE.name}, {workers} processus forkés (moyenne par processus)")
+    print(f"  {'mode':<8} {'chargement':>13} {'RSS +':>13} {'PSS +':>13}")
+    for mode in LOADERS:
+        run_mode(mode, fst_name, workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark : latence du n-best (grammaire pondérée) comparée au 1-best
+Usage: python benchmarks/bench_nbest.py [-n NOMBRES]
+
+Pour CARDINAL (0-1000) et CARDINAL_LARGE, compare apply_fst sur la grammaire
+de base à apply_fst_nbest sur la grammaire pondérée, pour plusieurs n, avec
+et sans élagage (NBEST_THRESHOLD).
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from Text_Normalisation_Cardinaux_0_a_1000 import NBEST_THRESHOLD, apply_fst_nbest
+from script import (FST_NAME, LARGE_FST_NAME, LARGE_WEIGHTED_FST_NAME, WEIGHTED_FST_NAME, apply_fst,
+                    load_fst_from_far)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+FAR_FILE = ROOT / "cardinal_numbers.far"
+NUMBERS = 1000
+NBEST_SIZES = [1, 4, 8]
+
+# ============================================
+# MESURES
+# ============================================
+
+def latency(func, numbers):
+    """Latence moyenne (µs) de func sur chaque nombre"""
+    start = time.perf_counter()
+    for number in numbers:
+        func(number)
+    return (time.perf_counter() - start) / len(numbers) * 1e6
+
+def main():
+    count = NUMBERS
+    if len(sys.argv) == 3 and sys.argv[1] in ["-n", "--numbers"]:
+        count = int(sys.argv[2])
+
+    rng = random.Random(0)
+    cases = [
+        ("0-1000", FST_NAME, WEIGHTED_FST_NAME, [str(rng.randint(0, 1000)) for _ in range(count)]),
+        ("grands nombres", LARGE_FST_NAME, LARGE_WEIGHTED_FST_NAME,
+         [str(rng.randrange(1001, 10 ** rng.randint(4, 12))) for _ in range(count)]),
+    ]
+    for label, name, weighted_name, numbers in cases:
+        fst = load_fst_from_far(str(FAR_FILE), name)
+        weighted_fst = load_fst_from_far(str(FAR_FILE), weighted_name)
+        mismatches = [number for number in numbers
+                      if apply_fst_nbest(number, 1, weighted_fst).candidates[0][0] != apply_fst(number, fst)]
+        if mismatches:
+            print(f"❌ ERREUR: {weighted_name}: 1-best différent de {name} pour {mismatches[0]}", file=sys.stderr)
+            sys.exit(1)
+
+        base = latency(lambda number: apply_fst(number, fst), numbers)
+        print(f"{label} ({count} nombres)")
+        print(f"  {'1-best ' + name:<34} {base:8.1f} µs")
+        for n in NBEST_SIZES:
+            for threshold in [NBEST_THRESHOLD, None]:
+                duration = latency(lambda number: apply_fst_nbest(number, n, weighted_fst, threshold), numbers)
+                pruning = f"élagage {threshold:g}" if threshold is not None else "sans élagage"
+                print(f"  {f'{n}-best ({pruning})':<34} {duration:8.1f} µs   x{duration / base:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark : normalisation ligne par ligne vs colonne entière (normalize_series)
+Usage: python benchmarks/bench_series.py [dataset.csv] [-r REPETITIONS]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from script_wer import get_wer_normalizer
+from series_normalizer import SERIES_ENGINES, get_series_normalizer
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DATASET = ROOT / "data" / "dataset_normalisation_0_1000.csv"
+FAR_FILE = ROOT / "cardinal_numbers.far"
+REPETITIONS = 100  # Copies du dataset dans la colonne mesurée
+
+# ============================================
+# EXÉCUTION
+# ============================================
+
+def main():
+    csv_path = DATASET
+    repetitions = REPETITIONS
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] in ["-r", "--repeat"] and i + 1 < len(args):
+            repetitions = int(args[i + 1])
+            i += 2
+        else:
+            csv_path = Path(args[i])
+            i += 1
+
+    column = pd.concat([pd.read_csv(csv_path)["input"]] * repetitions, ignore_index=True)
+    print(f"Dataset: {csv_path} ({len(column)} lignes, x{repetitions})")
+
+    for engine in SERIES_ENGINES:
+        normalize = get_wer_normalizer(engine, str(FAR_FILE))
+        normalize_series = get_series_normalizer(engine, str(FAR_FILE))
+        normalize_series(column[:10])  # Table construite hors mesure
+
+        start = time.perf_counter()
+        rows = [normalize(str(text)) for text in column]
+        row_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        series = normalize_series(column).to_list()
+        series_time = time.perf_counter() - start
+
+        if rows != series:
+            mismatches = sum(a != b for a, b in zip(rows, series))
+            print(f"❌ ERREUR: {engine}: {mismatches} résultats différents", file=sys.stderr)
+            sys.exit(1)
+        print(f"  {engine:<6} lignes {len(column) / row_time:10,.0f} phrases/s   "
+              f"colonne {len(column) / series_time:10,.0f} phrases/s   x{row_time / series_time:.1f}")
+
+if __name__ == "__main__":
+    main()
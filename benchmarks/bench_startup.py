@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark : temps de démarrage à froid des points d'entrée, avec budget
+Usage: python benchmarks/bench_startup.py [-r RUNS] [--json FILE]
+
+Chaque commande est lancée dans un nouveau processus (meilleur temps sur RUNS),
+puis une fois avec python -X importtime pour lister les imports les plus coûteux.
+Échec (code 1) si une commande dépasse son budget, mesuré au-delà du démarrage
+de l'interpréteur seul (python -c pass), ou importe un module interdit sur son
+chemin (pynini pour --help, pandas pour script.py...).
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+RUNS = 5
+TOP_IMPORTS = 3
+
+HEAVY_MODULES = ["pynini", "pywrapfst", "numpy", "pandas", "pyarrow"]
+
+# (commande, budget en ms au-delà de python -c pass, modules interdits)
+COMMANDS = [
+    (["script.py", "--help"], 200, HEAVY_MODULES),
+    (["script.py", "--engine"], 200, HEAVY_MODULES),                   # Erreur d'usage
+    (["script.py", "--engine", "table", "5 bonbons"], 300, ["numpy", "pandas", "pyarrow"]),
+    (["script.py", "--engine", "array", "5 bonbons"], 350, ["pynini", "pywrapfst", "pandas", "pyarrow"]),
+    (["script.py"], 300, ["numpy", "pandas", "pyarrow"]),              # Mode interactif, stdin vide
+    (["script_wer.py", "--help"], 200, HEAVY_MODULES),
+    (["script_wer.py", "--engine"], 200, HEAVY_MODULES),
+    (["script_sauvegarde.py", "--help"], 200, HEAVY_MODULES),
+    (["script_async.py", "--help"], 300, HEAVY_MODULES),
+    (["script_client.py", "--help"], 100, HEAVY_MODULES),
+    (["fst_array.py", "--help"], 100, HEAVY_MODULES),
+]
+
+# ============================================
+# MESURES
+# ============================================
+
+def run(args, python_flags=()):
+    """Lance python [flags] args depuis la racine du dépôt ; retourne (durée en s, stderr)"""
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, *python_flags, *args], cwd=ROOT, stdin=subprocess.DEVNULL,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return time.perf_counter() - start, process.stderr
+
+def wall_time(args, runs):
+    """Meilleure durée (ms) sur runs lancements"""
+    return min(run(args)[0] for _ in range(runs)) * 1000
+
+def parse_importtime(stderr):
+    """[(module, cumul µs)] des lignes de python -X importtime"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((name.strip(), int(cumulative), len(name) - len(name.lstrip())))
+    return imports
+
+def import_report(args):
+    """Imports de premier niveau triés par coût cumulé, et paquets importés"""
+    _, stderr = run(args, ["-X", "importtime"])
+    imports = parse_importtime(stderr)
+    top_level = sorted(((name, cumulative) for name, cumulative, depth in imports if depth == 1),
+                       key=lambda item: item[1], reverse=True)
+    packages = {name.split(".")[0] for name, _, _ in imports}
+    return top_level, packages
+
+# ============================================
+# EXÉCUTION
+# ============================================
+
+def main():
+    runs = RUNS
+    json_path = None
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] in ["-r", "--runs"] and i + 1 < len(args):
+            runs = int(args[i + 1])
+            i += 2
+        elif args[i] == "--json" and i + 1 < len(args):
+            json_path = args[i + 1]
+            i += 2
+        else:
+            print(f"❌ ERREUR: Option inconnue: {args[i]}", file=sys.stderr)
+            sys.exit(1)
+
+    interpreter = wall_time(["-c", "pass"], runs)
+    print(f"Interpréteur seul (python -c pass): {interpreter:.0f} ms (meilleur de {runs})")
+    print(f"  {'commande':<42} {'durée':>8} {'budget':>8}   imports les plus coûteux")
+
+    results = []
+    failures = []
+    for command, budget, forbidden in COMMANDS:
+        label = " ".join(command)
+        duration = wall_time(command, runs) - interpreter
+        top_level, packages = import_report(command)
+        imported = [module for module in forbidden if module in packages]
+
+        top = ", ".join(f"{name} {cumulative / 1000:.0f}" for name, cumulative in top_level[:TOP_IMPORTS])
+        status = "✓" if duration <= budget and not imported else "✗"
+        print(f"{status} {label:<42} {duration:5.0f} ms {budget:5d} ms   {top}")
+
+        if duration > budget:
+            failures.append(f"{label}: {duration:.0f} ms > budget {budget} ms")
+        if imported:
+            failures.append(f"{label}: importe {', '.join(imported)}")
+        results.append({
+            "command": label,
+            "ms": round(duration, 1),
+            "budget_ms": budget,
+            "imports_ms": {name: cumulative / 1000 for name, cumulative in top_level[:10]},
+            "forbidden_imported": imported,
+        })
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"interpreter_ms": round(interpreter, 1), "runs": runs, "commands": results}, f, indent=2)
+        print(f"💾 Résultats sauvegardés dans: {json_path}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ ERREUR: {failure}", file=sys.stderr)
+        sys.exit(1)
+    print("✓ Budget de démarrage respecté")
+
+if __name__ == "__main__":
+    main()
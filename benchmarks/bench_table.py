@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark : table précalculée vs apply_fst pour chaque nombre détecté
+Usage: python benchmarks/bench_table.py [dataset.csv] [-r REPETITIONS]
+"""
+
+import sys
+import csv
+import re
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from script import load_fst_from_far, apply_fst, normalize_number
+from fst_table import build_verbalization_table
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DATASET = ROOT / "data" / "dataset_normalisation_0_1000.csv"
+FAR_FILE = ROOT / "cardinal_numbers.far"
+REPETITIONS = 200
+
+# ============================================
+# PRÉPARATION
+# ============================================
+
+def extract_matches(csv_path):
+    """
+    Extrait les nombres (0-1000) de la colonne 'input', comme normalize_text
+    """
+    number_pattern = re.compile(r'\b\d+\b')
+    matches = []
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            for number in number_pattern.findall(row["input"]):
+                if 0 <= int(number) <= 1000:
+                    matches.append(number)
+    return matches
+
+def time_path(label, func, matches, repetitions):
+    """
+    Chronomètre func sur toutes les correspondances, répété N fois
+    """
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        for number in matches:
+            func(number)
+    elapsed = time.perf_counter() - start
+    rate = len(matches) * repetitions / elapsed
+    print(f"  {label:<10} {elapsed:8.3f} s   {rate:12,.0f} correspondances/s")
+    return rate
+
+# ============================================
+# EXÉCUTION
+# ============================================
+
+def main():
+    csv_path = DATASET
+    repetitions = REPETITIONS
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] in ["-r", "--repeat"] and i + 1 < len(args):
+            repetitions = int(args[i + 1])
+            i += 2
+        else:
+            csv_path = Path(args[i])
+            i += 1
+
+    fst = load_fst_from_far(str(FAR_FILE))
+    matches = extract_matches(csv_path)
+
+    start = time.perf_counter()
+    table = build_verbalization_table(fst)
+    build_time = time.perf_counter() - start
+
+    print(f"Dataset: {csv_path} ({len(matches)} nombres, x{repetitions})")
+    print(f"Table construite en {build_time*1000:.1f} ms ({len(table)} entrées)")
+
+    # Vérifier que les deux chemins donnent le même résultat
+    mismatches = [n for n in matches if normalize_number(n, fst, table) != apply_fst(n, fst)]
+    if mismatches:
+        print(f"❌ ERREUR: {len(mismatches)} résultats différents, ex: {mismatches[:5]}", file=sys.stderr)
+        sys.exit(1)
+
+    table_rate = time_path("table", lambda n: normalize_number(n, fst, table), matches, repetitions)
+    fst_rate = time_path("apply_fst", lambda n: apply_fst(n, fst), matches, max(1, repetitions // 10))
+    print(f"Accélération: x{table_rate / fst_rate:.1f}")
+
+if __name__ == "__main__":
+    main()
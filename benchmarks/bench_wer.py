@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark : WER phrase par phrase avec jiwer vs moteur vectorisé (wer_engine)
+Usage: python benchmarks/bench_wer.py [-n PAIRES] [-j PROCESSUS]
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from jiwer import wer
+from wer_engine import compute_wer
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+PAIRS = 50000
+EXACT_RATIO = 0.9  # Part des hypothèses identiques à la référence
+WORDS = ["le", "prix", "est", "de", "vingt-cinq", "euros", "pour", "trois", "chats", "et", "cent", "ans"]
+
+# ============================================
+# EXÉCUTION
+# ============================================
+
+def synthetic_pairs(count, seed=0):
+    """Paires (référence, hypothèse) ; une partie des hypothèses est bruitée"""
+    rng = random.Random(seed)
+    refs, hyps = [], []
+    for _ in range(count):
+        tokens = [rng.choice(WORDS) for _ in range(rng.randint(3, 20))]
+        refs.append(" ".join(tokens))
+        if rng.random() >= EXACT_RATIO:
+            tokens = list(tokens)
+            tokens[rng.randrange(len(tokens))] = rng.choice(WORDS)
+            del tokens[rng.randrange(len(tokens))]
+        hyps.append(" ".join(tokens))
+    return refs, hyps
+
+def main():
+    pairs = PAIRS
+    workers = 1
+    args = sys.argv[1:]
+    for i in range(0, len(args) - 1, 2):
+        if args[i] in ["-n", "--pairs"]:
+            pairs = int(args[i + 1])
+        elif args[i] in ["-j", "--workers"]:
+            workers = int(args[i + 1])
+
+    refs, hyps = synthetic_pairs(pairs)
+    print(f"WER sur {pairs} paires ({EXACT_RATIO:.0%} identiques)")
+
+    start = time.perf_counter()
+    macro = sum(wer(r, h) for r, h in zip(refs, hyps)) / pairs
+    elapsed = time.perf_counter() - start
+    print(f"  {'jiwer (boucle par phrase)':<28} {elapsed:8.3f} s   WER moyen {macro:.6f}")
+
+    start = time.perf_counter()
+    stats, _ = compute_wer(refs, hyps, workers)
+    elapsed = time.perf_counter() - start
+    print(f"  {'wer_engine (-j ' + str(workers) + ')':<28} {elapsed:8.3f} s   WER moyen {stats['sentence_wer']:.6f}"
+          f"   WER corpus {stats['wer']:.6f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Générateur de charge pour le service asyncio (script_async.py)
+Usage: python benchmarks/load_async.py [--spawn] [-c CONNEXIONS] [-n REQUÊTES] [-s SOCKET]
+
+Chaque connexion envoie ses requêtes une par une (attente de la réponse) ;
+on mesure la latence de chaque requête et le débit global.
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from script_async import DEFAULT_ASYNC_SOCKET
+from script_client import decode_message, encode_message
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CONNECTIONS = 32
+REQUESTS_PER_CONNECTION = 200
+TEMPLATES = [
+    "J'ai {} ans et {} chats",
+    "Le billet coûte {} euros.",
+    "Il y a {} personnes dans {} salles",
+]
+
+# ============================================
+# CHARGE
+# ============================================
+
+def percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def client(socket_path, requests, latencies):
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    rng = random.Random()
+    for _ in range(requests):
+        template = rng.choice(TEMPLATES)
+        text = template.format(*(rng.randint(0, 1000) for _ in range(template.count("{}"))))
+        start = time.perf_counter()
+        writer.write(encode_message({"text": text}))
+        await writer.drain()
+        response = decode_message(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+    writer.close()
+
+async def fetch_stats(socket_path):
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    writer.write(encode_message({"stats": True}))
+    await writer.drain()
+    stats = decode_message(await reader.readline())["stats"]
+    writer.close()
+    return stats
+
+async def wait_for_service(socket_path, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            await fetch_stats(socket_path)
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"Le service n'a pas démarré sur {socket_path}")
+
+async def run_load(socket_path, connections, requests):
+    await wait_for_service(socket_path)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(socket_path, requests, latencies) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    stats = await fetch_stats(socket_path)
+
+    latencies.sort()
+    print(f"{connections} connexions x {requests} requêtes = {len(latencies)} requêtes en {elapsed:.2f} s")
+    print(f"  débit : {len(latencies) / elapsed:,.0f} requêtes/s")
+    for p in (50, 95, 99):
+        print(f"  p{p}   : {percentile(latencies, p) * 1000:8.2f} ms")
+    print(f"  stats du service : {json.dumps(stats)}")
+
+# ============================================
+# EXÉCUTION
+# ============================================
+
+def main():
+    socket_path = DEFAULT_ASYNC_SOCKET
+    connections = CONNECTIONS
+    requests = REQUESTS_PER_CONNECTION
+    spawn = False
+    service_args = []
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--spawn":
+            spawn = True
+            i += 1
+            continue
+        value = args[i + 1]
+        if arg in ["-c", "--connections"]:
+            connections = int(value)
+        elif arg in ["-n", "--requests"]:
+            requests = int(value)
+        elif arg in ["-s", "--socket"]:
+            socket_path = value
+        else:
+            # Options transmises au service lancé avec --spawn (--window, --max-batch, -j...)
+            service_args += [arg, value]
+        i += 2
+
+    service = None
+    if spawn:
+        service = subprocess.Popen([sys.executable, "script_async.py", "-s", socket_path] + service_args,
+                                   cwd=ROOT, stderr=subprocess.DEVNULL)
+    try:
+        asyncio.run(run_load(socket_path, connections, requests))
+    finally:
+        if service is not None:
+            service.terminate()
+            service.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Suite de benchmarks : construction, chargement, débit par nombre et par phrase
+Usage: python benchmarks/run_suite.py [-o resultats.json] [--baseline ancien.json] [--quick]
+
+Mesures :
+  1. compilation de la grammaire (fst_00_to_1000, sans cache)
+  2. create_far_archive
+  3. load_fst_from_far
+  4. apply_fst sur les 1001 entrées 0-1000
+  5. normalisation de phrases synthétiques (0 à 16 nombres par phrase), par moteur
+  6. pipeline complet de script_wer.py sur des copies agrandies du dataset
+Les résultats sont écrits en JSON avec les informations machine, pour suivre
+les régressions entre versions de la grammaire et comparer les moteurs.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import tempfile
+import statistics
+import subprocess
+import contextlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pynini
+import Text_Normalisation_Cardinaux_0_a_1000 as grammar
+from fst_loader import clear_cache
+from script import ENGINES, apply_fst, get_normalizer, load_fst_from_far
+from script_sauvegarde import create_far_archive
+from script_wer import ENGINES as WER_ENGINES, calculate_wer_from_csv
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+FAR_FILE = ROOT / "cardinal_numbers.far"
+DATASET = ROOT / "data" / "dataset_normalisation_0_1000.csv"
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+NUMBERS_PER_SENTENCE = [0, 1, 2, 4, 8, 16]
+SENTENCES_PER_CASE = 500
+DATASET_SCALES = [1, 10, 100]
+WORDS = ["le", "prix", "est", "de", "euros", "pour", "chats", "et", "il", "reste", "places", "ans"]
+
+# ============================================
+# OUTILS DE MESURE
+# ============================================
+
+def measure(func, repeat):
+    """Exécute func repeat fois ; retourne les durées (s) min / médiane / moyenne"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return {
+        "runs": repeat,
+        "min_s": min(durations),
+        "median_s": statistics.median(durations),
+        "mean_s": statistics.mean(durations),
+    }
+
+@contextlib.contextmanager
+def quiet():
+    """Masque les affichages des fonctions mesurées"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def machine_info():
+    """Informations machine et versions, pour comparer des résultats entre eux"""
+    cpu_model = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "pynini": pynini.__version__,
+        "cpu_model": cpu_model,
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit,
+        "grammar_hash": grammar.grammar_hash(),
+    }
+
+# ============================================
+# BENCHMARKS
+# ============================================
+
+# Sans cache disque (.grammar_cache) ni memo : chaque exécution compile la grammaire
+
+def bench_grammar_compile(repeat):
+    return measure(lambda: grammar.build_grammar(["fst_00_to_1000"], cache_dir=None), repeat)
+
+def bench_create_far(repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        output = str(Path(tmp) / "bench.far")
+        with quiet():
+            result = measure(lambda: create_far_archive(output, cache_dir=None), repeat)
+        result["far_size_bytes"] = os.path.getsize(output)
+    return result
+
+def bench_load(repeat):
+    def load():
+        clear_cache()
+        load_fst_from_far(str(FAR_FILE))
+    return measure(load, repeat)
+
+def bench_apply_fst(repeat):
+    fst = load_fst_from_far(str(FAR_FILE))
+    inputs = [str(i) for i in range(1001)]
+    result = measure(lambda: [apply_fst(number, fst) for number in inputs], repeat)
+    result["inputs"] = len(inputs)
+    result["numbers_per_s"] = len(inputs) / result["median_s"]
+    return result
+
+def synthetic_sentences(numbers_per_sentence, count, seed=0):
+    """Phrases de 12 mots environ contenant numbers_per_sentence nombres (0-1000)"""
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(count):
+        tokens = [rng.choice(WORDS) for _ in range(max(12, numbers_per_sentence * 2))]
+        for position in rng.sample(range(len(tokens)), numbers_per_sentence):
+            tokens[position] = str(rng.randint(0, 1000))
+        sentences.append(" ".join(tokens))
+    return sentences
+
+def bench_sentences(repeat):
+    results = {}
+    for engine in ENGINES:
+        normalize = get_normalizer(engine, str(FAR_FILE))
+        normalize("0")  # Construction de la table hors chrono
+        results[engine] = {}
+        for k in NUMBERS_PER_SENTENCE:
+            sentences = synthetic_sentences(k, SENTENCES_PER_CASE)
+            result = measure(lambda: [normalize(s) for s in sentences], repeat)
+            result["sentences_per_s"] = len(sentences) / result["median_s"]
+            result["numbers_per_s"] = len(sentences) * k / result["median_s"]
+            results[engine][str(k)] = result
+    return results
+
+def bench_wer_pipeline(repeat, scales):
+    lines = DATASET.read_text(encoding="utf-8").splitlines(keepends=True)
+    header, rows = lines[0], lines[1:]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            csv_path = Path(tmp) / f"dataset_x{scale}.csv"
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write(header)
+                for _ in range(scale):
+                    f.writelines(rows)
+            results[f"x{scale}"] = {}
+            for engine in WER_ENGINES:
+                def pipeline():
+                    with quiet():
+                        calculate_wer_from_csv(str(csv_path), engine=engine, far_path=str(FAR_FILE))
+                result = measure(pipeline, repeat)
+                result["rows"] = len(rows) * scale
+                result["rows_per_s"] = result["rows"] / result["median_s"]
+                results[f"x{scale}"][engine] = result
+    return results
+
+# ============================================
+# COMPARAISON AVEC UNE RÉFÉRENCE
+# ============================================
+
+def _flatten(results, prefix=""):
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict) and "median_s" in value:
+            yield name, value["median_s"]
+        elif isinstance(value, dict):
+            yield from _flatten(value, name)
+
+def compare(results, baseline_path):
+    """Affiche le rapport des médianes (actuel / référence) pour chaque mesure"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = dict(_flatten(json.load(f)["results"]))
+    print(f"\nComparaison avec {baseline_path} (ratio > 1 = plus lent)")
+    for name, median in _flatten(results):
+        if name in baseline and baseline[name] > 0:
+            ratio = median / baseline[name]
+            flag = "  ⚠️" if ratio > 1.10 else ""
+            print(f"  {name:<40} x{ratio:5.2f}{flag}")
+
+# ============================================
+# EXÉCUTION
+# ============================================
+
+def main():
+    output_path = None
+    baseline_path = None
+    quick = False
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] == "--quick":
+            quick = True
+            i += 1
+        elif args[i] in ["-o", "--output", "--baseline"] and i + 1 < len(args):
+            if args[i] == "--baseline":
+                baseline_path = args[i + 1]
+            else:
+                output_path = args[i + 1]
+            i += 2
+        else:
+            print(f"❌ ERREUR: Argument inconnu: {args[i]}", file=sys.stderr)
+            sys.exit(1)
+
+    if not FAR_FILE.exists():
+        print(f"❌ ERREUR: Le fichier FAR '{FAR_FILE}' n'existe pas.", file=sys.stderr)
+        sys.exit(1)
+
+    repeat = 1 if quick else 5
+    steps = [
+        ("grammar_compile", lambda: bench_grammar_compile(repeat)),
+        ("create_far_archive", lambda: bench_create_far(1)),
+        ("load_fst_from_far", lambda: bench_load(repeat * 4)),
+        ("apply_fst_0_1000", lambda: bench_apply_fst(repeat)),
+        ("normalize_sentences", lambda: bench_sentences(repeat)),
+        ("wer_pipeline", lambda: bench_wer_pipeline(1 if quick else 3, DATASET_SCALES[:2] if quick else DATASET_SCALES)),
+    ]
+
+    results = {}
+    for name, step in steps:
+        print(f"⏱  {name}...", flush=True)
+        results[name] = step()
+
+    report = {"machine": machine_info(), "results": results}
+    if output_path is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        output_path = RESULTS_DIR / f"bench_{report['machine']['grammar_hash']}_{stamp}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Résultats sauvegardés dans: {output_path}")
+
+    for name, median in _flatten(results):
+        print(f"  {name:<40} {median * 1000:10.2f} ms")
+
+    if baseline_path:
+        compare(results, baseline_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Lecture des datasets d'évaluation et écriture des résultats : CSV, Parquet, Arrow IPC
+- format choisi par l'extension du fichier
+- lecture colonnaire : seules les colonnes demandées sont lues, Parquet et Arrow
+  en mémoire mappée (un fichier Arrow IPC est lu sans copie)
+- écriture en flux : un groupe de lignes (row group / record batch) par appel à write,
+  la mémoire ne dépend pas de la taille des résultats
+pyarrow n'est nécessaire que pour Parquet et Arrow ; le CSV passe par pandas.
+"""
+
+from pathlib import Path
+
+from lazy_modules import lazy_import
+
+# Importés au premier usage ; sans pyarrow (None), seul le CSV est disponible
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Extension -> format
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+# Lignes par groupe écrit par save_results (Parquet : row group, Arrow : record batch)
+DEFAULT_ROW_GROUP_ROWS = 100_000
+
+class DatasetFormatError(Exception):
+    """Extension inconnue, ou format colonnaire demandé sans pyarrow."""
+
+# ============================================
+# FORMAT
+# ============================================
+
+def file_format(path):
+    """Format d'un fichier d'après son extension ("csv", "parquet" ou "arrow")"""
+    suffix = Path(path).suffix.lower()
+    if suffix not in FORMATS:
+        raise DatasetFormatError(f"Extension inconnue: '{suffix}' (choix: {', '.join(FORMATS)})")
+    file_type = FORMATS[suffix]
+    if file_type != "csv" and pa is None:
+        raise DatasetFormatError(f"pyarrow n'est pas installé : le format {file_type} est indisponible")
+    return file_type
+
+def _open_arrow(path):
+    """Table d'un fichier Arrow IPC (format fichier ou flux) en mémoire mappée, sans copie"""
+    source = pa.memory_map(str(path), "r")
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source).read_all()
+
+def dataset_columns(path):
+    """Colonnes d'un dataset, lues dans l'en-tête ou le schéma seulement"""
+    file_type = file_format(path)
+    if file_type == "csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    if file_type == "parquet":
+        return pq.read_schema(str(path)).names
+    return _open_arrow(path).schema.names
+
+# ============================================
+# LECTURE
+# ============================================
+
+def read_dataset(path, columns):
+    """
+    Lit les colonnes demandées d'un dataset (les colonnes absentes sont ignorées)
+    Retourne un DataFrame.
+    """
+    file_type = file_format(path)
+    if file_type == "csv":
+        return pd.read_csv(path, usecols=lambda column: column in columns)
+    present = [column for column in columns if column in dataset_columns(path)]
+    if file_type == "parquet":
+        table = pq.read_table(str(path), columns=present, memory_map=True)
+    else:
+        table = _open_arrow(path).select(present)
+    return table.to_pandas()
+
+def iter_dataset(path, columns, chunk_rows):
+    """
+    Lit un dataset par morceaux de chunk_rows lignes (DataFrames des colonnes demandées)
+    Parquet : lecture par lots ; Arrow : tranches sans copie de la table mappée.
+    """
+    file_type = file_format(path)
+    if file_type == "csv":
+        yield from pd.read_csv(path, usecols=lambda column: column in columns, chunksize=chunk_rows)
+        return
+    present = [column for column in columns if column in dataset_columns(path)]
+    if file_type == "parquet":
+        parquet_file = pq.ParquetFile(str(path), memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=present):
+            yield batch.to_pandas()
+        return
+    table = _open_arrow(path).select(present)
+    for offset in range(0, table.num_rows, chunk_rows):
+        yield table.slice(offset, chunk_rows).to_pandas()
+
+# ============================================
+# ÉCRITURE EN FLUX
+# ============================================
+
+class ResultWriter:
+    """
+    Écrit un fichier de résultats morceau par morceau (CSV, Parquet ou Arrow IPC)
+    Le fichier est créé au premier write ; chaque write ajoute un groupe de lignes.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.file_type = file_format(path)
+        self.writer = None
+        self.rows = 0
+
+    def write(self, frame):
+        """Ajoute les lignes d'un DataFrame (mêmes colonnes à chaque appel)"""
+        if self.file_type == "csv":
+            frame.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        else:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.writer is None:
+                if self.file_type == "parquet":
+                    self.writer = pq.ParquetWriter(str(self.path), table.schema)
+                else:
+                    self.writer = pa.ipc.new_file(str(self.path), table.schema)
+            self.writer.write_table(table)
+        self.rows += len(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Transducteur en tableaux NumPy, utilisable sans pynini
+Usage: python fst_array.py [-f FAR] [-n NOM] [-o SORTIE.npz | -o DOSSIER] [--no-verify]
+
+- export : entrée du FAR -> transducteur séquentiel (déterminisé sur l'entrée,
+  les ambiguïtés sont levées comme le ferait shortestpath) -> tableaux d'états,
+  d'étiquettes d'entrée, d'états suivants et de sorties (offsets)
+- sauvegarde en .npz, ou en dossier de fichiers .npy lisibles en mmap
+- application en une seule passe gauche-droite, sans composition
+L'export nécessite pynini ; le chargement et l'application seulement NumPy.
+CARDINAL s'exporte en quelques secondes ; CARDINAL_LARGE n'est pas exportable
+(sa sortie dépend du nombre total de chiffres, voir MAX_STATES).
+"""
+
+import sys
+import random
+from bisect import bisect_left
+from pathlib import Path
+
+from lazy_modules import lazy_import
+
+np = lazy_import("numpy")
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+FAR_FILE = "cardinal_numbers.far"
+FST_NAME = "CARDINAL"
+
+# Tableaux d'un transducteur exporté
+#   state_offsets : arcs de l'état s = [state_offsets[s], state_offsets[s + 1]), triés par étiquette
+#   ilabels, next_states : étiquette d'entrée et état suivant de chaque arc
+#   out_offsets, out_labels : sortie de l'arc a = out_labels[out_offsets[a]:out_offsets[a + 1]]
+#   final_offsets, final_labels : sortie émise en fin d'entrée (états finals)
+#   is_final, start, token_type
+ARRAY_NAMES = ("state_offsets", "ilabels", "next_states", "out_offsets", "out_labels",
+               "final_offsets", "final_labels", "is_final", "start", "token_type")
+
+def export_path(far_path=FAR_FILE, fst_name=FST_NAME):
+    """Chemin par défaut de l'export d'une entrée du FAR (à côté du FAR)"""
+    far_path = Path(far_path)
+    return far_path.with_name(f"{far_path.stem}.{fst_name}.npz")
+
+# ============================================
+# APPLICATION (NUMPY SEULEMENT)
+# ============================================
+
+def _labels(text, token_type):
+    """Étiquettes d'une chaîne : points de code (utf8) ou octets (byte)"""
+    if token_type == "byte":
+        return list(text.encode("utf-8"))
+    return [ord(char) for char in text]
+
+def _text(labels, token_type):
+    if token_type == "byte":
+        return bytes(labels).decode("utf-8")
+    return "".join(map(chr, labels))
+
+class ArrayTransducer:
+    """Transducteur séquentiel en tableaux NumPy, appliqué sans pynini"""
+
+    def __init__(self, arrays):
+        missing = [name for name in ARRAY_NAMES if name not in arrays]
+        if missing:
+            raise ValueError(f"Tableaux manquants: {', '.join(missing)}")
+        self.arrays = arrays
+        # Copies en listes Python pour le parcours : un accès à un scalaire NumPy
+        # coûte plus cher que la recherche elle-même (tables de quelques milliers d'arcs)
+        self.state_offsets = arrays["state_offsets"].tolist()
+        self.ilabels = arrays["ilabels"].tolist()
+        self.next_states = arrays["next_states"].tolist()
+        self.out_offsets = arrays["out_offsets"].tolist()
+        self.out_labels = arrays["out_labels"].tolist()
+        self.final_offsets = arrays["final_offsets"].tolist()
+        self.final_labels = arrays["final_labels"].tolist()
+        self.is_final = arrays["is_final"].tolist()
+        self.start = int(arrays["start"])
+        self.token_type = str(arrays["token_type"])
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """
+        Lit un export .npz, ou un dossier de fichiers .npy
+        mmap: lit les .npy par projection en mémoire (pas de copie à la lecture ;
+        les listes du parcours restent propres à chaque processus)
+        """
+        path = Path(path)
+        if path.is_dir():
+            mmap_mode = "r" if mmap else None
+            return cls({name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in ARRAY_NAMES})
+        with np.load(path) as data:
+            return cls({name: data[name] for name in ARRAY_NAMES})
+
+    def save(self, path):
+        """Écrit un .npz (chemin en .npz) ou un dossier de fichiers .npy"""
+        path = Path(path)
+        if path.suffix == ".npz":
+            np.savez(path, **self.arrays)
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(path / f"{name}.npy", self.arrays[name])
+
+    def apply(self, text):
+        """Retourne la sortie du transducteur pour text, ou None si l'entrée est rejetée"""
+        state = self.start
+        output = []
+        for label in _labels(text, self.token_type):
+            hi = self.state_offsets[state + 1]
+            arc = bisect_left(self.ilabels, label, self.state_offsets[state], hi)
+            if arc == hi or self.ilabels[arc] != label:
+                return None
+            output.extend(self.out_labels[self.out_offsets[arc]:self.out_offsets[arc + 1]])
+            state = self.next_states[arc]
+        if not self.is_final[state]:
+            return None
+        output.extend(self.final_labels[self.final_offsets[state]:self.final_offsets[state + 1]])
+        return _text(output, self.token_type)
+
+    def num_states(self):
+        return len(self.state_offsets) - 1
+
+    def num_arcs(self):
+        return len(self.ilabels)
+
+# ============================================
+# EXPORT (NÉCESSITE PYNINI)
+# ============================================
+
+# Longueur maximale d'une sortie en attente pendant la déterminisation
+MAX_PENDING_OUTPUT = 256
+
+# Nombre maximal d'états exportés : au-delà, la sortie dépend de trop loin dans
+# l'entrée (ex: CARDINAL_LARGE, où "1" ne s'écrit qu'une fois le nombre de chiffres connu)
+MAX_STATES = 100_000
+
+def _epsilon_closure(pairs, arcs):
+    """Ajoute les (état, sortie en attente) atteignables par des arcs epsilon en entrée"""
+    closure = set(pairs)
+    stack = list(pairs)
+    while stack:
+        state, pending = stack.pop()
+        for arc in arcs[state]:
+            if arc.ilabel == 0:
+                pair = (arc.nextstate, pending + (arc.olabel,) if arc.olabel else pending)
+                if len(pair[1]) > MAX_PENDING_OUTPUT:
+                    raise ValueError("Cycle epsilon en entrée : FST non exportable")
+                if pair not in closure:
+                    closure.add(pair)
+                    stack.append(pair)
+    return closure
+
+def _common_prefix(outputs):
+    prefix = min(outputs)
+    for output in outputs:
+        length = 0
+        while length < len(prefix) and length < len(output) and prefix[length] == output[length]:
+            length += 1
+        prefix = prefix[:length]
+    return prefix
+
+def export_fst(fst, token_type="utf8"):
+    """
+    Convertit un FST (pynini ou ConstFst) en ArrayTransducer
+
+    Déterminisation sur l'entrée par sous-ensembles : chaque état du transducteur
+    exporté est un ensemble (état d'origine, sortie en attente) ; la sortie commune
+    est émise dès que possible. Si une entrée a plusieurs sorties (FST non
+    fonctionnel), on garde celle que shortestpath choisit sur le FST d'origine.
+    Lève ValueError si le FST ne peut pas être rendu séquentiel.
+    """
+    import pynini
+    import pywrapfst
+
+    original = pynini.Fst.from_pywrapfst(pywrapfst.convert(fst, "vector"))
+    zero = pywrapfst.Weight.zero(original.weight_type())
+    arcs = {state: list(original.arcs(state)) for state in original.states()}
+    final = {state for state in original.states() if original.final(state) != zero}
+
+    start = frozenset(_epsilon_closure({(original.start(), ())}, arcs))
+    ids = {start: 0}
+    subsets = [start]
+    access = [((), ())]  # entrée la plus courte menant à chaque état, et sa sortie
+    state_offsets, ilabels, next_states, out_offsets, out_labels = [0], [], [], [0], []
+    final_offsets, final_labels, is_final = [0], [], []
+
+    for state_id, subset in enumerate(subsets):
+        targets = {}
+        for state, pending in subset:
+            for arc in arcs[state]:
+                if arc.ilabel:
+                    pair = (arc.nextstate, pending + (arc.olabel,) if arc.olabel else pending)
+                    targets.setdefault(arc.ilabel, set()).add(pair)
+
+        for label in sorted(targets):
+            closure = _epsilon_closure(targets[label], arcs)
+            prefix = _common_prefix([pending for _, pending in closure])
+            target = frozenset((state, pending[len(prefix):]) for state, pending in closure)
+            if max(len(pending) for _, pending in target) > MAX_PENDING_OUTPUT:
+                raise ValueError("Sortie en attente non bornée : FST non séquentiel")
+            if target not in ids:
+                if len(subsets) >= MAX_STATES:
+                    raise ValueError(f"Plus de {MAX_STATES} états : FST trop ambigu sur l'entrée pour être exporté")
+                ids[target] = len(subsets)
+                subsets.append(target)
+                inputs, outputs = access[state_id]
+                access.append((inputs + (label,), outputs + prefix))
+            ilabels.append(label)
+            next_states.append(ids[target])
+            out_labels.extend(prefix)
+            out_offsets.append(len(out_labels))
+        state_offsets.append(len(ilabels))
+
+        # Sortie de fin d'entrée
+        candidates = {pending for state, pending in subset if state in final}
+        if len(candidates) > 1:
+            inputs, outputs = access[state_id]
+            text = pynini.escape(_text(inputs, token_type))
+            lattice = pynini.accep(text, token_type=token_type) @ original
+            expected = tuple(_labels(pynini.shortestpath(lattice).string(token_type), token_type))
+            candidates = {pending for pending in candidates if outputs + pending == expected}
+            if len(candidates) != 1:
+                raise ValueError(f"Entrée {_text(inputs, token_type)!r} : sortie ambiguë, FST non séquentiel")
+        is_final.append(bool(candidates))
+        final_labels.extend(candidates.pop() if candidates else ())
+        final_offsets.append(len(final_labels))
+
+    return ArrayTransducer({
+        "state_offsets": np.array(state_offsets, dtype=np.int32),
+        "ilabels": np.array(ilabels, dtype=np.int32),
+        "next_states": np.array(next_states, dtype=np.int32),
+        "out_offsets": np.array(out_offsets, dtype=np.int32),
+        "out_labels": np.array(out_labels, dtype=np.int32),
+        "final_offsets": np.array(final_offsets, dtype=np.int32),
+        "final_labels": np.array(final_labels, dtype=np.int32),
+        "is_final": np.array(is_final, dtype=bool),
+        "start": np.array(0, dtype=np.int32),
+        "token_type": np.array(token_type),
+    })
+
+def verification_inputs(fst_name, sample=20000, seed=0):
+    """
+    Entrées de vérification : toutes les chaînes de 1 à 4 chiffres (toutes les entrées
+    de CARDINAL), plus un échantillon aléatoire jusqu'à 12 chiffres pour les autres FSTs
+    """
+    inputs = [f"{i:0{digits}d}" for digits in range(1, 5) for i in range(10 ** digits)]
+    if fst_name != FST_NAME:
+        rng = random.Random(seed)
+        inputs += [str(rng.randrange(10 ** rng.randint(5, 12))) for _ in range(sample)]
+    return inputs
+
+def verify(transducer, fst, inputs):
+    """
+    Compare ArrayTransducer.apply à la composition pynini (shortestpath) sur inputs
+    Retourne la liste des écarts (entrée, attendu, obtenu).
+    """
+    import pynini
+    from fst_loader import as_mutable
+
+    fst = as_mutable(fst)
+    mismatches = []
+    for text in inputs:
+        lattice = pynini.accep(text, token_type=transducer.token_type) @ fst
+        expected = None
+        if lattice.num_states():
+            expected = pynini.shortestpath(lattice).string(transducer.token_type)
+        result = transducer.apply(text)
+        if result != expected:
+            mismatches.append((text, expected, result))
+    return mismatches
+
+# ============================================
+# INTERFACE EN LIGNE DE COMMANDE
+# ============================================
+
+def print_usage():
+    """Affiche l'aide d'utilisation"""
+    print("Usage:")
+    print(f"  python {sys.argv[0]} [options]")
+    print()
+    print("Options:")
+    print(f"  -h, --help         Affiche cette aide")
+    print(f"  -f, --file FAR     Fichier FAR (défaut: {FAR_FILE})")
+    print(f"  -n, --name NOM     Entrée du FAR à exporter (défaut: {FST_NAME})")
+    print(f"  -o, --output PATH  Fichier .npz, ou dossier de .npy lisibles en mmap")
+    print(f"                     (défaut: <FAR>.<NOM>.npz à côté du FAR)")
+    print(f"  --no-verify        Ne compare pas le résultat à la composition pynini")
+
+def main():
+    """Point d'entrée principal"""
+    far_path = FAR_FILE
+    fst_name = FST_NAME
+    output_path = None
+    check = True
+
+    args = sys.argv[1:]
+    if args and args[0] in ["-h", "--help"]:
+        print_usage()
+        sys.exit(0)
+
+    i = 0
+    while i < len(args):
+        if args[i] == "--no-verify":
+            check = False
+            i += 1
+        elif args[i] in ["-f", "--file", "-n", "--name", "-o", "--output"] and i + 1 < len(args):
+            if args[i] in ["-f", "--file"]:
+                far_path = args[i + 1]
+            elif args[i] in ["-n", "--name"]:
+                fst_name = args[i + 1]
+            else:
+                output_path = args[i + 1]
+            i += 2
+        else:
+            print(f"❌ ERREUR: Argument inconnu: {args[i]}", file=sys.stderr)
+            print_usage()
+            sys.exit(1)
+
+    from fst_loader import FstLoadError, load_fst
+
+    try:
+        fst = load_fst(far_path, fst_name)
+    except FstLoadError as e:
+        print(f"❌ ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"🔧 Export de '{fst_name}' ({far_path})...")
+    try:
+        transducer = export_fst(fst)
+    except ValueError as e:
+        print(f"❌ ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"✓ {transducer.num_states()} états, {transducer.num_arcs()} arcs")
+
+    if check:
+        inputs = verification_inputs(fst_name)
+        print(f"🔍 Vérification sur {len(inputs)} entrées...")
+        mismatches = verify(transducer, fst, inputs)
+        if mismatches:
+            for text, expected, result in mismatches[:10]:
+                print(f"  ✗ {text!r}: attendu {expected!r}, obtenu {result!r}", file=sys.stderr)
+            print(f"❌ ERREUR: {len(mismatches)} écarts avec la composition pynini", file=sys.stderr)
+            sys.exit(1)
+        print("✓ Résultats identiques à la composition pynini")
+
+    output_path = output_path or export_path(far_path, fst_name)
+    transducer.save(output_path)
+    print(f"💾 Export sauvegardé dans: {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Normalisation inverse (ITN) : nombres en lettres -> chiffres
+- lexique dérivé de la grammaire : la table de verbalisation du FST CARDINAL
+  ({chiffres: texte}, 0-1000) est inversée
+- trie sur les mots : "deux-cent-cinquante-trois" et "deux cent cinquante-trois"
+  suivent le même chemin (espace et trait d'union sont équivalents)
+- balayage en une passe : à chaque mot qui peut commencer un nombre, on descend
+  dans le trie et on remplace la plus longue suite de mots qui forme un nombre
+- un nombre qui se prolonge au-delà de ITN_MAX ("deux mille", "trois millions")
+  est laissé tel quel, comme "un"/"une" seul (article) hors contexte numérique
+Ce module ne dépend pas de pynini : la table peut venir du FST (fst_table.py)
+ou de l'export NumPy (fst_array.py).
+"""
+
+import re
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Plage couverte par le lexique (celle du FST CARDINAL)
+ITN_MAX = 1000
+
+# Mots d'un texte, et séparateurs admis entre deux mots d'un même nombre
+WORD_PATTERN = re.compile(r"\w+")
+NUMBER_SEPARATOR = re.compile(r"[ \t-]+")
+
+# Mots qui prolongent un nombre au-delà de ITN_MAX : la suite entière reste en lettres
+SCALE_WORDS = {"mille", "milles", "million", "millions", "milliard", "milliards", "billion", "billions"}
+
+# "un"/"une" seuls sont des articles ("un chat"), sauf s'ils forment tout le texte,
+# suivent un de NUMERAL_BEFORE ("page un") ou précèdent une unité ("un an")
+ARTICLE_WORDS = {"un", "une"}
+NUMERAL_BEFORE = {"numéro", "page", "chapitre", "article", "tome", "volume", "plus", "moins", "fois", "égal"}
+NUMERAL_UNITS = {"an", "heure", "minute", "seconde", "jour", "semaine", "mois", "euro", "centime", "dollar",
+                 "franc", "mètre", "kilomètre", "kilo", "kilogramme", "gramme", "litre"}
+
+# Clé du trie qui porte les chiffres d'un nombre complet (aucun mot n'est vide)
+_DIGITS = ""
+
+# ============================================
+# LEXIQUE ET TRIE
+# ============================================
+
+def build_itn_lexicon(table):
+    """
+    Inverse une table de verbalisation {chiffres: texte} en {(mot, ...): chiffres}
+    Seules les formes canoniques sont gardées : pas de zéro initial ("09"),
+    valeur au plus ITN_MAX.
+    """
+    lexicon = {}
+    for number_str, text in table.items():
+        if not number_str.isdigit() or str(int(number_str)) != number_str or int(number_str) > ITN_MAX:
+            continue
+        words = tuple(NUMBER_SEPARATOR.split(text.strip().lower()))
+        lexicon.setdefault(words, number_str)
+    return lexicon
+
+def build_itn_trie(table):
+    """Construit le trie (dictionnaires imbriqués, un niveau par mot) d'une table de verbalisation"""
+    trie = {}
+    for words, number_str in build_itn_lexicon(table).items():
+        node = trie
+        for word in words:
+            node = node.setdefault(word, {})
+        node[_DIGITS] = number_str
+    return trie
+
+# ============================================
+# BALAYAGE
+# ============================================
+
+def _connected(text, words, j):
+    """Le mot j+1 existe et n'est séparé du mot j que par des espaces ou traits d'union"""
+    return j + 1 < len(words) and NUMBER_SEPARATOR.fullmatch(text, words[j].end(), words[j + 1].start())
+
+def _out_of_range_end(text, words, end, trie):
+    """
+    Dernier mot du nombre si la correspondance qui finit au mot end se prolonge
+    au-delà de ITN_MAX ("deux" dans "deux mille trois"), None sinon
+    """
+    last = words[end].group().lower()
+    if not _connected(text, words, end):
+        return None
+    following = words[end + 1].group().lower()
+    if following not in SCALE_WORDS and not (last in SCALE_WORDS and following in trie):
+        return None
+    # Toute la suite de mots de nombre reste en lettres
+    while _connected(text, words, end) and (words[end + 1].group().lower() in trie
+                                           or words[end + 1].group().lower() in SCALE_WORDS):
+        end += 1
+    return end
+
+def _is_article(text, words, i):
+    """Le mot i ("un", "une") est un article et non un nombre"""
+    if words[i].group().lower() not in ARTICLE_WORDS or len(words) == 1:
+        return False
+    if i > 0 and words[i - 1].group().lower() in NUMERAL_BEFORE:
+        return False
+    return not (_connected(text, words, i) and words[i + 1].group().lower() in NUMERAL_UNITS)
+
+def inverse_normalize(text, trie):
+    """
+    Remplace les nombres écrits en lettres par leurs chiffres
+    ("deux cent cinquante-trois euros" -> "253 euros")
+    Chaque mot n'est lu qu'une fois par le trie, sauf après une correspondance
+    partielle ("vingt et" sans "un" : on reprend au mot suivant "vingt").
+    Hors plage ("deux mille euros") et articles ("un chat") : texte inchangé.
+    """
+    words = list(WORD_PATTERN.finditer(text))
+    pieces = []
+    position = 0
+    i = 0
+    while i < len(words):
+        node = trie.get(words[i].group().lower())
+        if node is None:
+            i += 1
+            continue
+
+        # Plus longue suite de mots qui forme un nombre
+        best = None
+        j = i
+        while True:
+            if _DIGITS in node:
+                best = (j, node[_DIGITS])
+            if not _connected(text, words, j):
+                break
+            node = node.get(words[j + 1].group().lower())
+            if node is None:
+                break
+            j += 1
+
+        if best is None:
+            i += 1
+            continue
+        end, number_str = best
+        out_of_range_end = _out_of_range_end(text, words, end, trie)
+        if out_of_range_end is not None:
+            i = out_of_range_end + 1
+            continue
+        if end == i and _is_article(text, words, i):
+            i += 1
+            continue
+        pieces.append(text[position:words[i].start()])
+        pieces.append(number_str)
+        position = words[end].end()
+        i = end + 1
+
+    pieces.append(text[position:])
+    return "".join(pieces)
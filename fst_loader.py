@@ -0,0 +1,487 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Chargement partagé des FSTs depuis un fichier FAR
+- cache par processus, indexé par (chemin, nom, mtime)
+- conversion en ConstFst trié sur les étiquettes d'entrée (adapté à la composition)
+- lecture en mémoire partagée (mmap) : les processus forkés partagent les pages
+- rechargement à chaud (ReloadableFar) : FAR surveillé, nouvelle version validée
+  en arrière-plan puis activée d'un bloc
+- variantes régionales (fr-FR, fr-BE, fr-CH) : entrées distinctes du même FAR,
+  seule celle de la locale choisie est lue, au premier accès
+"""
+
+import os
+import sys
+import time
+import ctypes
+import glob
+import hashlib
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from instrumentation import metrics
+from lazy_modules import lazy_import
+
+# Importés au premier usage ; None sans pynini : seules les constantes et FstLoadError
+# sont alors utilisables (le moteur "array" de script.py lit les exports de fst_array.py)
+pynini = lazy_import("pynini")
+pywrapfst = lazy_import("pywrapfst")
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Type de FST retourné par défaut : "const" (lecture seule, compact) ou "vector"
+DEFAULT_FST_TYPE = "const"
+
+# Variable d'environnement qui active le mode mmap par défaut.
+# Elle est héritée par les processus du pool (fork ou spawn).
+MMAP_ENV_VAR = "FST_LOADER_MMAP"
+
+# Dossier (à côté du FAR) des FSTs exportés pour la lecture mmap
+MMAP_CACHE_DIR = ".fst_cache"
+
+# Variantes régionales de la grammaire. Les entrées de la variante par défaut
+# gardent leur nom (CARDINAL...) ; les autres sont suffixées (CARDINAL_fr-CH...).
+LOCALES = ["fr-FR", "fr-BE", "fr-CH"]
+DEFAULT_LOCALE = "fr-FR"
+
+# Variable d'environnement de la locale (--locale), héritée par les processus du pool
+LOCALE_ENV_VAR = "NORMALIZER_LOCALE"
+
+# FSTs déjà chargés dans ce processus
+_FST_CACHE = {}
+
+class FstLoadError(Exception):
+    """Le FAR ou le FST demandé est introuvable ou illisible."""
+
+# ============================================
+# VARIANTES RÉGIONALES
+# ============================================
+
+def current_locale():
+    """Locale choisie pour ce processus (variable NORMALIZER_LOCALE, sinon DEFAULT_LOCALE)"""
+    return os.environ.get(LOCALE_ENV_VAR) or DEFAULT_LOCALE
+
+def far_entry_name(fst_name, locale=None):
+    """Nom de l'entrée du FAR pour une variante (locale None = current_locale())"""
+    if locale is None:
+        locale = current_locale()
+    if locale not in LOCALES:
+        raise FstLoadError(f"Locale inconnue: {locale} (choix: {', '.join(LOCALES)})")
+    return fst_name if locale == DEFAULT_LOCALE else f"{fst_name}_{locale}"
+
+# ============================================
+# FLAGS OPENFST (MMAP)
+# ============================================
+
+# Symboles de SetFlags connus (nom C++ décoré -> arguments), selon la version
+# d'OpenFst. Un symbole absent ou d'une autre signature n'est jamais appelé.
+SET_FLAGS_SYMBOLS = {
+    # void SetFlags(const char *usage, int *argc, char ***argv, bool remove_flags, const char *src)
+    "_Z8SetFlagsPKcPiPPPcbS0_": [ctypes.c_char_p, ctypes.POINTER(ctypes.c_int), ctypes.c_void_p,
+                                  ctypes.c_bool, ctypes.c_char_p],
+}
+
+_set_flags = None
+
+def _find_set_flags():
+    """SetFlags de libfst (bibliothèques de pynini, puis celle du système), None si introuvable"""
+    libs_dir = Path(pynini.__file__).resolve().parent.parent / "pynini.libs"
+    for candidate in glob.glob(str(libs_dir / "libfst-*.so*")) + ["libfst.so"]:
+        try:
+            library = ctypes.CDLL(candidate)
+        except OSError:
+            continue
+        for symbol, argtypes in SET_FLAGS_SYMBOLS.items():
+            func = getattr(library, symbol, None)
+            if func is not None:
+                func.argtypes = argtypes
+                func.restype = None
+                return func
+    return None
+
+def _set_flags_available():
+    """SetFlags de libfst trouvé ? Cherché une fois par processus ; l'absence est signalée une fois."""
+    global _set_flags
+    if _set_flags is None:
+        _set_flags = _find_set_flags() or False
+        if not _set_flags:
+            print("⚠️ SetFlags d'OpenFst introuvable : lecture classique (sans mmap) des FSTs exportés",
+                  file=sys.stderr)
+    return bool(_set_flags)
+
+def mmap_read_mode():
+    """
+    Mode de lecture réellement utilisé pour les FSTs exportés avec mmap :
+    "map" (projection en mémoire) ou "read" (SetFlags introuvable : lecture classique)
+    """
+    return "map" if _set_flags_available() else "read"
+
+def _openfst_set_flags(*flags):
+    """
+    Positionne des flags globaux d'OpenFst (ex: --fst_read_mode=map)
+    pywrapfst ne les expose pas : on appelle SetFlags de libfst via ctypes.
+    Retourne False si la bibliothèque ou le symbole n'est pas trouvé (signalé une fois).
+    """
+    if not _set_flags_available():
+        return False
+
+    args = [b"fst_loader"] + [flag.encode("ascii") for flag in flags]
+    argc = ctypes.c_int(len(args))
+    argv = (ctypes.c_char_p * (len(args) + 1))(*args, None)
+    argv_ptr = ctypes.pointer(argv)
+    _set_flags(b"fst_loader", ctypes.byref(argc), ctypes.cast(ctypes.pointer(argv_ptr), ctypes.c_void_p),
+               True, b"")
+    return True
+
+# ============================================
+# LECTURE DU FAR
+# ============================================
+
+def _read_from_far(far_path, fst_name):
+    """Lit une entrée du FAR (copie mutable)."""
+    if not Path(far_path).exists():
+        raise FstLoadError(f"Le fichier FAR '{far_path}' n'existe pas.")
+    try:
+        far_reader = pynini.Far(str(far_path), mode="r")
+    except Exception as e:
+        raise FstLoadError(f"Lecture du FAR '{far_path}' impossible: {e}")
+    try:
+        return far_reader[fst_name]
+    except KeyError:
+        raise FstLoadError(f"Le FST '{fst_name}' n'existe pas dans le FAR '{far_path}'.")
+    finally:
+        far_reader.close()
+
+def _prepare(fst, fst_type):
+    """Trie les arcs sur l'entrée et convertit au type demandé."""
+    fst = fst.copy().arcsort("ilabel")
+    if fst_type == "vector":
+        return fst
+    return pywrapfst.convert(fst, fst_type)
+
+def _mmap_path(far_path, fst_name, mtime_ns):
+    far_path = Path(far_path)
+    return far_path.parent / MMAP_CACHE_DIR / f"{far_path.stem}.{fst_name}.{mtime_ns}.const.fst"
+
+def _evict_stale_exports(far_path, fst_name, mtime_ns):
+    """Supprime les exports du même FST issus d'une version précédente du FAR (autre mtime)"""
+    path = _mmap_path(far_path, fst_name, mtime_ns)
+    prefix = f"{Path(far_path).stem}.{fst_name}."
+    for stale in path.parent.glob(f"{prefix}*.const.fst"):
+        if stale != path and stale.name[len(prefix):-len(".const.fst")].isdigit():
+            try:
+                # Un processus qui l'a déjà projeté garde ses pages
+                stale.unlink()
+            except OSError:
+                pass
+
+def _load_mmap(far_path, fst_name, mtime_ns):
+    """
+    Lit le FST en ConstFst projeté en mémoire (mmap)
+    Au premier appel, le FST est exporté (aligné) dans .fst_cache/ à côté du FAR.
+    """
+    path = _mmap_path(far_path, fst_name, mtime_ns)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        const_fst = _prepare(_read_from_far(far_path, fst_name), "const")
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        _openfst_set_flags("--fst_align=true")
+        try:
+            const_fst.write(str(tmp_path))
+        finally:
+            _openfst_set_flags("--fst_align=false")
+        os.replace(tmp_path, path)
+        _evict_stale_exports(far_path, fst_name, mtime_ns)
+
+    if not _openfst_set_flags("--fst_read_mode=map"):
+        # Flags inaccessibles : lecture classique du fichier exporté
+        return pywrapfst.Fst.read(str(path))
+    try:
+        return pywrapfst.Fst.read(str(path))
+    finally:
+        _openfst_set_flags("--fst_read_mode=read")
+
+def load_fst(far_path, fst_name, fst_type=DEFAULT_FST_TYPE, mmap=None):
+    """
+    Charge un FST depuis un FAR, une seule fois par processus
+
+    Le cache est indexé par (chemin, nom, mtime) : un FAR régénéré est relu.
+    fst_type: "const" (par défaut) ou "vector" ; les arcs sont triés sur l'entrée.
+    mmap: lecture projetée en mémoire (implique "const") ; None = variable FST_LOADER_MMAP.
+    Lève FstLoadError si le FAR ou le FST est introuvable, ou si pynini n'est pas installé.
+    """
+    if pynini is None:
+        raise FstLoadError("pynini n'est pas installé : seuls les exports de fst_array.py sont lisibles.")
+    if mmap is None:
+        mmap = os.environ.get(MMAP_ENV_VAR, "") not in ("", "0")
+    if mmap:
+        fst_type = "const"
+
+    far_path = os.path.abspath(far_path)
+    try:
+        mtime_ns = os.stat(far_path).st_mtime_ns
+    except OSError:
+        raise FstLoadError(f"Le fichier FAR '{far_path}' n'existe pas.")
+
+    key = (far_path, fst_name, mtime_ns, fst_type, mmap)
+    fst = _FST_CACHE.get(key)
+    if fst is None:
+        if mmap:
+            fst = _load_mmap(far_path, fst_name, mtime_ns)
+        else:
+            fst = _prepare(_read_from_far(far_path, fst_name), fst_type)
+        _FST_CACHE[key] = fst
+    return fst
+
+def load_variant(far_path, fst_name, locale=None, fst_type=DEFAULT_FST_TYPE, mmap=None):
+    """
+    Registre des variantes : charge l'entrée fst_name de la variante locale
+    (None = current_locale()) au premier accès, puis la sert depuis le cache de load_fst.
+    Les entrées des autres variantes ne sont ni lues ni gardées en mémoire.
+    """
+    entry = far_entry_name(fst_name, locale)
+    try:
+        return load_fst(far_path, entry, fst_type, mmap)
+    except FstLoadError as e:
+        if entry == fst_name:
+            raise
+        raise FstLoadError(f"{e} (FAR généré sans cette variante ?)")
+
+def clear_cache():
+    """Vide le cache des FSTs chargés dans ce processus."""
+    _FST_CACHE.clear()
+
+# ============================================
+# APPLICATION
+# ============================================
+
+def as_mutable(fst):
+    """Retourne un pynini.Fst (copie mutable si le FST est un ConstFst)."""
+    if isinstance(fst, pynini.Fst):
+        return fst
+    return pynini.Fst.from_pywrapfst(pywrapfst.convert(fst, "vector"))
+
+def shortest_string(input_fst, fst, token_type="utf8", timed=None):
+    """
+    Compose input_fst avec fst et retourne la chaîne du meilleur chemin
+    Fonctionne avec un pynini.Fst comme avec un ConstFst chargé par load_fst.
+    timed: chronomètres par étape (None = selon metrics.enabled)
+    """
+    if timed is None:
+        timed = metrics.enabled
+    if timed:
+        return _shortest_string_timed(input_fst, fst, token_type)
+    if isinstance(fst, pynini.Fst):
+        return pynini.shortestpath(input_fst @ fst).string(token_type)
+    lattice = pywrapfst.shortestpath(pywrapfst.compose(input_fst, fst))
+    return pynini.Fst.from_pywrapfst(lattice).string(token_type)
+
+def _shortest_string_timed(input_fst, fst, token_type):
+    """shortest_string avec un chronomètre par étape (instrumentation activée)"""
+    mutable = isinstance(fst, pynini.Fst)
+    with metrics.timer("compose"):
+        lattice = input_fst @ fst if mutable else pywrapfst.compose(input_fst, fst)
+    with metrics.timer("shortestpath"):
+        path = pynini.shortestpath(lattice) if mutable else pywrapfst.shortestpath(lattice)
+    with metrics.timer("string"):
+        if not mutable:
+            path = pynini.Fst.from_pywrapfst(path)
+        return path.string(token_type)
+
+def nbest_strings(input_fst, fst, n, token_type="utf8", threshold=None):
+    """
+    Compose input_fst avec fst (une seule composition) et retourne les n meilleures
+    sorties distinctes [(chaîne, poids)], par poids croissant ([] si aucune sortie)
+    threshold: élague les sorties de poids > meilleur + threshold
+    Sans déterminisation quand fst n'a qu'un chemin par sortie (grammaire pondérée) ;
+    si les n chemins contiennent des doublons, la recherche est refaite avec unique=True.
+    """
+    # ConstFst : le treillis reste un FST pywrapfst, seuls les n chemins sont convertis
+    mutable = isinstance(fst, pynini.Fst)
+    lattice = input_fst @ fst if mutable else pywrapfst.compose(input_fst, fst)
+    if lattice.start() == pynini.NO_STATE_ID:
+        return []
+    shortestpath = pynini.shortestpath if mutable else pywrapfst.shortestpath
+    results = _path_strings(shortestpath(lattice, nshortest=n, weight=threshold), token_type)
+    if len({string for string, _ in results}) < len(results):
+        lattice.project("output")
+        lattice.rmepsilon()
+        results = _path_strings(shortestpath(lattice, nshortest=n, unique=True, weight=threshold), token_type)
+    return sorted(results, key=lambda result: result[1])
+
+def _path_strings(paths_fst, token_type):
+    """[(chaîne de sortie, poids)] de chaque chemin d'un FST acyclique"""
+    if not isinstance(paths_fst, pynini.Fst):
+        paths_fst = pynini.Fst.from_pywrapfst(paths_fst)
+    paths = paths_fst.paths(output_token_type=token_type)
+    results = []
+    while not paths.done():
+        results.append((paths.ostring(), float(str(paths.weight()))))
+        paths.next()
+    return results
+
+# ============================================
+# RECHARGEMENT À CHAUD
+# ============================================
+
+# Entrées qu'un FAR rechargé doit verbaliser (celles de test_fst_from_far)
+RELOAD_CHECK_INPUTS = ["0", "7", "15", "42", "99", "100", "256", "1000"]
+
+# Intervalle par défaut entre deux vérifications du FAR (secondes)
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+# Version active d'un FAR : FSTs par nom, empreinte du contenu, date et durée du chargement
+FarSnapshot = namedtuple("FarSnapshot", ["fsts", "version", "loaded_at", "load_seconds", "prepared"])
+
+def far_version(far_path):
+    """Empreinte du contenu d'un FAR (sha256 tronqué)"""
+    digest = hashlib.sha256()
+    with open(far_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def check_cardinal(fsts):
+    """
+    Validation par défaut d'un FAR rechargé : CARDINAL doit verbaliser
+    RELOAD_CHECK_INPUTS (sortie non vide, sans chiffre). Lève FstLoadError sinon.
+    """
+    fst = fsts.get("CARDINAL")
+    if fst is None:
+        return
+    for text in RELOAD_CHECK_INPUTS:
+        try:
+            output = shortest_string(pynini.accep(text, token_type="utf8"), fst, "utf8")
+        except Exception as e:
+            raise FstLoadError(f"Validation: entrée '{text}' rejetée par CARDINAL ({e})")
+        if not output or any(char.isdigit() for char in output):
+            raise FstLoadError(f"Validation: sortie invalide pour '{text}': {output!r}")
+
+class ReloadableFar:
+    """
+    FSTs d'un FAR, rechargés quand le fichier change
+
+    current() retourne la version active (FarSnapshot, immuable) : un appel qui l'a
+    obtenue la garde jusqu'au bout, même si une nouvelle version est activée entre-temps.
+    Un changement est détecté par (mtime, taille) puis confirmé par l'empreinte du contenu ;
+    la nouvelle version est lue, validée et préparée avant d'être activée (affectation
+    atomique). En cas d'échec (FAR en cours d'écriture, validation), l'ancienne reste active.
+    """
+
+    def __init__(self, far_path, names, optional=(), validate=check_cardinal, prepare=None, release=None,
+                 interval=DEFAULT_RELOAD_INTERVAL):
+        """
+        names: entrées obligatoires ; optional: entrées lues si présentes
+        validate(fsts): lève une exception si la version est invalide
+        prepare(fsts): préchauffage avant activation (ex: table de verbalisation) ; le résultat
+                       est gardé dans snapshot.prepared et disparaît avec la version
+        release(fsts): appelé avec les FSTs de la version remplacée
+        Lève FstLoadError si la première version ne peut pas être chargée.
+        """
+        self.far_path = os.path.abspath(far_path)
+        self.names = list(names)
+        self.optional = list(optional)
+        self.validate = validate
+        self.prepare = prepare
+        self.release = release
+        self.interval = interval
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self._lock = threading.Lock()      # un seul rechargement à la fois
+        self._stop = threading.Event()
+        self._thread = None
+        self._stat = self._stat_key()
+        self._snapshot = self._load()
+
+    def _stat_key(self):
+        stat = os.stat(self.far_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        start = time.perf_counter()
+        if pynini is None:
+            raise FstLoadError("pynini n'est pas installé : seuls les exports de fst_array.py sont lisibles.")
+        version = far_version(self.far_path)
+        fsts = {name: _prepare(_read_from_far(self.far_path, name), DEFAULT_FST_TYPE) for name in self.names}
+        for name in self.optional:
+            try:
+                fsts[name] = _prepare(_read_from_far(self.far_path, name), DEFAULT_FST_TYPE)
+            except FstLoadError:
+                pass
+        if self.validate is not None:
+            self.validate(fsts)
+        prepared = self.prepare(fsts) if self.prepare is not None else None
+        return FarSnapshot(fsts, version, time.time(), time.perf_counter() - start, prepared)
+
+    def current(self):
+        """Version active (FarSnapshot)"""
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def check(self):
+        """Recharge le FAR s'il a changé ; retourne True si une nouvelle version est active"""
+        with self._lock:
+            try:
+                stat = self._stat_key()
+            except OSError:
+                return False  # FAR absent (régénération en cours) : on garde la version active
+            if stat == self._stat:
+                return False
+            self._stat = stat
+            try:
+                if far_version(self.far_path) == self._snapshot.version:
+                    return False
+                snapshot = self._load()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                if metrics.enabled:
+                    metrics.incr("far_reload_failures")
+                return False
+            previous, self._snapshot = self._snapshot, snapshot
+            self.reloads += 1
+            self.last_error = None
+            if metrics.enabled:
+                metrics.incr("far_reloads")
+                metrics.add_time("far_reload", snapshot.load_seconds)
+        if self.release is not None:
+            self.release(previous.fsts)
+        return True
+
+    def start(self):
+        """Vérifie le FAR toutes les interval secondes dans un thread d'arrière-plan"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="far-reload", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def status(self):
+        """Version active, date et durée du dernier chargement, compteurs de rechargement"""
+        snapshot = self._snapshot
+        return {
+            "far_path": self.far_path,
+            "version": snapshot.version,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(snapshot.loaded_at)),
+            "load_seconds": snapshot.load_seconds,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Table de verbalisation précalculée pour le FST CARDINAL
+Le domaine du FST est fini (0-1000, plus les formes à zéros initiaux comme "09"),
+on le développe donc une seule fois en dictionnaire {chiffres: texte}.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+from fst_loader import as_mutable, shortest_string
+from instrumentation import metrics
+from lazy_modules import lazy_import
+
+pynini = lazy_import("pynini")
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DIGITS = "0123456789"
+TABLE_MAX_DIGITS = 4  # "1000" et "0009" tiennent sur 4 chiffres
+
+# Tables déjà construites, indexées par id(fst), les moins récemment utilisées
+# évincées au-delà de TABLE_CACHE_SIZE. On garde aussi une référence au FST pour
+# que son id ne puisse pas être réutilisé par un autre objet tant qu'il est en cache.
+# Les FSTs rechargés à chaud (ReloadableFar) gardent leur table dans leur version.
+TABLE_CACHE_SIZE = 4
+_TABLE_CACHE = OrderedDict()
+_TABLE_CACHE_LOCK = threading.Lock()
+
+# ============================================
+# CONSTRUCTION DE LA TABLE
+# ============================================
+
+def _shortest_string(text, fst):
+    """Sortie retenue par apply_fst (shortestpath) pour une entrée donnée."""
+    # Non chronométrée : la construction compte dans "table_build", pas dans les étapes du pipeline
+    return shortest_string(pynini.accep(text, token_type="utf8"), fst, "utf8", timed=False)
+
+def build_verbalization_table(fst, max_digits=TABLE_MAX_DIGITS):
+    """
+    Développe le FST en un dictionnaire {entrée: sortie}
+
+    Toutes les chaînes de 1 à max_digits chiffres acceptées par le FST sont
+    couvertes, y compris les formes à zéros initiaux ("09", "0007").
+    Si le FST propose plusieurs sorties pour une même entrée (ex: "200"),
+    on garde celle que choisirait shortestpath, comme apply_fst.
+    """
+    digit = pynini.union(*DIGITS)
+    # Borner la longueur de l'entrée rend le FST acyclique, donc énumérable
+    bounded_fst = pynini.closure(digit, 1, max_digits) @ as_mutable(fst)
+
+    outputs = {}
+    paths = bounded_fst.paths(input_token_type="utf8", output_token_type="utf8")
+    for number_str, text, _ in paths.items():
+        outputs.setdefault(number_str, set()).add(text)
+
+    table = {}
+    for number_str, texts in outputs.items():
+        if len(texts) == 1:
+            table[number_str] = texts.pop()
+        else:
+            table[number_str] = _shortest_string(number_str, fst)
+    return table
+
+def get_verbalization_table(fst):
+    """
+    Retourne la table associée au FST, en la construisant au premier appel
+    Seules les TABLE_CACHE_SIZE dernières tables (et leurs FSTs) restent en mémoire.
+    """
+    with _TABLE_CACHE_LOCK:
+        cached = _TABLE_CACHE.get(id(fst))
+        if cached is not None:
+            _TABLE_CACHE.move_to_end(id(fst))
+            return cached[1]
+    start = time.perf_counter()
+    cached = (fst, build_verbalization_table(fst))
+    if metrics.enabled:
+        metrics.add_time("table_build", time.perf_counter() - start)
+    with _TABLE_CACHE_LOCK:
+        _TABLE_CACHE[id(fst)] = cached
+        while len(_TABLE_CACHE) > TABLE_CACHE_SIZE:
+            _TABLE_CACHE.popitem(last=False)
+    return cached[1]
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Instrumentation optionnelle du pipeline de normalisation
+- chronomètres par étape (scan regex, accepteur, composition, shortestpath, chaîne)
+- compteurs (nombres détectés, hors plage, erreurs FST, accès table...)
+- export JSON ou texte Prometheus, profil cProfile
+
+Désactivée par défaut : le code instrumenté ne fait alors qu'un test
+`if metrics.enabled` par appel.
+"""
+
+import sys
+import json
+import time
+import cProfile
+import contextlib
+
+# ============================================
+# MÉTRIQUES
+# ============================================
+
+class Metrics:
+    """Chronomètres et compteurs du processus courant"""
+
+    def __init__(self):
+        self.enabled = False
+        self.timers = {}    # étape -> [nombre d'appels, durée cumulée en s]
+        self.counters = {}  # événement -> nombre
+
+    def reset(self):
+        self.timers.clear()
+        self.counters.clear()
+
+    def incr(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_time(self, stage, seconds, calls=1):
+        timer = self.timers.get(stage)
+        if timer is None:
+            self.timers[stage] = [calls, seconds]
+        else:
+            timer[0] += calls
+            timer[1] += seconds
+
+    @contextlib.contextmanager
+    def timer(self, stage):
+        """Chronomètre un bloc (à n'utiliser que si enabled est vrai)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def snapshot(self):
+        return {
+            "timers": {stage: {"calls": calls, "seconds": seconds}
+                       for stage, (calls, seconds) in sorted(self.timers.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def merge(self, snapshot):
+        """Ajoute les métriques d'un autre processus (ex: processus du pool)"""
+        for stage, timer in snapshot["timers"].items():
+            self.add_time(stage, timer["seconds"], timer["calls"])
+        for name, value in snapshot["counters"].items():
+            self.incr(name, value)
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix="normalization"):
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total Temps cumulé par étape du pipeline",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        for stage, timer in snapshot["timers"].items():
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {timer["seconds"]:.9f}')
+        lines += [
+            f"# HELP {prefix}_stage_calls_total Nombre d'appels par étape du pipeline",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        for stage, timer in snapshot["timers"].items():
+            lines.append(f'{prefix}_stage_calls_total{{stage="{stage}"}} {timer["calls"]}')
+        lines += [
+            f"# HELP {prefix}_events_total Compteurs d'événements de la normalisation",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        for name, value in snapshot["counters"].items():
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path="-", fmt=None):
+        """
+        Écrit les métriques en JSON ou au format Prometheus
+        fmt: "json" ou "prom" ; par défaut selon l'extension (.prom / .txt -> Prometheus)
+        """
+        if fmt is None:
+            fmt = "prom" if str(path).endswith((".prom", ".txt")) else "json"
+        text = self.to_prometheus() if fmt == "prom" else self.to_json() + "\n"
+        if path == "-":
+            sys.stderr.write(text)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+# Instance partagée par tout le processus
+metrics = Metrics()
+
+def enable():
+    metrics.enabled = True
+
+def disable():
+    metrics.enabled = False
+
+# ============================================
+# PROFILAGE
+# ============================================
+
+@contextlib.contextmanager
+def profile(path=None):
+    """
+    Exécute le bloc sous cProfile et écrit le profil dans path (lisible avec pstats)
+    Sans path, le bloc est exécuté normalement.
+    """
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"💾 Profil cProfile sauvegardé dans: {path}", file=sys.stderr)
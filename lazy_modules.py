@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Import différé des dépendances lourdes (pynini, NumPy, pandas, pyarrow)
+- lazy_import("pynini") retourne aussitôt un module vide ; le vrai import a lieu
+  au premier accès à un attribut (pynini.accep, np.array...)
+- None si la dépendance n'est pas installée, comme le motif try/except ImportError
+  des modules : les tests `pynini is None` restent valables
+Les points d'entrée (--help, erreurs d'usage) ne paient ainsi que les imports
+des chemins de code qu'ils exécutent ; voir benchmarks/bench_startup.py.
+"""
+
+import sys
+import types
+import importlib.util
+
+# ============================================
+# IMPORT DIFFÉRÉ
+# ============================================
+
+class _LazyModule(types.ModuleType):
+    """Module remplacé par le vrai au premier attribut demandé"""
+
+    def __getattr__(self, attr):
+        # __import__ : contrairement à importlib.import_module, le module
+        # apparaît dans la trace de python -X importtime
+        __import__(self.__name__)
+        module = sys.modules[self.__name__]
+        # Accès suivants sans passer par __getattr__
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+def lazy_import(name):
+    """
+    Module name importé au premier usage (None si son paquet n'est pas installé)
+    Un module déjà importé est retourné tel quel.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name.partition(".")[0]) is None:
+        return None
+    return _LazyModule(name)
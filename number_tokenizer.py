@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tokeniseur de nombres partagé par tous les moteurs de normalisation
+- un seul motif précompilé, une seule passe sur la phrase
+- plage décidée par la longueur du jeton (et l'ordre lexical à longueur égale),
+  sans conversion int() : une longue suite de chiffres est rejetée immédiatement
+- sortie en segments (début, fin, remplacement) : le texte normalisé est construit
+  en un seul join, avec l'alignement des positions entre l'entrée et la sortie
+Mêmes frontières et mêmes plages que le FST SENTENCE (build_sentence_fst).
+"""
+
+import re
+import time
+
+from instrumentation import metrics
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Suite de chiffres ASCII entre deux frontières de mot (comme le FST SENTENCE)
+NUMBER_PATTERN = re.compile(r"\b[0-9]+\b")
+
+# Types de jetons
+SMALL = "small"   # 0-1000, et 0-9 précédés de zéros sur 4 chiffres au plus ("09", "0007") : FST CARDINAL
+LARGE = "large"   # 1001 à 999 999 999 999, sans zéro initial : FST CARDINAL_LARGE
+
+MAX_SMALL_DIGITS = 4
+MAX_LARGE_DIGITS = 12
+
+# ============================================
+# TOKENISATION
+# ============================================
+
+def classify(token, large=True):
+    """
+    Type d'un jeton de chiffres : SMALL, LARGE, ou None s'il est hors plage
+    large: les grands nombres sont-ils normalisables (FST CARDINAL_LARGE chargé) ?
+    """
+    length = len(token)
+    if token[0] != "0":
+        if length < MAX_SMALL_DIGITS or token == "1000":
+            return SMALL
+        if large and length <= MAX_LARGE_DIGITS:
+            return LARGE
+        return None
+    # Zéros initiaux : acceptés par CARDINAL seulement devant un chiffre unique ("09", "0007")
+    if length <= MAX_SMALL_DIGITS and token.count("0", 0, length - 1) == length - 1:
+        return SMALL
+    return None
+
+def scan_numbers(text, large=True):
+    """Segments (début, fin, type) de tous les nombres de text, type None = hors plage"""
+    return [(match.start(), match.end(), classify(match.group(), large))
+            for match in NUMBER_PATTERN.finditer(text)]
+
+def replace_spans(text, replacements):
+    """
+    Remplace des segments de text en un seul join
+    replacements: [(début, fin, remplacement)] dans l'ordre, sans chevauchement
+    Retourne (texte, alignement) ; l'alignement donne, pour chaque segment remplacé,
+    (début, fin) dans l'entrée et (début, fin) dans la sortie.
+    """
+    pieces = []
+    alignment = []
+    position = 0
+    offset = 0  # Décalage sortie - entrée accumulé
+    for start, end, replacement in replacements:
+        pieces.append(text[position:start])
+        pieces.append(replacement)
+        alignment.append((start, end, start + offset, start + offset + len(replacement)))
+        offset += len(replacement) - (end - start)
+        position = end
+    pieces.append(text[position:])
+    return "".join(pieces), alignment
+
+def normalize_numbers(text, verbalize, large=True):
+    """
+    Remplace chaque nombre de text par verbalize(jeton, type)
+    verbalize: retourne le texte du nombre, ou None pour le laisser inchangé
+    Retourne (texte normalisé, alignement) ; voir replace_spans.
+    """
+    if metrics.enabled:
+        return _normalize_numbers_timed(text, verbalize, large)
+
+    # Balayage, classement et construction de la sortie dans la même boucle
+    pieces = []
+    alignment = []
+    position = 0
+    offset = 0
+    for match in NUMBER_PATTERN.finditer(text):
+        token = match.group()
+        kind = classify(token, large)
+        if kind is None:
+            continue
+        replacement = verbalize(token, kind)
+        if replacement is None:
+            continue
+        start, end = match.span()
+        pieces.append(text[position:start])
+        pieces.append(replacement)
+        alignment.append((start, end, start + offset, start + offset + len(replacement)))
+        offset += len(replacement) - (end - start)
+        position = end
+    if not pieces:
+        return text, alignment
+    pieces.append(text[position:])
+    return "".join(pieces), alignment
+
+def substitute_numbers(text, verbalize, large=True):
+    """
+    Comme normalize_numbers, sans l'alignement : un seul re.sub, join fait en C
+    Chemin des moteurs qui ne demandent que le texte normalisé.
+    """
+    if metrics.enabled:
+        return _normalize_numbers_timed(text, verbalize, large)[0]
+
+    def replace(match):
+        token = match.group()
+        kind = classify(token, large)
+        if kind is None:
+            return token
+        replacement = verbalize(token, kind)
+        return token if replacement is None else replacement
+
+    return NUMBER_PATTERN.sub(replace, text)
+
+def _normalize_numbers_timed(text, verbalize, large):
+    """normalize_numbers instrumenté : scan chronométré à part, nombres détectés / hors plage comptés"""
+    start = time.perf_counter()
+    spans = scan_numbers(text, large)
+    metrics.add_time("regex_scan", time.perf_counter() - start)
+    metrics.incr("matches", len(spans))
+
+    replacements = []
+    for start, end, kind in spans:
+        if kind is None:
+            metrics.incr("out_of_range")
+            continue
+        replacement = verbalize(text[start:end], kind)
+        if replacement is not None:
+            replacements.append((start, end, replacement))
+    return replace_spans(text, replacements)
@@ -6,25 +6,68 @@ Usage: python normalize.py "5 bonbons"
 """
 
 import sys
-import re
-import pynini
+import os
+import time
+import signal
+import socket
+import socketserver
+import multiprocessing
+from collections import deque
+from itertools import islice
 from pathlib import Path
 
+from fst_array import ArrayTransducer, export_path
+from fst_itn import ITN_MAX, build_itn_trie, inverse_normalize
+from fst_loader import (DEFAULT_LOCALE, LOCALE_ENV_VAR, LOCALES, FstLoadError, MMAP_ENV_VAR, ReloadableFar,
+                        check_cardinal, current_locale, far_entry_name, far_version, load_variant, shortest_string)
+from number_tokenizer import SMALL, normalize_numbers, scan_numbers, substitute_numbers
+from sentence_cache import (POLICIES, cache_enabled, cache_persistent, cached, configure_cache,
+                            get_sentence_cache, merge_new_entries, save_sentence_caches, sentence_cache_stats,
+                            take_new_entries, track_new_entries)
+from instrumentation import metrics, profile
+import instrumentation
+from script_client import DEFAULT_SOCKET, decode_message, encode_message
+from fst_table import build_verbalization_table, get_verbalization_table
+from lazy_modules import lazy_import
+from Text_Normalisation_Cardinaux_0_a_1000 import NbestResult, apply_fst, apply_fst_nbest
+
+# pynini, NumPy (fst_array) et la grammaire ne sont importés qu'au premier FST
+# chargé : --help et les erreurs d'usage n'en paient pas le coût.
+# Sans pynini, seul le moteur "array" est disponible (exports de fst_array.py)
+pynini = lazy_import("pynini")
+
 # ============================================
 # CONFIGURATION
 # ============================================
 
 FAR_FILE = "cardinal_numbers.far"
 FST_NAME = "CARDINAL"
+LARGE_FST_NAME = "CARDINAL_LARGE"
+SENTENCE_FST_NAME = "SENTENCE"
+# Grammaires pondérées (sorties alternatives avec leur coût, pour --nbest)
+WEIGHTED_FST_NAME = "CARDINAL_WEIGHTED"
+LARGE_WEIGHTED_FST_NAME = "CARDINAL_LARGE_WEIGHTED"
 
+# Plus grand nombre normalisé (avec CARDINAL_LARGE ; 1000 sans)
+MAX_CARDINAL = 999_999_999_999
 
+# Moteurs de normalisation disponibles
+#   table    : table précalculée, repli sur le FST (par défaut)
+#   fst      : une composition FST par nombre détecté
+#   sentence : une seule composition par phrase avec le FST SENTENCE du FAR
+#              (~125 µs par phrase du jeu d'évaluation, contre ~5 µs pour table)
+#   array    : transducteur exporté en tableaux NumPy par fst_array.py (sans pynini ;
+#              0-1000 seulement, les nombres plus grands restent inchangés)
+ENGINES = ["table", "fst", "sentence", "array"]
+DEFAULT_ENGINE = "table" if pynini is not None else "array"
 
-def apply_fst(text, fst):
-    try:
-        return(pynini.shortestpath(pynini.accep(text,token_type='utf8') @ fst).string("utf8"))
+# Taille des lots envoyés à chaque processus par normalize_batch
+DEFAULT_CHUNKSIZE = 256
+# Nombre maximal de lots en cours par processus (borne la mémoire en streaming)
+MAX_PENDING_CHUNKS_PER_WORKER = 2
+# Taille du tampon d'écriture en mode streaming (octets)
+OUTPUT_BUFFER_SIZE = 1 << 20
 
-    except Exception as e:
-        return(f"Error: {e}, for input:'{text}'")
 
 # ============================================
 # CHARGEMENT DU FST
@@ -32,70 +75,517 @@ def apply_fst(text, fst):
 
 def load_fst_from_far(far_path=FAR_FILE, fst_name=FST_NAME):
     """
-    Charge le FST depuis le fichier FAR
+    Charge le FST depuis le fichier FAR (via fst_loader : ConstFst trié,
+    mis en cache dans le processus, mmap si FST_LOADER_MMAP=1)
+    L'entrée lue est celle de la locale choisie (--locale, fr-FR par défaut).
     """
-    if not Path(far_path).exists():
-        print(f"❌ ERREUR: Le fichier FAR '{far_path}' n'existe pas.", file=sys.stderr)
+    try:
+        return load_variant(far_path, fst_name)
+    except FstLoadError as e:
+        print(f"❌ ERREUR: {e}", file=sys.stderr)
         print(f"   Veuillez d'abord générer le fichier FAR en exécutant le script de création.", file=sys.stderr)
         sys.exit(1)
-    
-    try:
-        # Ouvrir le FAR en mode lecture
-        far_reader = pynini.Far(far_path, mode="r")
-        
-        # Essayer de récupérer le FST
-        try:
-            fst = far_reader[fst_name]
-        except KeyError:
-            print(f"❌ ERREUR: Le FST '{fst_name}' n'existe pas dans le FAR.", file=sys.stderr)
-            print(f"   Vérifiez que le fichier FAR a été créé correctement.", file=sys.stderr)
-            far_reader.close()
-            sys.exit(1)
-        
-        # Fermer le reader
-        far_reader.close()
-        
-        return fst
     except Exception as e:
         print(f"❌ ERREUR lors du chargement du FAR: {e}", file=sys.stderr)
         sys.exit(1)
 
+def load_large_fst(far_path=FAR_FILE):
+    """
+    Charge le FST des grands nombres (CARDINAL_LARGE)
+    Retourne None si le FAR a été généré avant son ajout : seuls 0-1000 sont alors normalisés.
+    """
+    try:
+        return load_variant(far_path, LARGE_FST_NAME)
+    except FstLoadError:
+        return None
+
+def load_array_transducer(far_path=FAR_FILE, fst_name=FST_NAME, required=True):
+    """
+    Charge l'export NumPy d'une entrée du FAR (python fst_array.py -n NOM)
+    Cherche <FAR>.<NOM>.npz, puis le dossier <FAR>.<NOM>/ (lu en mmap si FST_LOADER_MMAP=1).
+    NOM est l'entrée de la locale choisie (CARDINAL_fr-CH...).
+    Retourne None si l'export est absent et que required est faux.
+    """
+    fst_name = far_entry_name(fst_name)
+    path = export_path(far_path, fst_name)
+    if not path.exists() and path.with_suffix("").is_dir():
+        path = path.with_suffix("")
+    if not path.exists():
+        if not required:
+            return None
+        print(f"❌ ERREUR: L'export '{path}' n'existe pas.", file=sys.stderr)
+        print(f"   Veuillez d'abord l'exporter avec: python fst_array.py -f {far_path} -n {fst_name}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        return ArrayTransducer.load(path, mmap=os.environ.get(MMAP_ENV_VAR, "") not in ("", "0"))
+    except Exception as e:
+        print(f"❌ ERREUR lors du chargement de l'export '{path}': {e}", file=sys.stderr)
+        sys.exit(1)
+
 # ============================================
 # NORMALISATION
 # ============================================
 
-def normalize_number(number_str, fst):
+def normalize_number(number_str, fst, table=None):
     """
-    Normalise un nombre avec le FST
+    Normalise un nombre avec la table précalculée, sinon avec le FST
     """
+    if table is not None:
+        result = table.get(number_str)
+        if metrics.enabled:
+            metrics.incr("table_hits" if result is not None else "table_misses")
+        if result is not None:
+            return result
     try:
-        result = apply_fst(number_str, fst)
-        return result
+        return apply_fst(number_str, fst)
     except Exception:
-        # Si le FST ne peut pas traiter ce nombre, on le retourne tel quel
+        # Si le FST ne peut pas traiter ce nombre (pas de chemin), on le retourne tel quel
+        if metrics.enabled:
+            metrics.incr("fallbacks")
         return number_str
 
-def normalize_text(text, fst):
+def normalize_text(text, fst, use_table=True, large_fst=None, table=None):
     """
     Normalise tous les nombres dans un texte
+    Par défaut, les nombres sont lus dans la table précalculée du FST ;
+    le FST n'est composé que pour les entrées absentes de la table.
+    Avec large_fst, les nombres de 1001 à MAX_CARDINAL sont composés avec ce FST.
+    table: table du FST déjà construite (sinon celle du cache du processus)
+    """
+    verbalize = fst_verbalizer(fst, use_table, large_fst, table)
+    return substitute_numbers(text, verbalize, large=large_fst is not None)
+
+def normalize_text_aligned(text, fst, use_table=True, large_fst=None):
+    """
+    Comme normalize_text, avec l'alignement des nombres remplacés
+    Retourne (texte normalisé, [(début, fin, début_sortie, fin_sortie)]).
+    """
+    verbalize = fst_verbalizer(fst, use_table, large_fst)
+    return normalize_numbers(text, verbalize, large=large_fst is not None)
+
+def fst_verbalizer(fst, use_table, large_fst, table=None):
+    """Fonction (jeton, type) -> texte pour le tokeniseur : CARDINAL (table ou FST), ou CARDINAL_LARGE"""
+    if table is None and use_table:
+        table = get_verbalization_table(fst)
+    
+    def verbalize(number, kind):
+        if kind == SMALL:
+            return normalize_number(number, fst, table)
+        return normalize_number(number, large_fst)
+    
+    return verbalize
+
+def array_verbalizer(transducer, large_transducer=None):
+    """Fonction (jeton, type) -> texte pour le tokeniseur, avec les transducteurs de fst_array.py"""
+    def verbalize(number, kind):
+        return (transducer if kind == SMALL else large_transducer).apply(number)
+    
+    return verbalize
+
+def normalize_text_with_arrays(text, transducer, large_transducer=None):
+    """
+    Normalise tous les nombres d'un texte avec les transducteurs exportés par fst_array.py
+    Mêmes plages que normalize_text : 0-1000, puis jusqu'à MAX_CARDINAL avec large_transducer.
+    """
+    verbalize = array_verbalizer(transducer, large_transducer)
+    return substitute_numbers(text, verbalize, large=large_transducer is not None)
+
+def normalize_sentence(text, sentence_fst):
+    """
+    Normalise tous les nombres d'une phrase en une seule composition
+    avec le FST de réécriture SENTENCE (traitement octet par octet)
+    """
+    try:
+        if metrics.enabled:
+            metrics.incr("sentences")
+            with metrics.timer("acceptor"):
+                input_fst = pynini.accep(pynini.escape(text))
+            return shortest_string(input_fst, sentence_fst, "byte")
+        return shortest_string(pynini.accep(pynini.escape(text)), sentence_fst, "byte")
+    except Exception:
+        # En cas d'échec, on retourne la phrase telle quelle
+        if metrics.enabled:
+            metrics.incr("fst_errors")
+        return text
+
+def get_normalizer(engine=DEFAULT_ENGINE, far_path=FAR_FILE):
+    """
+    Charge le FST nécessaire au moteur choisi et retourne une fonction texte -> texte
+    """
+    if engine not in ENGINES:
+        print(f"❌ ERREUR: Moteur inconnu: {engine} (choix: {', '.join(ENGINES)})", file=sys.stderr)
+        sys.exit(1)
+    
+    if engine == "array":
+        transducer = load_array_transducer(far_path)
+        large_transducer = load_array_transducer(far_path, LARGE_FST_NAME, required=False)
+        return with_sentence_cache(lambda text: normalize_text_with_arrays(text, transducer, large_transducer),
+                                   engine, grammar_path(engine, far_path))
+    
+    if pynini is None:
+        print(f"❌ ERREUR: pynini n'est pas installé : seul le moteur 'array' est disponible.", file=sys.stderr)
+        sys.exit(1)
+    
+    if engine == "sentence":
+        sentence_fst = load_fst_from_far(far_path, SENTENCE_FST_NAME)
+        normalize = lambda text: normalize_sentence(text, sentence_fst)
+    else:
+        fst = load_fst_from_far(far_path)
+        large_fst = load_large_fst(far_path)
+        normalize = lambda text: normalize_text(text, fst, use_table=engine == "table", large_fst=large_fst)
+    return with_sentence_cache(normalize, engine, far_path)
+
+def grammar_path(engine, far_path=FAR_FILE):
+    """Fichier dont le contenu détermine les sorties du moteur (FAR, ou export NumPy pour "array")"""
+    if engine == "array":
+        return export_path(far_path, far_entry_name(FST_NAME))
+    return far_path
+
+def with_sentence_cache(normalize, name, path):
     """
-    # Pattern pour détecter les nombres (0-1000)
-    number_pattern = r'\b\d+\b'
+    Ajoute le cache de phrases (sentence_cache.py) à un normaliseur, s'il est activé
+    Le cache est indexé par l'empreinte du contenu de path : un FAR régénéré
+    repart d'un cache vide (ou de son propre fichier persistant).
+    """
+    if not cache_enabled():
+        return normalize
+    if current_locale() != DEFAULT_LOCALE:
+        name = f"{name}-{current_locale()}"
+    return cached(normalize, get_sentence_cache(name, far_version(path)))
+
+def get_verbalizer(engine=DEFAULT_ENGINE, far_path=FAR_FILE):
+    """
+    Charge les FSTs d'un moteur à jetons (table, fst, array) et retourne
+    (verbalize, large) pour number_tokenizer : verbalize(jeton, type) -> texte,
+    large indique si les nombres au-delà de 1000 sont normalisables.
+    """
+    if engine not in ("table", "fst", "array"):
+        print(f"❌ ERREUR: Le moteur '{engine}' ne verbalise pas les nombres un par un", file=sys.stderr)
+        sys.exit(1)
+    if engine == "array":
+        large_transducer = load_array_transducer(far_path, LARGE_FST_NAME, required=False)
+        return array_verbalizer(load_array_transducer(far_path), large_transducer), large_transducer is not None
+    if pynini is None:
+        print(f"❌ ERREUR: pynini n'est pas installé : seul le moteur 'array' est disponible.", file=sys.stderr)
+        sys.exit(1)
+    large_fst = load_large_fst(far_path)
+    return fst_verbalizer(load_fst_from_far(far_path), engine == "table", large_fst), large_fst is not None
+
+def get_reloadable_normalizer(engine=DEFAULT_ENGINE, far_path=FAR_FILE):
+    """
+    Comme get_normalizer, mais le FAR est surveillé par un ReloadableFar : chaque appel
+    utilise la version active au moment où il commence.
+    Retourne (normaliseur, ReloadableFar) ; le rechargement se fait avec check() ou start().
+    """
+    if engine not in ENGINES or engine == "array" or pynini is None:
+        print(f"❌ ERREUR: Rechargement à chaud indisponible avec le moteur '{engine}'", file=sys.stderr)
+        sys.exit(1)
     
-    def replace_number(match):
-        number = match.group(0)
-        # Vérifier que le nombre est dans la plage 0-1000
+    # Entrées de la locale choisie
+    cardinal, large, sentence = (far_entry_name(name) for name in (FST_NAME, LARGE_FST_NAME, SENTENCE_FST_NAME))
+    names = [cardinal, sentence] if engine == "sentence" else [cardinal]
+    prepare = None
+    if engine == "table":
+        # Table de la nouvelle version construite avant son activation, gardée dans la
+        # version (snapshot.prepared) : elle disparaît avec le dernier appel qui l'utilise
+        prepare = lambda fsts: build_verbalization_table(fsts[cardinal])
+    validate = lambda fsts: check_cardinal({FST_NAME: fsts[cardinal]})
+    try:
+        holder = ReloadableFar(far_path, names, optional=[large], validate=validate, prepare=prepare)
+    except (FstLoadError, OSError) as e:
+        print(f"❌ ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    def normalize_snapshot(text, snapshot):
+        fsts = snapshot.fsts
+        if engine == "sentence":
+            return normalize_sentence(text, fsts[sentence])
+        return normalize_text(text, fsts[cardinal], use_table=engine == "table", large_fst=fsts.get(large),
+                              table=snapshot.prepared)
+    
+    cache_name = engine if current_locale() == DEFAULT_LOCALE else f"{engine}-{current_locale()}"
+    
+    def normalize(text):
+        snapshot = holder.current()
+        # Cache de la version active (même empreinte que far_version) : vidé à chaque rechargement
+        cache = get_sentence_cache(cache_name, snapshot.version)
+        if cache is None:
+            return normalize_snapshot(text, snapshot)
+        result = cache.get(text)
+        if result is None:
+            result = normalize_snapshot(text, snapshot)
+            cache.put(text, result)
+        return result
+    
+    return normalize, holder
+
+def get_itn_normalizer(engine=DEFAULT_ENGINE, far_path=FAR_FILE):
+    """
+    Retourne une fonction texte -> texte de normalisation inverse (lettres -> chiffres)
+    Le lexique vient de la table de verbalisation du FST CARDINAL, ou de son export
+    NumPy avec le moteur "array" (utilisable sans pynini).
+    """
+    if engine not in ENGINES:
+        print(f"❌ ERREUR: Moteur inconnu: {engine} (choix: {', '.join(ENGINES)})", file=sys.stderr)
+        sys.exit(1)
+    if engine == "array" or pynini is None:
+        transducer = load_array_transducer(far_path)
+        table = {str(i): transducer.apply(str(i)) for i in range(ITN_MAX + 1)}
+    else:
+        table = get_verbalization_table(load_fst_from_far(far_path))
+    trie = build_itn_trie(table)
+    return with_sentence_cache(lambda text: inverse_normalize(text, trie), f"itn-{engine}",
+                               grammar_path(engine if pynini is not None else "array", far_path))
+
+def nbest_numbers(text, n, far_path=FAR_FILE):
+    """
+    Alternatives pondérées de chaque nombre du texte, pour un rescoreur en aval
+    (grammaires CARDINAL_WEIGHTED et CARDINAL_LARGE_WEIGHTED du FAR, une composition par nombre)
+    Retourne [(début, fin, NbestResult)] ; un nombre hors plage est un échec, pas une exception.
+    """
+    fst = load_fst_from_far(far_path, WEIGHTED_FST_NAME)
+    try:
+        large_fst = load_variant(far_path, LARGE_WEIGHTED_FST_NAME)
+    except FstLoadError:
+        large_fst = None
+    results = []
+    for start, end, kind in scan_numbers(text, large_fst is not None):
+        token = text[start:end]
+        if kind is None:
+            result = NbestResult(token, [], "nombre hors plage")
+        else:
+            result = apply_fst_nbest(token, n, fst if kind == SMALL else large_fst)
+        results.append((start, end, result))
+    return results
+
+# ============================================
+# NORMALISATION PAR LOTS (MULTI-PROCESSUS)
+# ============================================
+
+# Normaliseur propre à chaque processus, créé une seule fois par _init_worker
+_worker_normalize = None
+# Erreur de sa création, relevée à chaque lot (None si le normaliseur est prêt)
+_worker_error = None
+
+class WorkerInitError(Exception):
+    """Le normaliseur d'un processus du pool n'a pas pu être créé"""
+
+def check_engine(engine=DEFAULT_ENGINE, far_path=FAR_FILE):
+    """
+    Vérifie dans le processus courant que l'entrée lue par le moteur existe
+    (FST du FAR ou export NumPy) ; quitte avec une erreur sinon.
+    À appeler avant de créer un pool : un processus qui quitte dans son
+    initialiseur est relancé indéfiniment par multiprocessing.Pool.
+    """
+    if engine == "array" or pynini is None:
+        load_array_transducer(far_path)
+    elif engine == "sentence":
+        load_fst_from_far(far_path, SENTENCE_FST_NAME)
+    else:
+        load_fst_from_far(far_path)
+
+def _init_worker(factory, factory_args, metrics_enabled=False, collect_cache=False):
+    """
+    Initialise un processus du pool : le FAR n'est chargé qu'une fois
+    collect_cache: les nouvelles entrées du cache de phrases sont renvoyées au parent
+    Si la factory échoue (sys.exit compris), le processus reste en vie et chaque
+    lot lève WorkerInitError : le parent s'arrête au lieu d'attendre indéfiniment.
+    """
+    global _worker_normalize, _worker_error
+    try:
+        _worker_normalize = factory(*factory_args)
+    except (Exception, SystemExit) as e:
+        detail = str(e) if isinstance(e, Exception) else "voir l'erreur ci-dessus"
+        _worker_error = f"Initialisation d'un processus du pool impossible ({detail})"
+    metrics.reset()
+    metrics.enabled = metrics_enabled
+    if collect_cache:
+        track_new_entries()
+
+def _normalize_chunk_in_worker(chunk):
+    if _worker_error is not None:
+        raise WorkerInitError(_worker_error)
+    return [_worker_normalize(text) for text in chunk]
+
+def _normalize_chunk_with_reports(chunk):
+    """
+    Comme _normalize_chunk_in_worker, avec ce que le parent agrège : les métriques
+    du lot (remises à zéro, None sans instrumentation) et les nouvelles entrées du cache
+    """
+    results = _normalize_chunk_in_worker(chunk)
+    snapshot = None
+    if metrics.enabled:
+        snapshot = metrics.snapshot()
+        metrics.reset()
+    return results, snapshot, take_new_entries()
+
+def _iter_chunks(texts, chunksize):
+    """Découpe un itérable en listes de chunksize éléments, sans tout charger"""
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+def normalize_batch(texts, workers=None, chunksize=DEFAULT_CHUNKSIZE,
+                    engine=DEFAULT_ENGINE, far_path=FAR_FILE, factory=get_normalizer):
+    """
+    Normalise une séquence de textes avec un pool de processus
+    
+    Chaque processus construit son normaliseur une seule fois (factory(engine, far_path))
+    puis reçoit les textes par lots de chunksize. Les résultats sont produits
+    au fil de l'eau, dans l'ordre des entrées. Le nombre de lots en cours est
+    borné : l'entrée n'est lue qu'au rythme du traitement.
+    workers: nombre de processus (None = tous les cœurs, 1 = dans le processus courant)
+    factory: fonction de niveau module (picklable) qui retourne un normaliseur
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    if workers <= 1:
+        normalize = factory(engine, far_path)
+        for text in texts:
+            yield normalize(text)
+        return
+    
+    # Avec l'instrumentation, chaque lot rapporte aussi ses métriques au parent ;
+    # avec un cache persistant, ses nouvelles entrées (sauvegardées par le parent)
+    collect_metrics = metrics.enabled
+    collect_cache = cache_persistent()
+    reports = collect_metrics or collect_cache
+    chunk_func = _normalize_chunk_with_reports if reports else _normalize_chunk_in_worker
+    
+    # Entrée manquante signalée ici, une fois, plutôt que dans chaque processus
+    check_engine(engine, far_path)
+    
+    def results_of(async_result):
         try:
-            num_value = int(number)
-            if 0 <= num_value <= 1000:
-                return normalize_number(number, fst)
-        except ValueError:
-            pass
-        return number
+            report = async_result.get()
+        except WorkerInitError as e:
+            print(f"❌ ERREUR: {e}", file=sys.stderr)
+            sys.exit(1)
+        if not reports:
+            return report
+        results, snapshot, new_entries = report
+        if snapshot is not None:
+            metrics.merge(snapshot)
+        merge_new_entries(new_entries)
+        return results
+    
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(factory, (engine, far_path), collect_metrics, collect_cache)) as pool:
+        pending = deque()
+        max_pending = workers * MAX_PENDING_CHUNKS_PER_WORKER
+        for chunk in _iter_chunks(texts, chunksize):
+            pending.append(pool.apply_async(chunk_func, (chunk,)))
+            if len(pending) >= max_pending:
+                yield from results_of(pending.popleft())
+        while pending:
+            yield from results_of(pending.popleft())
+
+# ============================================
+# MODE STREAMING (FICHIER OU STDIN)
+# ============================================
+
+def open_text_stream(path, mode):
+    """
+    Ouvre un fichier texte UTF-8, ou stdin/stdout si path vaut "-"
+    Les fins de ligne sont conservées telles quelles (newline="").
+    """
+    if path == "-":
+        stream = sys.stdin if mode == "r" else sys.stdout
+        return open(stream.fileno(), mode, encoding="utf-8", newline="",
+                    buffering=OUTPUT_BUFFER_SIZE, closefd=False)
+    return open(path, mode, encoding="utf-8", newline="", buffering=OUTPUT_BUFFER_SIZE)
+
+def stream_normalize(input_path="-", output_path="-", engine=DEFAULT_ENGINE, far_path=FAR_FILE,
+                     workers=1, chunksize=DEFAULT_CHUNKSIZE, factory=get_normalizer):
+    """
+    Normalise un fichier ligne par ligne avec une mémoire constante
     
-    # Remplacer tous les nombres dans le texte
-    normalized = re.sub(number_pattern, replace_number, text)
-    return normalized
+    Les lignes sont lues paresseusement, normalisées par normalize_batch
+    (le FST n'est chargé qu'une fois par processus) et écrites dans un tampon.
+    Retourne le nombre de lignes traitées.
+    """
+    count = 0
+    with open_text_stream(input_path, "r") as source, open_text_stream(output_path, "w") as target:
+        for normalized in normalize_batch(source, workers, chunksize, engine, far_path, factory):
+            target.write(normalized)
+            count += 1
+    return count
+
+# ============================================
+# MODE DÉMON (SOCKET UNIX)
+# ============================================
+
+class _NormalizationHandler(socketserver.StreamRequestHandler):
+    """Une connexion : une requête JSON par ligne, une réponse par ligne"""
+    
+    def handle(self):
+        for line in self.rfile:
+            try:
+                message = decode_message(line)
+                if message.get("stats"):
+                    response = {"result": self.server.stats()}
+                else:
+                    response = {"result": self.server.normalize(message["text"])}
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(encode_message(response))
+
+class NormalizationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    
+    def __init__(self, socket_path, normalize, holder=None):
+        self.normalize = normalize
+        self.holder = holder
+        super().__init__(socket_path, _NormalizationHandler)
+    
+    def stats(self):
+        """Version de la grammaire active (avec --reload) et statistiques du cache de phrases"""
+        return {"reload": self.holder.status() if self.holder is not None else None,
+                "cache": sentence_cache_stats()}
+
+def _remove_stale_socket(socket_path):
+    """Supprime un socket abandonné ; quitte si un démon y répond encore"""
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+            return
+    print(f"❌ ERREUR: Un démon écoute déjà sur {socket_path}", file=sys.stderr)
+    sys.exit(1)
+
+def serve(socket_path=DEFAULT_SOCKET, engine=DEFAULT_ENGINE, far_path=FAR_FILE, factory=get_normalizer,
+          reload=False):
+    """
+    Garde le FST chargé et répond aux clients (script_client.py) sur un socket Unix
+    reload: surveille le FAR et active ses nouvelles versions sans interrompre les requêtes
+    ({"stats": true} retourne la version active)
+    """
+    holder = None
+    if reload:
+        normalize, holder = get_reloadable_normalizer(engine, far_path)
+        holder.start()
+    else:
+        normalize = factory(engine, far_path)
+    _remove_stale_socket(socket_path)
+    # SIGTERM : sortie propre, le socket est supprimé dans le finally
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    with NormalizationServer(socket_path, normalize, holder) as server:
+        version = f", grammaire: {holder.version}" if holder is not None else ""
+        print(f"✓ Démon prêt sur {socket_path} (moteur: {engine}{version})", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Arrêt du démon", file=sys.stderr)
+        finally:
+            os.unlink(socket_path)
 
 # ============================================
 # INTERFACE EN LIGNE DE COMMANDE
@@ -110,10 +600,39 @@ def print_usage():
     print(f'  python {sys.argv[0]} "5 bonbons"')
     print(f'  python {sys.argv[0]} "J\'ai 25 ans et 3 chats"')
     print(f'  python {sys.argv[0]} "Il y a 100 personnes"')
+    print(f'  python {sys.argv[0]} --itn "deux cent cinquante-trois euros"')
     print()
     print("Options:")
     print(f"  -h, --help     Affiche cette aide")
     print(f"  -f, --file     Spécifie un fichier FAR différent")
+    print(f"  -e, --engine   Moteur de normalisation: {', '.join(ENGINES)} (défaut: {DEFAULT_ENGINE})")
+    print(f"                 (sentence : ~25x plus lent que table, ~0,13 ms par phrase courte)")
+    print(f"  --locale L     Variante régionale: {', '.join(LOCALES)} (défaut: {DEFAULT_LOCALE})")
+    print(f"  --nbest N      Affiche les N meilleures verbalisations de chaque nombre, avec leur coût")
+    print(f"  --itn          Normalisation inverse : nombres en lettres -> chiffres (0-{ITN_MAX})")
+    print(f"  -i, --input    Normalise un fichier ligne par ligne ('-' = stdin)")
+    print(f"  -o, --output   Fichier de sortie du mode --input ('-' = stdout, défaut)")
+    print(f"  -j, --workers  Nombre de processus du mode --input (défaut: 1, 0 = tous les cœurs)")
+    print(f"  --chunksize    Taille des lots envoyés aux processus (défaut: {DEFAULT_CHUNKSIZE})")
+    print(f"  --mmap         Lit le FST en mémoire partagée (pages communes entre processus)")
+    print(f"  --serve        Lance le démon de normalisation (FST gardé en mémoire)")
+    print(f"  --reload       Démon : recharge le FAR à chaud quand il change (versions validées)")
+    print(f"  --cache N      Cache de N phrases normalisées (répétitions servies sans recalcul)")
+    print(f"  --cache-chars C  Borne le cache à C caractères stockés")
+    print(f"  --cache-policy P Éviction du cache: {', '.join(POLICIES)} (défaut: lru)")
+    print(f"  --cache-dir D  Persiste le cache dans D, par version de la grammaire (active le cache)")
+    print(f"  -s, --socket   Socket Unix du démon (défaut: {DEFAULT_SOCKET})")
+    print(f"  --metrics F    Active l'instrumentation et écrit les métriques dans F")
+    print(f"                 ('-' = stderr ; .prom/.txt = format Prometheus, sinon JSON)")
+    print(f"  --profile F    Exécute sous cProfile et écrit le profil dans F")
+    print()
+    print("Démon + client léger:")
+    print(f"  python {sys.argv[0]} --serve &")
+    print(f'  python script_client.py "5 bonbons"')
+    print()
+    print("Streaming:")
+    print(f"  python {sys.argv[0]} --input transcriptions.txt --output normalisees.txt")
+    print(f"  cat transcriptions.txt | python {sys.argv[0]} -i - > normalisees.txt")
     print()
     print(f"Fichier FAR utilisé: {FAR_FILE}")
 
@@ -132,30 +651,193 @@ def main():
         print_usage()
         sys.exit(0)
     
-    # Gérer le fichier FAR personnalisé
+    # Parser les options
     far_file = FAR_FILE
-    text_arg_index = 1
+    engine = DEFAULT_ENGINE
+    input_text = None
+    input_path = None
+    output_path = "-"
+    workers = 1
+    chunksize = DEFAULT_CHUNKSIZE
+    serve_mode = False
+    socket_path = DEFAULT_SOCKET
+    metrics_path = None
+    profile_path = None
+    factory = get_normalizer
+    reload = False
+    nbest = None
+    cache_size = cache_chars = cache_policy = cache_dir = None
+    
+    value_options = ["-f", "--file", "-e", "--engine", "-i", "--input", "-o", "--output",
+                     "-j", "--workers", "--chunksize", "-s", "--socket", "--metrics", "--profile",
+                     "--cache", "--cache-chars", "--cache-policy", "--cache-dir", "--locale", "--nbest"]
+    
+    i = 1
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        
+        if arg == "--mmap":
+            os.environ[MMAP_ENV_VAR] = "1"  # Hérité par les processus du pool
+            i += 1
+        elif arg == "--serve":
+            serve_mode = True
+            i += 1
+        elif arg == "--itn":
+            factory = get_itn_normalizer
+            i += 1
+        elif arg == "--reload":
+            reload = True
+            i += 1
+        elif arg in value_options:
+            if i + 1 >= len(sys.argv):
+                print(f"❌ ERREUR: Option {arg} requiert une valeur.", file=sys.stderr)
+                print_usage()
+                sys.exit(1)
+            value = sys.argv[i + 1]
+            if arg in ["-f", "--file"]:
+                far_file = value
+            elif arg in ["-e", "--engine"]:
+                engine = value
+            elif arg in ["-i", "--input"]:
+                input_path = value
+            elif arg in ["-o", "--output"]:
+                output_path = value
+            elif arg in ["-s", "--socket"]:
+                socket_path = value
+            elif arg == "--metrics":
+                metrics_path = value
+            elif arg == "--profile":
+                profile_path = value
+            elif arg == "--cache-dir":
+                cache_dir = value
+            elif arg == "--locale":
+                if value not in LOCALES:
+                    print(f"❌ ERREUR: Option {arg} requiert une locale parmi: {', '.join(LOCALES)}", file=sys.stderr)
+                    sys.exit(1)
+                os.environ[LOCALE_ENV_VAR] = value  # Hérité par les processus du pool
+            elif arg == "--cache-policy":
+                if value not in POLICIES:
+                    print(f"❌ ERREUR: Option {arg} requiert une politique parmi: {', '.join(POLICIES)}", file=sys.stderr)
+                    sys.exit(1)
+                cache_policy = value
+            else:
+                if not value.isdigit():
+                    print(f"❌ ERREUR: Option {arg} requiert un entier.", file=sys.stderr)
+                    sys.exit(1)
+                if arg == "--chunksize":
+                    chunksize = max(1, int(value))
+                elif arg == "--cache":
+                    cache_size = int(value)
+                elif arg == "--cache-chars":
+                    cache_chars = int(value)
+                elif arg == "--nbest":
+                    nbest = max(1, int(value))
+                else:
+                    workers = int(value) or (os.cpu_count() or 1)
+            i += 2
+        elif input_text is None:
+            input_text = arg
+            i += 1
+        else:
+            print(f"❌ ERREUR: Argument inconnu: {arg}", file=sys.stderr)
+            print_usage()
+            sys.exit(1)
+    
+    if reload and (not serve_mode or factory is not get_normalizer):
+        print("❌ ERREUR: --reload s'utilise avec --serve (sans --itn)", file=sys.stderr)
+        sys.exit(1)
+    if nbest is not None and (serve_mode or input_path is not None or factory is not get_normalizer):
+        print("❌ ERREUR: --nbest s'utilise avec un texte (sans --serve, --input ni --itn)", file=sys.stderr)
+        sys.exit(1)
     
-    if sys.argv[1] in ["-f", "--file"]:
-        if len(sys.argv) < 4:
-            print("❌ ERREUR: Fichier FAR et texte requis.", file=sys.stderr)
+    # Cache de phrases : variables d'environnement héritées par les processus du pool
+    configure_cache(cache_size, cache_chars, cache_policy, cache_dir)
+    
+    # Instrumentation et profilage optionnels
+    if metrics_path:
+        instrumentation.enable()
+    try:
+        with profile(profile_path):
+            run(input_text, engine, far_file, input_path, output_path, workers, chunksize,
+                serve_mode, socket_path, factory, reload, nbest)
+    finally:
+        save_sentence_caches()
+        if metrics_path:
+            metrics.dump(metrics_path)
+
+def run(input_text, engine=DEFAULT_ENGINE, far_file=FAR_FILE, input_path=None, output_path="-",
+        workers=1, chunksize=DEFAULT_CHUNKSIZE, serve_mode=False, socket_path=DEFAULT_SOCKET,
+        factory=get_normalizer, reload=False, nbest=None):
+    """
+    Exécute le mode choisi sur la ligne de commande (démon, streaming ou texte)
+    factory: get_normalizer, ou get_itn_normalizer pour la normalisation inverse
+    reload: rechargement à chaud du FAR (mode démon)
+    nbest: affiche les nbest meilleures verbalisations de chaque nombre du texte
+    """
+    
+    # Mode démon : le FST reste chargé entre les appels
+    if serve_mode:
+        serve(socket_path, engine, far_file, factory, reload)
+        return
+    
+    # Mode streaming : un seul chargement du FST pour tout le fichier
+    if input_path is not None:
+        if input_text is not None:
+            print(f"❌ ERREUR: Argument inconnu: {input_text}", file=sys.stderr)
             print_usage()
             sys.exit(1)
-        far_file = sys.argv[2]
-        text_arg_index = 3
+        if input_path != "-" and not Path(input_path).exists():
+            print(f"❌ ERREUR: Le fichier '{input_path}' n'existe pas.", file=sys.stderr)
+            sys.exit(1)
+        # Vérifier avant de lancer les processus (une erreur dans un processus du pool le bloquerait)
+        if engine not in ENGINES:
+            print(f"❌ ERREUR: Moteur inconnu: {engine} (choix: {', '.join(ENGINES)})", file=sys.stderr)
+            sys.exit(1)
+        if engine == "array":
+            load_array_transducer(far_file)
+        elif not Path(far_file).exists():
+            load_fst_from_far(far_file)
+        start = time.perf_counter()
+        count = stream_normalize(input_path, output_path, engine, far_file, workers, chunksize, factory)
+        elapsed = time.perf_counter() - start
+        print(f"✓ {count} lignes normalisées en {elapsed:.2f} s", file=sys.stderr)
+        print_cache_stats()
+        return
+    
+    if input_text is None:
+        print("❌ ERREUR: Aucun texte fourni.", file=sys.stderr)
+        print_usage()
+        sys.exit(1)
     
-    # Récupérer le texte à normaliser
-    input_text = sys.argv[text_arg_index]
+    if nbest is not None:
+        if pynini is None:
+            print("❌ ERREUR: --nbest nécessite pynini", file=sys.stderr)
+            sys.exit(1)
+        for _, _, result in nbest_numbers(input_text, nbest, far_file):
+            if result.error is not None:
+                print(f"❌ {result.text}: {result.error}")
+                continue
+            print(f"🔢 {result.text}")
+            for text, weight in result.candidates:
+                print(f"   {weight:5.2f}  {text}")
+        return
     
-    # Charger le FST
-    fst = load_fst_from_far(far_file)
+    # Charger le FST du moteur choisi
+    normalize = factory(engine, far_file)
     
     # Normaliser le texte
-    normalized_text = normalize_text(input_text, fst)
+    normalized_text = normalize(input_text)
     
     # Afficher le résultat
     print(normalized_text)
 
+def print_cache_stats(file=sys.stderr):
+    """Affiche les statistiques des caches de phrases de ce processus (s'il y en a)"""
+    for name, stats in sentence_cache_stats().items():
+        print(f"🗃️ Cache {name}: {stats['hits']} succès, {stats['misses']} échecs "
+              f"({stats['hit_rate'] * 100:.1f}%), {stats['entries']} entrées, "
+              f"{stats['evictions']} évictions", file=file)
+
 # ============================================
 # MODE INTERACTIF (BONUS)
 # ============================================
@@ -170,8 +852,14 @@ def interactive_mode():
     print("="*60)
     print()
     
-    # Charger le FST une seule fois
-    fst = load_fst_from_far()
+    # Charger le FST une seule fois ; le FAR est revérifié avant chaque texte
+    holder = None
+    if DEFAULT_ENGINE == "array":
+        normalize = get_normalizer()
+    else:
+        normalize, holder = get_reloadable_normalizer()
+        print(f"Grammaire: version {holder.version}")
+        print()
     
     while True:
         try:
@@ -187,12 +875,17 @@ def interactive_mode():
             if not user_input:
                 continue
             
+            # Nouvelle version du FAR : validée puis activée
+            if holder is not None and holder.check():
+                status = holder.status()
+                print(f"🔄 Grammaire rechargée: version {status['version']} ({status['load_seconds'] * 1000:.0f} ms)")
+            
             # Normaliser et afficher
-            result = normalize_text(user_input, fst)
+            result = normalize(user_input)
             print(f"  → {result}")
             print()
             
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print("\n\n👋 Au revoir!")
             break
         except Exception as e:
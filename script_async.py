@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Service asyncio de normalisation avec micro-batching
+Usage: python script_async.py [--socket CHEMIN] [--window MS] [--max-batch N] [-j N]
+
+Les requêtes qui arrivent dans une même fenêtre (quelques ms) sont regroupées
+en un lot, normalisé dans un executor : la boucle d'événements ne bloque jamais.
+Protocole : celui de script_client.py (une requête JSON par ligne, socket Unix) ;
+{"stats": true} retourne les statistiques (profondeur de file, tailles de lots).
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from script import (DEFAULT_ENGINE, ENGINES, FAR_FILE, _init_worker, _normalize_chunk_in_worker,
+                    _remove_stale_socket, check_engine, get_normalizer)
+from script_client import decode_message, encode_message
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DEFAULT_ASYNC_SOCKET = os.path.join(tempfile.gettempdir(), f"cardinal_numbers-async-{os.getuid()}.sock")
+DEFAULT_WINDOW_MS = 2.0     # Fenêtre de regroupement des requêtes
+DEFAULT_MAX_BATCH = 256     # Taille maximale d'un lot
+LINE_LIMIT = 16 * 1024 * 1024  # Taille maximale d'une requête (octets)
+
+# ============================================
+# SERVICE
+# ============================================
+
+class NormalizationService:
+    """
+    File de requêtes + tâche de regroupement en lots
+
+    workers=0 : lots normalisés dans un thread (FST chargé une fois ici)
+    workers>0 : lots répartis sur un pool de processus (FST chargé par processus),
+                jusqu'à workers lots en cours à la fois
+    """
+
+    def __init__(self, engine=DEFAULT_ENGINE, far_path=FAR_FILE, window_ms=DEFAULT_WINDOW_MS,
+                 max_batch=DEFAULT_MAX_BATCH, workers=0):
+        if engine not in ENGINES:
+            raise ValueError(f"Moteur inconnu: {engine} (choix: {', '.join(ENGINES)})")
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.concurrency = max(1, workers)
+        if workers > 0:
+            check_engine(engine, far_path)
+            self.executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                                initargs=(get_normalizer, (engine, far_path)))
+            self.normalize_batch = _normalize_chunk_in_worker
+        else:
+            normalize = get_normalizer(engine, far_path)
+            self.executor = ThreadPoolExecutor(1)
+            self.normalize_batch = lambda texts: [normalize(text) for text in texts]
+        self.queue = None
+        self.batch_task = None
+        self.slots = None
+        self.batch_tasks = set()
+        self.in_flight = 0          # Lots en cours de normalisation
+        self.requests = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.started = time.monotonic()
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.batch_task = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        self.batch_task.cancel()
+        for task in self.batch_tasks:
+            task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def normalize(self, text):
+        """Normalise un texte ; attend la fin du lot qui le contient"""
+        future = asyncio.get_running_loop().create_future()
+        self.requests += 1
+        await self.queue.put((text, future))
+        return await future
+
+    async def _collect_batch(self):
+        """Premier élément en attente, puis tout ce qui arrive dans la fenêtre"""
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Ce qui est déjà en file part avec le lot, sans attendre
+        while len(batch) < self.max_batch and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _batch_loop(self):
+        """Regroupe les requêtes en lots ; un lot part dès qu'un processus est libre"""
+        while True:
+            await self.slots.acquire()
+            try:
+                batch = await self._collect_batch()
+            except BaseException:
+                self.slots.release()
+                raise
+            self.batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self.in_flight += 1
+            task = asyncio.create_task(self._run_batch(batch))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+
+    async def _run_batch(self, batch):
+        """Normalise un lot dans l'executor et répond à chacune de ses requêtes"""
+        texts = [text for text, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.normalize_batch, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.in_flight -= 1
+            self.slots.release()
+
+    def stats(self):
+        """Profondeur de file et statistiques des lots"""
+        return {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "uptime_s": time.monotonic() - self.started,
+        }
+
+# ============================================
+# SERVEUR (SOCKET UNIX)
+# ============================================
+
+async def _handle_connection(service, reader, writer):
+    """
+    Lit les requêtes au fil de l'eau (pipelining autorisé) et répond dans l'ordre
+    """
+    responses = asyncio.Queue()
+
+    async def answer(message):
+        try:
+            if message.get("stats"):
+                return {"stats": service.stats()}
+            # Vérifié avant la file : un texte invalide ferait échouer tout son lot
+            if not isinstance(message.get("text"), str):
+                return {"error": "Requête invalide: 'text' doit être une chaîne"}
+            return {"result": await service.normalize(message["text"])}
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def write_responses():
+        while True:
+            task = await responses.get()
+            if task is None:
+                break
+            writer.write(encode_message(await task))
+            await writer.drain()
+
+    writer_task = asyncio.create_task(write_responses())
+    try:
+        async for line in reader:
+            try:
+                message = decode_message(line)
+            except ValueError as e:
+                invalid = asyncio.get_running_loop().create_future()
+                invalid.set_result({"error": f"Requête invalide: {e}"})
+                await responses.put(invalid)
+                continue
+            await responses.put(asyncio.create_task(answer(message)))
+    finally:
+        await responses.put(None)
+        await writer_task
+        writer.close()
+
+async def serve_async(socket_path=DEFAULT_ASYNC_SOCKET, **service_options):
+    # Quitte si un service répond encore sur ce socket
+    _remove_stale_socket(socket_path)
+    service = NormalizationService(**service_options)
+    await service.start()
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: _handle_connection(service, reader, writer), path=socket_path,
+        limit=LINE_LIMIT)
+    print(f"✓ Service asyncio prêt sur {socket_path}", file=sys.stderr, flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+# ============================================
+# INTERFACE EN LIGNE DE COMMANDE
+# ============================================
+
+def print_usage():
+    """Affiche l'aide d'utilisation"""
+    print("Usage:")
+    print(f"  python {sys.argv[0]} [options]")
+    print()
+    print("Options:")
+    print(f"  -h, --help         Affiche cette aide")
+    print(f"  -s, --socket PATH  Socket Unix (défaut: {DEFAULT_ASYNC_SOCKET})")
+    print(f"  -e, --engine NAME  Moteur: {', '.join(ENGINES)} (défaut: {DEFAULT_ENGINE})")
+    print(f"  -f, --file FAR     Fichier FAR (défaut: {FAR_FILE})")
+    print(f"  --window MS        Fenêtre de regroupement en ms (défaut: {DEFAULT_WINDOW_MS})")
+    print(f"  --max-batch N      Taille maximale d'un lot (défaut: {DEFAULT_MAX_BATCH})")
+    print(f"  -j, --workers N    Processus de normalisation (défaut: 0 = un thread)")
+    print()
+    print("Charge de test:")
+    print(f"  python benchmarks/load_async.py --spawn")
+
+def main():
+    """Point d'entrée principal"""
+    socket_path = DEFAULT_ASYNC_SOCKET
+    options = {}
+    args = sys.argv[1:]
+    if args and args[0] in ["-h", "--help"]:
+        print_usage()
+        sys.exit(0)
+
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if i + 1 >= len(args):
+            print(f"❌ ERREUR: Argument invalide: {arg}", file=sys.stderr)
+            print_usage()
+            sys.exit(1)
+        value = args[i + 1]
+        try:
+            if arg in ["-s", "--socket"]:
+                socket_path = value
+            elif arg in ["-e", "--engine"]:
+                options["engine"] = value
+            elif arg in ["-f", "--file"]:
+                options["far_path"] = value
+            elif arg == "--window":
+                options["window_ms"] = float(value)
+            elif arg == "--max-batch":
+                options["max_batch"] = max(1, int(value))
+            elif arg in ["-j", "--workers"]:
+                options["workers"] = int(value)
+            else:
+                print(f"❌ ERREUR: Argument inconnu: {arg}", file=sys.stderr)
+                print_usage()
+                sys.exit(1)
+        except ValueError:
+            print(f"❌ ERREUR: Valeur invalide pour {arg}: {value}", file=sys.stderr)
+            sys.exit(1)
+        i += 2
+
+    try:
+        asyncio.run(serve_async(socket_path, **options))
+    except ValueError as e:
+        print(f"❌ ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n👋 Arrêt du service", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Client léger du démon de normalisation (python script.py --serve)
+Usage: python script_client.py "5 bonbons"
+
+N'importe ni pynini ni le FAR : le texte est envoyé au démon par socket Unix.
+Si aucun démon n'écoute, la normalisation est faite dans le processus (script.py).
+"""
+
+import os
+import sys
+import json
+import socket
+import tempfile
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Chemin du socket : variable d'environnement, sinon fichier par utilisateur dans /tmp
+SOCKET_ENV_VAR = "NORMALIZE_SOCKET"
+DEFAULT_SOCKET = os.environ.get(
+    SOCKET_ENV_VAR,
+    os.path.join(tempfile.gettempdir(), f"cardinal_numbers-{os.getuid()}.sock"),
+)
+CONNECT_TIMEOUT = 5.0
+
+# ============================================
+# PROTOCOLE (une requête JSON par ligne)
+# ============================================
+#   requête : {"text": "5 bonbons"}
+#   réponse : {"result": "cinq bonbons"}  ou  {"error": "..."}
+
+def encode_message(message):
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+def decode_message(line):
+    return json.loads(line.decode("utf-8"))
+
+# ============================================
+# CLIENT
+# ============================================
+
+def normalize_via_daemon(texts, socket_path=DEFAULT_SOCKET):
+    """
+    Normalise une liste de textes avec le démon, sur une seule connexion
+    Lève OSError si aucun démon n'écoute sur socket_path, RuntimeError si le démon
+    retourne une erreur.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(socket_path)
+        sock.settimeout(None)
+        sock.sendall(b"".join(encode_message({"text": text}) for text in texts))
+        sock.shutdown(socket.SHUT_WR)
+
+        results = []
+        with sock.makefile("rb") as responses:
+            for line in responses:
+                response = decode_message(line)
+                if "error" in response:
+                    raise RuntimeError(response["error"])
+                results.append(response["result"])
+    return results
+
+def normalize_texts(texts, socket_path=DEFAULT_SOCKET):
+    """
+    Normalise via le démon, ou dans le processus si aucun démon ne répond
+    """
+    try:
+        return normalize_via_daemon(texts, socket_path)
+    except OSError:
+        # Pas de démon : import (coûteux) de pynini et chargement du FAR ici
+        from script import get_normalizer
+        normalize = get_normalizer()
+        return [normalize(text) for text in texts]
+
+# ============================================
+# INTERFACE EN LIGNE DE COMMANDE
+# ============================================
+
+def print_usage():
+    """Affiche l'aide d'utilisation"""
+    print("Usage:")
+    print(f"  python {sys.argv[0]} [--socket CHEMIN] <texte> [<texte> ...]")
+    print()
+    print("Démarrer le démon:")
+    print("  python script.py --serve &")
+    print()
+    print(f"Socket utilisé: {DEFAULT_SOCKET} (variable {SOCKET_ENV_VAR})")
+
+def main():
+    """Point d'entrée principal"""
+    args = sys.argv[1:]
+    if not args or args[0] in ["-h", "--help"]:
+        print_usage()
+        sys.exit(0 if args else 1)
+
+    socket_path = DEFAULT_SOCKET
+    if args[0] in ["-s", "--socket"]:
+        if len(args) < 3:
+            print("❌ ERREUR: Chemin du socket et texte requis.", file=sys.stderr)
+            sys.exit(1)
+        socket_path = args[1]
+        args = args[2:]
+
+    try:
+        results = normalize_texts(args, socket_path)
+    except RuntimeError as e:
+        print(f"❌ ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
+    for result in results:
+        print(result)
+
+if __name__ == "__main__":
+    main()
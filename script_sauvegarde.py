@@ -1,33 +1,213 @@
-from Text_Normalisation_Cardinaux_0_a_1000 import *
+import os
+import sys
+import json
+import time
+import random
+import statistics
+from fst_array import FST_NAME as ARRAY_FST_NAME, export_fst, export_path, verification_inputs, verify
+from fst_loader import DEFAULT_LOCALE, LOCALES, clear_cache, far_entry_name, load_fst, mmap_read_mode, shortest_string
+from lazy_modules import lazy_import
+from Text_Normalisation_Cardinaux_0_a_1000 import GRAMMAR_CACHE_DIR, apply_fst, build_grammar
 
+pd = lazy_import("pandas")
+pynini = lazy_import("pynini")
+pywrapfst = lazy_import("pywrapfst")
+
+
+# ============================================
+# Configuration de la construction
+# ============================================
+
+def _encoded(operation):
+    """Applique operation au FST vu comme un accepteur (étiquettes entrée/sortie encodées)"""
+    def apply(fst):
+        mapper = pywrapfst.EncodeMapper(fst.arc_type(), encode_labels=True)
+        fst = fst.copy()
+        fst.encode(mapper)
+        fst = operation(fst)
+        fst.decode(mapper)
+        return fst
+    return apply
+
+# Passes d'optimisation disponibles, appliquées dans l'ordre demandé
+OPTIMIZATION_PASSES = {
+    "rmepsilon": lambda fst: fst.copy().rmepsilon(),
+    "determinize": _encoded(lambda fst: pynini.determinize(fst)),
+    "minimize": _encoded(lambda fst: fst.minimize()),
+    "optimize": lambda fst: fst.copy().optimize(),
+    "arcsort": lambda fst: fst.copy().arcsort("ilabel"),   # tri sur l'entrée (composition)
+}
+DEFAULT_PASSES = ["optimize", "arcsort"]
+
+# Format de stockage des FSTs dans le FAR (relus par pynini.Far comme des VectorFst)
+FAR_FST_TYPES = {
+    "vector": "vector",
+    "const": "const",                     # lecture seule, un seul bloc mémoire
+    "compact": "compact_unweighted",      # arcs compactés (FSTs non pondérés)
+}
+DEFAULT_FAR_FST_TYPE = "vector"
+
+# Entrées du FAR -> nœud du graphe de la grammaire
+FAR_ENTRIES = {
+    "CARDINAL": "fst_00_to_1000",
+    "CARDINAL_LARGE": "fst_00_to_999999999999",   # jusqu'à 999 999 999 999, par groupes de 3 chiffres
+    "SENTENCE": "sentence",                       # réécriture de phrase (une composition par phrase)
+    "CARDINAL_WEIGHTED": "weighted_cardinal",     # sorties alternatives pondérées (n-best)
+    "CARDINAL_LARGE_WEIGHTED": "weighted_large_cardinal",
+}
+
+# Nombre d'entrées utilisées pour mesurer le temps de composition du rapport
+REPORT_SAMPLE = 1000
+REPORT_LOAD_REPEAT = 5
+DATASET = "data/dataset_normalisation_0_1000.csv"
 
 # ============================================
 # Creation du fichier FAR
 # ============================================
 
-def create_far_archive(output_path="cardinal_numbers.far"):
+def optimize_fst(fst, passes=DEFAULT_PASSES):
+    """Applique les passes d'optimisation à une copie du FST"""
+    for name in passes:
+        fst = OPTIMIZATION_PASSES[name](fst)
+    return fst
+
+def _convert(fst, fst_type):
+    """Convertit au format de stockage ; repli sur vector si le FST n'est pas compatible"""
+    if fst_type == "vector":
+        return fst
+    try:
+        return pywrapfst.convert(fst, FAR_FST_TYPES[fst_type])
+    except pywrapfst.FstOpError:
+        print(f"  ⚠️ Conversion en '{fst_type}' impossible, stockage en 'vector'")
+        return fst
+
+def create_far_archive(output_path="cardinal_numbers.far", passes=DEFAULT_PASSES,
+                       fst_type=DEFAULT_FAR_FST_TYPE, locales=LOCALES, cache_dir=GRAMMAR_CACHE_DIR):
     """
     Crée un fichier FAR contenant le FST de normalisation
+    passes: passes d'optimisation appliquées à chaque FST (voir OPTIMIZATION_PASSES)
+    fst_type: format de stockage des FSTs ("vector", "const" ou "compact")
+    locales: variantes régionales écrites dans le FAR (entrées CARDINAL, CARDINAL_fr-BE...)
+    cache_dir: cache disque des sous-FSTs (None = tout recompiler, voir build_grammar)
     """
+    if fst_type not in FAR_FST_TYPES:
+        raise ValueError(f"Format inconnu: {fst_type} (choix: {', '.join(FAR_FST_TYPES)})")
+    unknown = [name for name in passes if name not in OPTIMIZATION_PASSES]
+    if unknown:
+        raise ValueError(f"Passe inconnue: {unknown[0]} (choix: {', '.join(OPTIMIZATION_PASSES)})")
+    unknown = [locale for locale in locales if locale not in LOCALES]
+    if unknown:
+        raise ValueError(f"Locale inconnue: {unknown[0]} (choix: {', '.join(LOCALES)})")
+    if DEFAULT_LOCALE not in locales:
+        raise ValueError(f"La variante par défaut {DEFAULT_LOCALE} est obligatoire (entrées sans suffixe)")
     
-    # print("Construction du FST cardinal...")
-    # cardinal_fst = build_cardinal_fst()
-    
-    print(f"Création du fichier FAR: {output_path}")
+    # Seuls les sous-FSTs modifiés (et ceux qui en dépendent) sont recompilés ;
+    # les sous-FSTs communs aux variantes ne sont construits qu'une fois (memo partagé)
+    print(f"Construction de la grammaire ({', '.join(locales)})...")
+    report = {}
+    memo = {}
+    fsts = {}
+    start = time.perf_counter()
+    for locale in locales:
+        grammar = build_grammar(list(FAR_ENTRIES.values()), cache_dir=cache_dir, report=report, memo=memo,
+                                variant=locale)
+        for name, node in FAR_ENTRIES.items():
+            fsts[far_entry_name(name, locale)] = grammar[node]
+    print_build_report(report, time.perf_counter() - start)
     
-    # Écrire le fichier FAR avec pynini.Far en mode écriture
-    far_writer = pynini.Far(output_path, mode="w")
+    print(f"Création du fichier FAR: {output_path} (passes: {', '.join(passes) or 'aucune'}, format: {fst_type})")
     
-    # Ajouter le FST avec la méthode add()
-    far_writer.add("CARDINAL", fst_00_to_1000)
-    print(f"  ✓ FST 'CARDINAL' ajouté au FAR")
+    # Écrire le fichier FAR (pywrapfst accepte aussi les formats const et compact)
+    far_writer = pywrapfst.FarWriter.create(output_path)
+    for name in sorted(fsts):  # Le FAR exige des clés triées
+        far_writer.add(name, _convert(optimize_fst(fsts[name], passes), fst_type))
+        print(f"  ✓ FST '{name}' ajouté au FAR")
     
-    # Fermer le writer
-    far_writer.close()
+    # Fermer le writer (le fichier est finalisé à la destruction)
+    del far_writer
     
     print(f"✓ Fichier FAR créé avec succès: {output_path}")
     return output_path
 
+def print_build_report(report, elapsed):
+    """Affiche les sous-FSTs recompilés et ceux relus depuis le cache"""
+    built = sorted((seconds, name) for name, (status, seconds) in report.items() if status == "built")
+    cached = len(report) - len(built)
+    print(f"✓ Grammaire prête en {elapsed:.2f} s : {len(built)} sous-FSTs recompilés, {cached} relus depuis le cache")
+    for seconds, name in reversed(built[-5:]):
+        print(f"  🔧 {name}: {seconds:.2f} s")
+
+# ============================================
+# Rapport taille / complexité
+# ============================================
+
+def _report_inputs(name):
+    """(token_type, accepteurs) utilisés pour mesurer la composition d'une entrée du FAR"""
+    rng = random.Random(0)
+    if name.startswith("CARDINAL_LARGE"):
+        numbers = [str(rng.randrange(10 ** rng.randint(1, 12))) for _ in range(REPORT_SAMPLE)]
+        return "utf8", [pynini.accep(number, token_type="utf8") for number in numbers]
+    if name.startswith("CARDINAL"):
+        return "utf8", [pynini.accep(str(i), token_type="utf8") for i in range(1001)]
+    if os.path.exists(DATASET):
+        sentences = pd.read_csv(DATASET)["input"].astype(str).to_list()
+    else:
+        sentences = [f"J'ai {rng.randint(0, 1000)} chats et {rng.randint(0, 1000)} chiens" for _ in range(100)]
+    return "byte", [pynini.accep(pynini.escape(sentence)) for sentence in sentences[:REPORT_SAMPLE]]
+
+def far_report(far_path="cardinal_numbers.far"):
+    """
+    Mesure chaque FST du FAR : états, arcs, format et taille stockés,
+    temps de chargement et temps moyen de composition par entrée (VectorFst et ConstFst),
+    et mode de lecture des exports en mmap (FST_LOADER_MMAP=1) : "map", ou "read" sans SetFlags
+    """
+    report = {"far_path": str(far_path), "far_size_bytes": os.path.getsize(far_path),
+              "mmap_read_mode": mmap_read_mode(), "fsts": {}}
+    far_reader = pywrapfst.FarReader.open(str(far_path))
+    stored = {}
+    while not far_reader.done():
+        stored[far_reader.get_key()] = far_reader.get_fst()
+        far_reader.next()
+    
+    for name, fst in stored.items():
+        mutable = pynini.Fst.from_pywrapfst(pywrapfst.convert(fst, "vector"))
+        entry = {
+            "states": mutable.num_states(),
+            "arcs": sum(mutable.num_arcs(state) for state in mutable.states()),
+            "stored_type": fst.fst_type(),
+            "size_bytes": len(fst.write_to_string()),
+        }
+        token_type, inputs = _report_inputs(name)
+        for loader_type in ["vector", "const"]:
+            durations = []
+            for _ in range(REPORT_LOAD_REPEAT):
+                clear_cache()
+                start = time.perf_counter()
+                loaded = load_fst(far_path, name, loader_type, mmap=False)
+                durations.append(time.perf_counter() - start)
+            entry[f"load_{loader_type}_ms"] = statistics.median(durations) * 1000
+            start = time.perf_counter()
+            for input_fst in inputs:
+                shortest_string(input_fst, loaded, token_type)
+            entry[f"compose_{loader_type}_us"] = (time.perf_counter() - start) / len(inputs) * 1e6
+        report["fsts"][name] = entry
+    clear_cache()
+    return report
+
+def print_far_report(report):
+    """Affiche le rapport de far_report"""
+    print(f"\n📊 Rapport du FAR {report['far_path']} ({report['far_size_bytes']} octets)")
+    print(f"  {'FST':<31}{'états':>8}{'arcs':>9}{'format':>20}{'octets':>10}"
+          f"{'chargement (vector/const)':>28}{'composition (vector/const)':>30}")
+    for name, entry in report["fsts"].items():
+        load = f"{entry['load_vector_ms']:.2f} / {entry['load_const_ms']:.2f} ms"
+        compose = f"{entry['compose_vector_us']:.1f} / {entry['compose_const_us']:.1f} µs"
+        print(f"  {name:<31}{entry['states']:>8}{entry['arcs']:>9}{entry['stored_type']:>20}"
+              f"{entry['size_bytes']:>10}{load:>28}{compose:>30}")
+    mode = report["mmap_read_mode"]
+    print(f"  Lecture des exports mmap (FST_LOADER_MMAP=1): {mode}"
+          + (" (SetFlags introuvable : lecture classique)" if mode == "read" else " (projection en mémoire)"))
+
 #============================================
 # 4. FONCTION DE TEST
 # ============================================
@@ -56,24 +236,139 @@ def test_fst_from_far(far_path="cardinal_numbers.far"):
         except Exception as e:
             print(f"{number:>4} → ERREUR: {e}")
     
+    # Test du FST des grands nombres
+    try:
+        large_fst = far_reader["CARDINAL_LARGE"]
+    except KeyError:
+        large_fst = None
+    if large_fst is not None:
+        for number in ["2024", "2300000", "1000000000"]:
+            print(f"{number:>10} → {apply_fst(number, large_fst)}")
+    
+    # Test du FST de phrase
+    try:
+        sentence_fst = far_reader["SENTENCE"]
+    except KeyError:
+        sentence_fst = None
+    if sentence_fst is not None:
+        sentence = "J'ai 3 chiens et 71 chats, pas 12345."
+        result = pynini.shortestpath(pynini.accep(pynini.escape(sentence)) @ sentence_fst).string()
+        print(f"\n{sentence} → {result}")
+    
+    # Variantes régionales présentes dans le FAR (70, 80, 90)
+    for locale in LOCALES[1:]:
+        try:
+            variant_fst = far_reader[far_entry_name("CARDINAL", locale)]
+        except KeyError:
+            continue
+        results = ", ".join(apply_fst(number, variant_fst) for number in ["71", "80", "99"])
+        print(f"{locale}: 71, 80, 99 → {results}")
+    
     # Fermer le reader
     far_reader.close()
 
 # ============================================
-# 5. FONCTION PRINCIPALE
+# 5. EXPORTS DU MOTEUR ARRAY
+# ============================================
+
+def export_array_transducers(far_path="cardinal_numbers.far", locales=LOCALES):
+    """
+    Exporte CARDINAL de chaque variante en tableaux NumPy (<FAR>.CARDINAL_fr-BE.npz...)
+    Le moteur array (--locale compris) n'a ainsi jamais besoin de pynini pour les générer.
+    Chaque export est comparé à la composition pynini sur toutes les entrées de 1 à 4 chiffres.
+    """
+    print(f"\nExport du moteur array ({', '.join(locales)})...")
+    for locale in locales:
+        name = far_entry_name(ARRAY_FST_NAME, locale)
+        fst = load_fst(far_path, name)
+        transducer = export_fst(fst)
+        mismatches = verify(transducer, fst, verification_inputs(ARRAY_FST_NAME))
+        if mismatches:
+            raise ValueError(f"{name}: {len(mismatches)} écarts avec la composition pynini")
+        path = export_path(far_path, name)
+        transducer.save(path)
+        print(f"  💾 {name}: {transducer.num_states()} états -> {path}")
+
+# ============================================
+# 6. FONCTION PRINCIPALE
 # ============================================
 
+def print_usage():
+    """Affiche l'aide d'utilisation"""
+    print("Usage:")
+    print(f"  python {sys.argv[0]} [options]")
+    print()
+    print("Options:")
+    print(f"  -h, --help          Affiche cette aide")
+    print(f"  -o, --output FAR    Fichier FAR créé (défaut: cardinal_numbers.far)")
+    print(f"  --passes P1,P2      Passes d'optimisation: {', '.join(OPTIMIZATION_PASSES)}")
+    print(f"                      (défaut: {','.join(DEFAULT_PASSES)} ; 'none' = aucune)")
+    print(f"  --fst-type TYPE     Format de stockage: {', '.join(FAR_FST_TYPES)} (défaut: {DEFAULT_FAR_FST_TYPE})")
+    print(f"  --locales L1,L2     Variantes régionales écrites: {', '.join(LOCALES)} (défaut: toutes)")
+    print(f"  --report FILE       Sauvegarde le rapport taille / complexité en JSON")
+
 def main():
     """Point d'entrée principal"""
+    far_path = "cardinal_numbers.far"
+    passes = DEFAULT_PASSES
+    fst_type = DEFAULT_FAR_FST_TYPE
+    report_path = None
+    locales = LOCALES
+    
+    args = sys.argv[1:]
+    if args and args[0] in ["-h", "--help"]:
+        print_usage()
+        sys.exit(0)
+    
+    i = 0
+    while i < len(args):
+        if args[i] in ["-o", "--output", "--passes", "--fst-type", "--locales", "--report"] and i + 1 < len(args):
+            value = args[i + 1]
+            if args[i] == "--passes":
+                passes = [] if value == "none" else [name for name in value.split(",") if name]
+            elif args[i] == "--fst-type":
+                fst_type = value
+            elif args[i] == "--locales":
+                locales = [locale for locale in value.split(",") if locale]
+            elif args[i] == "--report":
+                report_path = value
+            else:
+                far_path = value
+            i += 2
+        else:
+            print(f"❌ ERREUR: Argument inconnu: {args[i]}", file=sys.stderr)
+            print_usage()
+            sys.exit(1)
     
     # Créer le fichier FAR
-    far_path = create_far_archive("cardinal_numbers.far")
+    try:
+        far_path = create_far_archive(far_path, passes, fst_type, locales)
+    except ValueError as e:
+        print(f"❌ ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
     
     # Tester le FST
     test_fst_from_far(far_path)
     
+    # Exports NumPy du moteur array, un par variante
+    try:
+        export_array_transducers(far_path, locales)
+    except ValueError as e:
+        print(f"❌ ERREUR: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    # Rapport taille / complexité
+    report = far_report(far_path)
+    report["passes"] = passes
+    report["locales"] = locales
+    print_far_report(report)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Rapport sauvegardé dans: {report_path}")
+    
     print("\n✓ Processus terminé avec succès!")
     
     
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Cache des phrases normalisées (texte -> texte)
+- borné en nombre d'entrées et, en option, en caractères stockés
+- éviction "lru" (la moins récemment lue) ou "fifo" (la plus ancienne insérée)
+- statistiques : succès, échecs, évictions (compteurs cache_* de l'instrumentation)
+- persistance optionnelle : un fichier JSON par normaliseur et par version de la
+  grammaire (empreinte du FAR) ; une grammaire modifiée ne relit jamais un ancien cache
+- processus du pool : leurs nouvelles entrées sont renvoyées au parent, qui les
+  fusionne dans ses caches avant de les sauvegarder
+La configuration passe par des variables d'environnement, héritées par les
+processus du pool comme FST_LOADER_MMAP.
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from instrumentation import metrics
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Variables d'environnement (positionnées par --cache, --cache-chars, --cache-policy, --cache-dir)
+CACHE_SIZE_ENV_VAR = "SENTENCE_CACHE_SIZE"      # entrées max (absente ou 0 = pas de cache)
+CACHE_CHARS_ENV_VAR = "SENTENCE_CACHE_CHARS"    # caractères stockés max (0 = sans limite)
+CACHE_POLICY_ENV_VAR = "SENTENCE_CACHE_POLICY"  # "lru" ou "fifo"
+CACHE_DIR_ENV_VAR = "SENTENCE_CACHE_DIR"        # dossier de persistance (absent = en mémoire)
+
+POLICIES = ["lru", "fifo"]
+DEFAULT_POLICY = "lru"
+DEFAULT_CACHE_SIZE = 100_000
+DEFAULT_CACHE_DIR = ".sentence_cache"
+
+# Caches de ce processus, un par normaliseur (nom -> SentenceCache)
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+# Processus du pool : les entrées ajoutées sont notées pour être renvoyées au parent
+_TRACK_NEW_ENTRIES = False
+
+# ============================================
+# CACHE
+# ============================================
+
+class SentenceCache:
+    """
+    Dictionnaire borné phrase -> phrase normalisée, utilisable depuis plusieurs threads
+    max_entries: nombre maximal de phrases
+    max_chars: nombre maximal de caractères stockés (entrées + sorties), None = sans limite
+    policy: "lru" ou "fifo"
+    version: version de la grammaire qui a produit les sorties
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE, max_chars=None, policy=DEFAULT_POLICY, version=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Politique d'éviction inconnue: {policy} (choix: {', '.join(POLICIES)})")
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.policy = policy
+        self.version = version
+        self.entries = OrderedDict()
+        self.chars = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.new_entries = None  # Liste des entrées ajoutées, si elles sont suivies
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, text):
+        """Sortie en cache pour text, ou None"""
+        with self.lock:
+            result = self.entries.get(text)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if self.policy == "lru":
+                    self.entries.move_to_end(text)
+        if metrics.enabled:
+            metrics.incr("cache_misses" if result is None else "cache_hits")
+        return result
+
+    def put(self, text, result):
+        """Ajoute une sortie, puis évince jusqu'à respecter les bornes"""
+        size = len(text) + len(result)
+        if self.max_chars is not None and size > self.max_chars:
+            return
+        evicted = 0
+        with self.lock:
+            previous = self.entries.pop(text, None)
+            if previous is not None:
+                self.chars -= len(text) + len(previous)
+            self.entries[text] = result
+            self.chars += size
+            if self.new_entries is not None:
+                self.new_entries.append((text, result))
+            while len(self.entries) > self.max_entries or (
+                    self.max_chars is not None and self.chars > self.max_chars):
+                old_text, old_result = self.entries.popitem(last=False)
+                self.chars -= len(old_text) + len(old_result)
+                evicted += 1
+            self.evictions += evicted
+        if evicted and metrics.enabled:
+            metrics.incr("cache_evictions", evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.chars = 0
+
+    def stats(self):
+        """Succès, échecs, taux de succès, évictions et occupation"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "chars": self.chars,
+            "max_entries": self.max_entries,
+            "max_chars": self.max_chars,
+            "policy": self.policy,
+            "version": self.version,
+        }
+
+    # ----- Persistance -----
+
+    def save(self, path):
+        """
+        Écrit les entrées (de la plus ancienne à la plus récente) dans un fichier JSON
+        Fichier temporaire puis renommage atomique ; un échec n'est pas bloquant.
+        """
+        path = Path(path)
+        with self.lock:
+            data = {"version": self.version, "entries": list(self.entries.items())}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            return False
+
+    def load(self, path):
+        """
+        Relit un fichier écrit par save (seulement s'il vient de la même version)
+        Retourne le nombre d'entrées relues.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get("version") != self.version:
+            return 0
+        for text, result in data.get("entries", []):
+            self.put(text, result)
+        return len(self.entries)
+
+# ============================================
+# CACHES DU PROCESSUS
+# ============================================
+
+def cache_file(cache_dir, name, version):
+    """Fichier de persistance d'un normaliseur pour une version de la grammaire"""
+    return Path(cache_dir) / f"{name}.{version}.json"
+
+def configure_cache(max_entries=None, max_chars=None, policy=None, cache_dir=None):
+    """
+    Positionne les variables d'environnement du cache (options de la ligne de commande)
+    Un dossier de persistance sans taille active le cache avec DEFAULT_CACHE_SIZE entrées.
+    """
+    if max_entries is not None:
+        os.environ[CACHE_SIZE_ENV_VAR] = str(max_entries)
+    if max_chars is not None:
+        os.environ[CACHE_CHARS_ENV_VAR] = str(max_chars)
+    if policy is not None:
+        os.environ[CACHE_POLICY_ENV_VAR] = policy
+    if cache_dir is not None:
+        os.environ[CACHE_DIR_ENV_VAR] = cache_dir
+        os.environ.setdefault(CACHE_SIZE_ENV_VAR, str(DEFAULT_CACHE_SIZE))
+
+def cache_enabled():
+    """Le cache est-il activé (variable SENTENCE_CACHE_SIZE non nulle) ?"""
+    return int(os.environ.get(CACHE_SIZE_ENV_VAR) or 0) > 0
+
+def get_sentence_cache(name, version):
+    """
+    Cache du normaliseur name pour une version de la grammaire (None si désactivé)
+    Au premier appel, ou quand la version change, un nouveau cache est créé et
+    relu depuis le dossier de persistance s'il y en a un.
+    """
+    max_entries = int(os.environ.get(CACHE_SIZE_ENV_VAR) or 0)
+    if max_entries <= 0:
+        return None
+    with _CACHES_LOCK:
+        cache = _CACHES.get(name)
+        if cache is None or cache.version != version:
+            max_chars = int(os.environ.get(CACHE_CHARS_ENV_VAR) or 0) or None
+            policy = os.environ.get(CACHE_POLICY_ENV_VAR) or DEFAULT_POLICY
+            cache = SentenceCache(max_entries, max_chars, policy, version)
+            cache_dir = os.environ.get(CACHE_DIR_ENV_VAR)
+            if cache_dir:
+                cache.load(cache_file(cache_dir, name, version))
+            if _TRACK_NEW_ENTRIES:
+                cache.new_entries = []  # Les entrées relues sont déjà dans le fichier
+            _CACHES[name] = cache
+        return cache
+
+def cached(normalize, cache):
+    """Enveloppe un normaliseur texte -> texte avec un cache (cache None = inchangé)"""
+    if cache is None:
+        return normalize
+
+    def normalize_cached(text):
+        result = cache.get(text)
+        if result is None:
+            result = normalize(text)
+            cache.put(text, result)
+        return result
+
+    return normalize_cached
+
+def cache_persistent():
+    """Les caches sont-ils sauvegardés (cache activé et dossier de persistance configuré) ?"""
+    return cache_enabled() and bool(os.environ.get(CACHE_DIR_ENV_VAR))
+
+def track_new_entries():
+    """
+    Processus du pool : note désormais les entrées ajoutées aux caches,
+    récupérées par take_new_entries (les entrées déjà présentes ne sont pas renvoyées)
+    """
+    global _TRACK_NEW_ENTRIES
+    with _CACHES_LOCK:
+        _TRACK_NEW_ENTRIES = True
+        for cache in _CACHES.values():
+            cache.new_entries = []
+
+def take_new_entries():
+    """Entrées ajoutées depuis le dernier appel, {nom: (version, [(texte, sortie)])}"""
+    new = {}
+    with _CACHES_LOCK:
+        for name, cache in _CACHES.items():
+            with cache.lock:
+                if cache.new_entries:
+                    new[name] = (cache.version, cache.new_entries)
+                    cache.new_entries = []
+    return new
+
+def merge_new_entries(new):
+    """Ajoute aux caches de ce processus les entrées renvoyées par take_new_entries"""
+    for name, (version, entries) in new.items():
+        cache = get_sentence_cache(name, version)
+        if cache is None:
+            return
+        for text, result in entries:
+            cache.put(text, result)
+
+def save_sentence_caches():
+    """Écrit les caches de ce processus dans le dossier de persistance (s'il est configuré)"""
+    cache_dir = os.environ.get(CACHE_DIR_ENV_VAR)
+    if not cache_dir:
+        return []
+    with _CACHES_LOCK:
+        caches = list(_CACHES.items())
+    return [cache_file(cache_dir, name, cache.version) for name, cache in caches
+            if cache.save(cache_file(cache_dir, name, cache.version))]
+
+def sentence_cache_stats():
+    """Statistiques des caches de ce processus (nom -> stats)"""
+    with _CACHES_LOCK:
+        return {name: cache.stats() for name, cache in _CACHES.items()}
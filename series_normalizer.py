@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Normalisation d'une colonne entière (pandas.Series) en trois étapes
+1. extraction de tous les nombres de la colonne (str.findall, même motif que number_tokenizer)
+2. verbalisation des seuls jetons distincts (table précalculée, FST ou export NumPy)
+3. réécriture des lignes qui contiennent un nombre (str.replace, recherche dans un dictionnaire)
+Le coût des FSTs dépend du nombre de nombres distincts, pas de lignes × nombres.
+Résultat identique à normalize_text (mêmes jetons, mêmes plages).
+"""
+
+import time
+
+from instrumentation import metrics
+from lazy_modules import lazy_import
+from number_tokenizer import NUMBER_PATTERN, classify
+from script import DEFAULT_ENGINE, FAR_FILE, get_verbalizer
+
+pd = lazy_import("pandas")
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Moteurs utilisables : ceux qui verbalisent les nombres un par un
+# ("regex" de script_wer.py est le moteur "fst" : une composition par nombre)
+SERIES_ENGINES = ["table", "fst", "array", "regex"]
+
+# ============================================
+# NORMALISATION D'UNE COLONNE
+# ============================================
+
+def verbalize_tokens(tokens, verbalize, large=True):
+    """
+    Dictionnaire {jeton: texte} des jetons normalisables parmi tokens (distincts)
+    Les jetons hors plage, ou que verbalize laisse inchangés (None), sont absents.
+    """
+    replacements = {}
+    for token in tokens:
+        kind = classify(token, large)
+        if kind is None:
+            continue
+        replacement = verbalize(token, kind)
+        if replacement is not None:
+            replacements[token] = replacement
+    return replacements
+
+def normalize_series_with(series, verbalize, large=True):
+    """
+    Normalise tous les nombres d'une colonne de textes
+    verbalize(jeton, type) -> texte : voir number_tokenizer.normalize_numbers
+    Retourne une Series de chaînes de même index ; les valeurs manquantes deviennent "nan",
+    comme avec str().
+    """
+    texts = series.map(str).astype(object).reset_index(drop=True)
+
+    # 1. Nombres de chaque ligne (listes), puis ensemble des jetons distincts de la colonne
+    start = time.perf_counter()
+    found = texts.str.findall(NUMBER_PATTERN)
+    tokens = set().union(*found)
+    if metrics.enabled:
+        metrics.add_time("series_extract", time.perf_counter() - start)
+        metrics.incr("unique_tokens", len(tokens))
+
+    # 2. Jetons distincts seulement
+    start = time.perf_counter()
+    replacements = verbalize_tokens(tokens, verbalize, large)
+    if metrics.enabled:
+        metrics.add_time("series_verbalize", time.perf_counter() - start)
+
+    # 3. Réécriture des seules lignes qui contiennent un nombre
+    start = time.perf_counter()
+    result = texts.copy()
+    rows = found.str.len().to_numpy().nonzero()[0]
+    if replacements and len(rows):
+        replace = lambda match: replacements.get(match.group(), match.group())
+        result.iloc[rows] = texts.iloc[rows].str.replace(NUMBER_PATTERN, replace, regex=True)
+    if metrics.enabled:
+        metrics.add_time("series_replace", time.perf_counter() - start)
+
+    result.index = series.index
+    return result
+
+def get_series_normalizer(engine=DEFAULT_ENGINE, far_path=FAR_FILE):
+    """
+    Charge les FSTs du moteur une seule fois et retourne une fonction Series -> Series
+    engine: "table" (défaut), "fst" ou "regex" (composition par nombre), "array" (sans pynini)
+    """
+    if engine not in SERIES_ENGINES:
+        raise ValueError(f"Moteur non vectorisable: {engine} (choix: {', '.join(SERIES_ENGINES)})")
+    verbalize, large = get_verbalizer("fst" if engine == "regex" else engine, far_path)
+    return lambda series: normalize_series_with(pd.Series(series), verbalize, large)
+
+def normalize_series(series, engine=DEFAULT_ENGINE, far_path=FAR_FILE):
+    """Normalise tous les nombres d'une colonne (pandas.Series) ; voir get_series_normalizer"""
+    return get_series_normalizer(engine, far_path)(series)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+dataset_io : aller-retour ResultWriter -> read_dataset / iter_dataset
+pour chaque format (CSV, Parquet, Arrow IPC), écrit en plusieurs morceaux
+"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from dataset_io import DatasetFormatError, ResultWriter, file_format, iter_dataset, read_dataset
+
+FRAME = pd.DataFrame({
+    "reference": ["trois chiens", "soixante-et-onze", "", "mille « euros »"],
+    "hypothesis": ["trois chiens", "71", "", "mille « euros »"],
+    "wer": [0.0, 1.0, 0.0, 0.0],
+})
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet", ".arrow"])
+def test_result_writer_round_trip(tmp_path, suffix):
+    if suffix != ".csv":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / f"resultats{suffix}"
+    with ResultWriter(path) as writer:
+        writer.write(FRAME.iloc[:3])
+        writer.write(FRAME.iloc[3:])
+    assert writer.rows == len(FRAME)
+
+    columns = ["reference", "hypothesis", "wer"]
+    read = read_dataset(path, columns)
+    expected = FRAME.copy()
+    if suffix == ".csv":
+        # Une chaîne vide est relue comme valeur manquante en CSV
+        read = read.fillna("")
+    pd.testing.assert_frame_equal(read[columns], expected)
+
+    chunks = list(iter_dataset(path, ["hypothesis"], chunk_rows=3))
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    assert pd.concat(chunks)["hypothesis"].fillna("").to_list() == FRAME["hypothesis"].to_list()
+
+def test_unknown_extension():
+    with pytest.raises(DatasetFormatError):
+        file_format("resultats.xlsx")
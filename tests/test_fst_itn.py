@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Normalisation inverse : nombres hors plage et articles "un"/"une" laissés en lettres
+Le trie est construit sur une petite table (même format que celle du FST CARDINAL) :
+ces tests ne dépendent pas de pynini.
+"""
+
+import pytest
+
+from fst_itn import build_itn_trie, inverse_normalize
+
+TABLE = {
+    "1": "un",
+    "2": "deux",
+    "3": "trois",
+    "20": "vingt",
+    "21": "vingt-et-un",
+    "100": "cent",
+    "101": "cent-un",
+    "200": "deux-cents",
+    "253": "deux-cent-cinquante-trois",
+    "1000": "mille",
+}
+
+@pytest.fixture(scope="module")
+def trie():
+    return build_itn_trie(TABLE)
+
+@pytest.mark.parametrize("text, expected", [
+    ("deux cent cinquante-trois euros", "253 euros"),
+    ("vingt et un ans", "21 ans"),
+    ("mille chats", "1000 chats"),
+])
+def test_in_range(trie, text, expected):
+    assert inverse_normalize(text, trie) == expected
+
+@pytest.mark.parametrize("text", [
+    "deux mille euros",
+    "trois millions deux cents",
+    "cent mille habitants",
+    "mille deux cents",
+    "un milliard",
+])
+def test_out_of_range_left_untouched(trie, text):
+    assert inverse_normalize(text, trie) == text
+
+@pytest.mark.parametrize("text, expected", [
+    ("un chat", "un chat"),
+    ("Il a vu un chat et une souris", "Il a vu un chat et une souris"),
+    ("et un", "et un"),
+    ("un", "1"),
+    ("page un", "page 1"),
+    ("Le bébé a un an.", "Le bébé a 1 an."),
+    ("cent un chats", "101 chats"),
+])
+def test_article_un(trie, text, expected):
+    assert inverse_normalize(text, trie) == expected
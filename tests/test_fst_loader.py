@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+fst_loader : lecture mmap avec et sans SetFlags d'OpenFst
+Sans le symbole, les FSTs exportés sont relus de façon classique (mode "read")
+et donnent les mêmes sorties.
+"""
+
+import shutil
+
+import pytest
+
+pynini = pytest.importorskip("pynini")
+
+import fst_loader
+from conftest import ROOT
+from fst_loader import clear_cache, load_fst, mmap_read_mode, shortest_string
+
+@pytest.fixture
+def far_path(tmp_path):
+    # Copie du FAR : les exports mmap sont écrits dans tmp_path/.fst_cache
+    path = tmp_path / "cardinal_numbers.far"
+    shutil.copy(ROOT / "cardinal_numbers.far", path)
+    clear_cache()
+    yield str(path)
+    clear_cache()
+
+@pytest.fixture
+def without_set_flags(monkeypatch):
+    monkeypatch.setattr(fst_loader, "SET_FLAGS_SYMBOLS", {})
+    monkeypatch.setattr(fst_loader, "_set_flags", None)
+
+def verbalize(fst, number):
+    return shortest_string(pynini.accep(number, token_type="utf8"), fst, "utf8")
+
+def test_mmap_falls_back_to_read_without_set_flags(far_path, without_set_flags, capsys):
+    assert mmap_read_mode() == "read"
+    fst = load_fst(far_path, "CARDINAL", mmap=True)
+    assert verbalize(fst, "71") == "soixante-et-onze"
+    assert capsys.readouterr().err.count("SetFlags d'OpenFst introuvable") == 1
+
+def test_mmap_and_plain_loads_agree(far_path):
+    mapped = load_fst(far_path, "CARDINAL", mmap=True)
+    plain = load_fst(far_path, "CARDINAL", mmap=False)
+    assert mmap_read_mode() in ("map", "read")
+    for number in ["0", "80", "999", "1000"]:
+        assert verbalize(mapped, number) == verbalize(plain, number)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Cache des tables de verbalisation : borné à TABLE_CACHE_SIZE FSTs (LRU)
+"""
+
+import pytest
+
+pytest.importorskip("pynini")
+
+import fst_table
+from fst_table import TABLE_CACHE_SIZE, get_verbalization_table
+from Text_Normalisation_Cardinaux_0_a_1000 import get_cardinal_fst
+
+def test_table_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(fst_table, "_TABLE_CACHE", fst_table.OrderedDict())
+    fsts = [get_cardinal_fst().copy() for _ in range(TABLE_CACHE_SIZE + 2)]
+    for fst in fsts:
+        assert get_verbalization_table(fst)["71"] == "soixante-et-onze"
+    assert list(fst_table._TABLE_CACHE) == [id(fst) for fst in fsts[-TABLE_CACHE_SIZE:]]
+
+    # Une table relue redevient la plus récente
+    get_verbalization_table(fsts[-TABLE_CACHE_SIZE])
+    assert next(reversed(fst_table._TABLE_CACHE)) == id(fsts[-TABLE_CACHE_SIZE])
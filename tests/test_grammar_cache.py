@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Cache des sous-FSTs (.grammar_cache) : un FST relu depuis le cache n'est pas
+identique octet par octet à une compilation fraîche (ordre des arcs), mais il
+doit donner les mêmes sorties sur 0-1000.
+"""
+
+import pytest
+
+pytest.importorskip("pynini")
+
+from Text_Normalisation_Cardinaux_0_a_1000 import apply_fst, build_grammar
+
+NAME = "fst_00_to_1000"
+
+def test_cached_build_matches_fresh_build(tmp_path):
+    fresh = build_grammar([NAME], cache_dir=None)[NAME]
+    report = {}
+    build_grammar([NAME], cache_dir=tmp_path)  # Remplit le cache
+    cached = build_grammar([NAME], cache_dir=tmp_path, report=report)[NAME]
+    assert report[NAME][0] == "cached"
+
+    for number in range(1001):
+        assert apply_fst(str(number), cached) == apply_fst(str(number), fresh), number
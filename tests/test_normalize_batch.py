@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+normalize_batch : une entrée manquante ou un processus qui ne peut pas s'initialiser
+arrête le parent (sys.exit) au lieu de relancer les processus indéfiniment
+"""
+
+import sys
+
+import pytest
+
+pynini = pytest.importorskip("pynini")
+
+from conftest import ROOT
+from script import normalize_batch
+
+FAR_PATH = str(ROOT / "cardinal_numbers.far")
+
+def _exiting_factory(engine, far_path):
+    """Factory d'un processus du pool qui quitte, comme load_fst_from_far sur un FAR incomplet"""
+    print("❌ ERREUR: factory de test", file=sys.stderr)
+    sys.exit(1)
+
+@pytest.fixture
+def far_without_sentence(tmp_path):
+    path = tmp_path / "sans_sentence.far"
+    reader = pynini.Far(FAR_PATH)
+    writer = pynini.Far(str(path), mode="w")
+    writer["CARDINAL"] = reader["CARDINAL"]
+    writer.close()
+    reader.close()
+    return str(path)
+
+def test_missing_entry_is_reported_by_parent(far_without_sentence):
+    with pytest.raises(SystemExit) as error:
+        list(normalize_batch(["5 chats"], workers=2, engine="sentence", far_path=far_without_sentence))
+    assert error.value.code == 1
+
+def test_failing_worker_initializer_stops_parent(capsys):
+    with pytest.raises(SystemExit) as error:
+        list(normalize_batch(["5 chats", "71"], workers=2, far_path=FAR_PATH, factory=_exiting_factory))
+    assert error.value.code == 1
+    assert "Initialisation d'un processus du pool impossible" in capsys.readouterr().err
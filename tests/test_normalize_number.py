@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+normalize_number : un nombre rejeté par le FST est gardé tel quel et compté
+"""
+
+import pytest
+
+pynini = pytest.importorskip("pynini")
+
+import instrumentation
+from instrumentation import metrics
+from script import apply_fst, normalize_number
+
+@pytest.fixture
+def counting():
+    metrics.reset()
+    instrumentation.enable()
+    yield metrics
+    instrumentation.disable()
+    metrics.reset()
+
+def test_apply_fst_raises_without_path():
+    with pytest.raises(Exception):
+        apply_fst("5", pynini.accep("a"))
+
+def test_rejected_number_is_kept(counting):
+    assert normalize_number("5", pynini.accep("a")) == "5"
+    assert counting.counters["fallbacks"] == 1
+    assert counting.counters["fst_errors"] == 1
+
+def test_table_miss_falls_back_to_fst(counting):
+    fst = pynini.cross("5", "cinq")
+    assert normalize_number("5", fst, table={}) == "cinq"
+    assert counting.counters["table_misses"] == 1
+    assert "fallbacks" not in counting.counters
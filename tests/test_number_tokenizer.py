@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+number_tokenizer : plages des jetons et alignement entrée/sortie de normalize_numbers
+Verbaliseur factice (sans pynini) : seules les positions sont testées ici.
+"""
+
+import pytest
+
+from number_tokenizer import LARGE, SMALL, classify, normalize_numbers, substitute_numbers
+
+def verbalize(token, kind):
+    return f"<{kind}:{token}>"
+
+@pytest.mark.parametrize("token, large, expected", [
+    ("0", True, SMALL),
+    ("09", True, SMALL),
+    ("0007", True, SMALL),
+    ("1000", True, SMALL),
+    ("1001", True, LARGE),
+    ("1001", False, None),
+    ("999999999999", True, LARGE),
+    ("1000000000000", True, None),
+    ("085", True, None),
+    ("00007", True, None),
+])
+def test_classify(token, large, expected):
+    assert classify(token, large) == expected
+
+@pytest.mark.parametrize("text", [
+    "J'ai 3 chiens et 71 chats.",
+    "12345, 085 et 1000000000000 ; 7",
+    "début 5 puis 2024-06-01 fin 99",
+    "sans nombre",
+    "",
+    "é5 5é _5 x5",
+])
+def test_alignment_maps_each_number(text):
+    output, alignment = normalize_numbers(text, verbalize)
+    assert output == substitute_numbers(text, verbalize)
+    previous_end = 0
+    for in_start, in_end, out_start, out_end in alignment:
+        token = text[in_start:in_end]
+        assert output[out_start:out_end] == verbalize(token, classify(token))
+        # Texte entre deux nombres recopié tel quel
+        assert output[out_start - (in_start - previous_end):out_start] == text[previous_end:in_start]
+        previous_end = in_end
+    assert output[len(output) - (len(text) - previous_end):] == text[previous_end:]
+
+def test_verbalizer_can_skip_tokens():
+    output, alignment = normalize_numbers("1 et 2", lambda token, kind: None if token == "1" else "deux")
+    assert output == "1 et deux"
+    assert alignment == [(5, 6, 5, 9)]
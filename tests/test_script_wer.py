@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+script_wer : la normalisation par colonne (series_normalizer) et la normalisation
+ligne par ligne (--per-row) donnent les mêmes hypothèses
+"""
+
+import pytest
+
+pytest.importorskip("pynini")
+pd = pytest.importorskip("pandas")
+
+from conftest import ROOT
+from series_normalizer import SERIES_ENGINES
+from script_wer import calculate_wer_from_csv
+
+FAR_PATH = str(ROOT / "cardinal_numbers.far")
+
+# Phrases du jeu d'évaluation et jetons limites (hors plage, zéros, ponctuation)
+EXTRA_INPUTS = [
+    "J'ai 3 chiens, 71 chats et 12345 poissons.",
+    "085 et 00007 restent, 1000000 aussi ?",
+    "(80)-90/2024 € « 999 »",
+    "",
+    "sans nombre",
+]
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    df = pd.read_csv(ROOT / "data" / "dataset_normalisation_0_1000.csv")
+    df = pd.concat([df, pd.DataFrame({"input": EXTRA_INPUTS, "reference": EXTRA_INPUTS})])
+    path = tmp_path_factory.mktemp("wer") / "dataset.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+@pytest.mark.parametrize("engine", SERIES_ENGINES)
+def test_series_and_per_row_hypotheses_match(dataset, engine):
+    *_, series_hyp, _ = calculate_wer_from_csv(dataset, engine=engine, far_path=FAR_PATH)
+    *_, row_hyp, _ = calculate_wer_from_csv(dataset, engine=engine, far_path=FAR_PATH, per_row=True)
+    assert series_hyp == row_hyp
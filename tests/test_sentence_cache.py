@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Cache de phrases persistant avec un pool de processus : les entrées ajoutées par
+les processus du pool sont renvoyées au parent, qui les sauvegarde
+"""
+
+import sentence_cache
+from script import normalize_batch
+from sentence_cache import (CACHE_DIR_ENV_VAR, CACHE_SIZE_ENV_VAR, SentenceCache, cache_file, cached,
+                            get_sentence_cache, save_sentence_caches)
+
+NAME = "test-upper"
+VERSION = "v1"
+
+def upper_normalizer(engine, far_path):
+    """Normaliseur sans FST (picklable) avec le cache de phrases"""
+    return cached(str.upper, get_sentence_cache(NAME, VERSION))
+
+def test_pool_entries_are_saved_and_reloaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(sentence_cache, "_CACHES", {})
+    monkeypatch.setenv(CACHE_SIZE_ENV_VAR, "1000")
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(tmp_path))
+    texts = [f"phrase {i}" for i in range(50)]
+
+    results = list(normalize_batch(texts, workers=2, chunksize=5, factory=upper_normalizer))
+    assert results == [text.upper() for text in texts]
+    assert save_sentence_caches() == [cache_file(tmp_path, NAME, VERSION)]
+
+    reloaded = SentenceCache(version=VERSION)
+    assert reloaded.load(cache_file(tmp_path, NAME, VERSION)) == len(texts)
+    assert reloaded.get("phrase 7") == "PHRASE 7"
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+series_normalizer : une colonne normalisée d'un coup donne le texte de
+substitute_numbers ligne par ligne, avec le même index (verbaliseur factice)
+"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from number_tokenizer import substitute_numbers
+from series_normalizer import normalize_series_with
+
+def verbalize(token, kind):
+    return None if token == "7" else f"<{token}>"
+
+def test_series_matches_row_by_row():
+    texts = ["3 chiens et 71 chats", "sans nombre", "7 reste 7", "085 1000 1001", "", "3 3 3"]
+    series = pd.Series(texts, index=[10, 11, 12, 13, 14, 15])
+    result = normalize_series_with(series, verbalize)
+    assert list(result.index) == list(series.index)
+    assert result.to_list() == [substitute_numbers(text, verbalize) for text in texts]
+
+def test_large_numbers_left_without_large_fst():
+    result = normalize_series_with(pd.Series(["1001 et 5"]), verbalize, large=False)
+    assert result.to_list() == ["1001 et <5>"]
+
+def test_missing_values_become_nan_strings():
+    result = normalize_series_with(pd.Series(["5", None]), verbalize)
+    assert result.to_list() == ["<5>", "nan"]
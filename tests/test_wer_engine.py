@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+compute_wer : mêmes WER que jiwer (par phrase et corpus), y compris par lots et en
+plusieurs processus ; merge_stats de morceaux = statistiques du corpus entier
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+jiwer = pytest.importorskip("jiwer")
+
+from wer_engine import compute_wer, merge_stats
+
+REFS = [
+    "j'ai trois chiens",
+    "il a soixante-et-onze ans",
+    "le prix est de deux-cents euros",
+    "un deux trois quatre cinq",
+    "mille",
+    "a b c d e f g h",
+    "zéro",
+]
+HYPS = [
+    "j'ai trois chiens",                # identique
+    "il a 71 ans",                       # substitution
+    "le prix de deux cents euros",       # suppression + substitution + insertion
+    "un trois cinq",                     # suppressions
+    "mille mille mille",                 # insertions
+    "h g f e d c b a",
+    "",                                  # hypothèse vide
+]
+
+def test_sentence_wers_match_jiwer():
+    _, wers = compute_wer(REFS, HYPS)
+    for ref, hyp, wer in zip(REFS, HYPS, wers):
+        assert wer == pytest.approx(jiwer.wer(ref, hyp)), (ref, hyp)
+
+@pytest.mark.parametrize("workers, batch_size", [(1, 2048), (1, 2), (2, 3)])
+def test_corpus_wer_matches_jiwer(workers, batch_size):
+    stats, _ = compute_wer(REFS, HYPS, workers, batch_size)
+    assert stats["wer"] == pytest.approx(jiwer.wer(REFS, HYPS))
+    assert stats["ref_words"] == sum(len(ref.split()) for ref in REFS)
+    assert stats["exact_matches"] == 1
+
+def test_empty_reference():
+    _, wers = compute_wer(["", ""], ["", "bonjour"])
+    assert list(wers) == [0.0, 1.0]
+
+def test_merge_stats_equals_whole_corpus():
+    whole, _ = compute_wer(REFS, HYPS)
+    total = None
+    for start in range(0, len(REFS), 3):
+        chunk, _ = compute_wer(REFS[start:start + 3], HYPS[start:start + 3])
+        total = merge_stats(total, chunk)
+    assert total["wer"] == pytest.approx(whole["wer"])
+    assert total["sentence_wer"] == pytest.approx(whole["sentence_wer"])
+    assert total["sentences"] == whole["sentences"]
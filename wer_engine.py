@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Calcul vectorisé du WER sur un corpus
+- les mots sont convertis une seule fois en identifiants entiers
+- distances d'édition calculées par lots de paires avec NumPy (une ligne de la
+  matrice de programmation dynamique par itération, pour toutes les paires du lot)
+- chemin rapide : les paires identiques ne sont pas alignées
+- WER corpus (micro), WER moyen par phrase (macro), substitutions / suppressions / insertions
+"""
+
+import multiprocessing
+
+from lazy_modules import lazy_import
+
+np = lazy_import("numpy")
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Nombre de paires alignées ensemble (les paires sont triées par longueur)
+DEFAULT_BATCH_SIZE = 2048
+
+# Compteurs additifs des statistiques retournées par compute_wer
+COUNT_KEYS = ("sentences", "ref_words", "hits", "substitutions", "deletions", "insertions", "exact_matches")
+
+# ============================================
+# TOKENISATION
+# ============================================
+
+def tokenize(refs, hyps):
+    """
+    Découpe les phrases en mots (espaces, comme jiwer) et les remplace par des entiers
+    Retourne (ref_ids, hyp_ids) : une liste d'identifiants par phrase.
+    """
+    vocab = {}
+    ref_ids = [[vocab.setdefault(word, len(vocab)) for word in str(text).split()] for text in refs]
+    hyp_ids = [[vocab.setdefault(word, len(vocab)) for word in str(text).split()] for text in hyps]
+    return ref_ids, hyp_ids
+
+# ============================================
+# ALIGNEMENT
+# ============================================
+
+def _align_batch(refs, hyps):
+    """
+    Distance d'édition et nombre de mots corrects pour un lot de paires
+
+    Chaque case de la matrice contient la clé coût * M - corrects (M > longueur max) :
+    minimiser la clé minimise les erreurs puis, à égalité, maximise les mots corrects
+    (le WER est celui de jiwer ; la répartition S/D/I peut différer en cas d'égalité).
+    Les insertions d'une ligne se propagent en une passe grâce à un minimum cumulé.
+    Retourne (erreurs, corrects) : deux tableaux d'entiers.
+    """
+    n = len(refs)
+    ref_lens = np.fromiter(map(len, refs), np.int64, n)
+    hyp_lens = np.fromiter(map(len, hyps), np.int64, n)
+    max_ref, max_hyp = int(ref_lens.max()), int(hyp_lens.max())
+    weight = max(max_ref, max_hyp) + 1
+
+    # Remplissage distinct (-1 / -2) : les positions vides ne correspondent jamais
+    ref_matrix = np.full((n, max_ref), -1, dtype=np.int64)
+    hyp_matrix = np.full((n, max_hyp), -2, dtype=np.int64)
+    for k in range(n):
+        ref_matrix[k, :ref_lens[k]] = refs[k]
+        hyp_matrix[k, :hyp_lens[k]] = hyps[k]
+
+    rows = np.arange(n)
+    insert_costs = np.arange(max_hyp + 1, dtype=np.int64) * weight
+    row = np.broadcast_to(insert_costs, (n, max_hyp + 1)).copy()
+    keys = np.empty(n, dtype=np.int64)
+    finished = ref_lens == 0
+    keys[finished] = row[finished, hyp_lens[finished]]
+
+    for i in range(1, max_ref + 1):
+        match = hyp_matrix == ref_matrix[:, i - 1:i]
+        diagonal = row[:, :-1] + np.where(match, -1, weight)
+        best = row + weight                                   # suppression
+        np.minimum(best[:, 1:], diagonal, out=best[:, 1:])    # correct / substitution
+        row = np.minimum.accumulate(best - insert_costs, axis=1) + insert_costs  # insertions
+        finished = ref_lens == i
+        keys[finished] = row[rows[finished], hyp_lens[finished]]
+
+    errors = -(-keys // weight)
+    hits = errors * weight - keys
+    return errors, hits
+
+def _align_batch_star(args):
+    return _align_batch(*args)
+
+def align(ref_ids, hyp_ids, workers=1, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Aligne chaque paire (référence, hypothèse) d'identifiants
+    Les paires identiques ne sont pas alignées ; les autres sont triées par longueur
+    puis traitées par lots (répartis sur workers processus si workers > 1).
+    Retourne (corrects, substitutions, suppressions, insertions) : un tableau par compteur.
+    """
+    n = len(ref_ids)
+    ref_lens = np.fromiter(map(len, ref_ids), np.int64, n)
+    hyp_lens = np.fromiter(map(len, hyp_ids), np.int64, n)
+    errors = np.zeros(n, dtype=np.int64)
+    hits = ref_lens.copy()  # Chemin rapide : hypothèse == référence
+
+    todo = np.array([k for k in range(n) if ref_ids[k] != hyp_ids[k]], dtype=np.int64)
+    if len(todo):
+        todo = todo[np.lexsort((hyp_lens[todo], ref_lens[todo]))]
+        batches = [todo[start:start + batch_size] for start in range(0, len(todo), batch_size)]
+        tasks = [([ref_ids[k] for k in batch], [hyp_ids[k] for k in batch]) for batch in batches]
+        if workers > 1 and len(tasks) > 1:
+            with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+                results = pool.map(_align_batch_star, tasks)
+        else:
+            results = map(_align_batch_star, tasks)
+        for batch, (batch_errors, batch_hits) in zip(batches, results):
+            errors[batch] = batch_errors
+            hits[batch] = batch_hits
+
+    # corrects + S + D = |ref|, corrects + S + I = |hyp|, S + D + I = erreurs
+    insertions = errors - (ref_lens - hits)
+    deletions = errors - (hyp_lens - hits)
+    substitutions = ref_lens - hits - deletions
+    return hits, substitutions, deletions, insertions
+
+# ============================================
+# WER
+# ============================================
+
+def compute_wer(refs, hyps, workers=1, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Calcule le WER de chaque phrase et les totaux du corpus
+
+    Une référence vide donne un WER de 0 si l'hypothèse est vide, 1 sinon.
+    Retourne (stats, wers) : stats est un dictionnaire (wer corpus, wer moyen,
+    compteurs), wers le tableau des WER par phrase.
+    """
+    ref_ids, hyp_ids = tokenize(refs, hyps)
+    hits, substitutions, deletions, insertions = align(ref_ids, hyp_ids, workers, batch_size)
+    errors = substitutions + deletions + insertions
+    ref_lens = hits + substitutions + deletions
+
+    wers = np.where(errors > 0, 1.0, 0.0)
+    nonempty = ref_lens > 0
+    wers[nonempty] = errors[nonempty] / ref_lens[nonempty]
+
+    ref_words = int(ref_lens.sum())
+    stats = {
+        "sentences": len(wers),
+        "ref_words": ref_words,
+        "hits": int(hits.sum()),
+        "substitutions": int(substitutions.sum()),
+        "deletions": int(deletions.sum()),
+        "insertions": int(insertions.sum()),
+        "exact_matches": int((errors == 0).sum()),
+    }
+    stats["min_wer"] = float(wers.min()) if len(wers) else 0.0
+    stats["max_wer"] = float(wers.max()) if len(wers) else 0.0
+    stats["sentence_wer"] = float(wers.mean()) if len(wers) else 0.0
+    _set_corpus_wer(stats)
+    return stats, wers
+
+def _set_corpus_wer(stats):
+    errors = stats["substitutions"] + stats["deletions"] + stats["insertions"]
+    stats["wer"] = errors / stats["ref_words"] if stats["ref_words"] else 0.0
+
+def merge_stats(total, stats):
+    """
+    Ajoute les statistiques d'un morceau du corpus à celles déjà accumulées
+    Retourne les statistiques cumulées (total=None pour le premier morceau).
+    """
+    if total is None or not total["sentences"]:
+        return dict(stats)
+    if not stats["sentences"]:
+        return total
+    sentences = total["sentences"] + stats["sentences"]
+    merged = {key: total[key] + stats[key] for key in COUNT_KEYS}
+    merged["min_wer"] = min(total["min_wer"], stats["min_wer"])
+    merged["max_wer"] = max(total["max_wer"], stats["max_wer"])
+    merged["sentence_wer"] = (total["sentence_wer"] * total["sentences"]
+                              + stats["sentence_wer"] * stats["sentences"]) / sentences
+    _set_corpus_wer(merged)
+    return merged